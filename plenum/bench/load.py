@@ -0,0 +1,291 @@
+"""
+A load generator for a running pool. It drives requests from a number of
+clients, either at a target rate regardless of replies (open loop) or with a
+fixed number of requests outstanding (closed loop), and reports throughput,
+latency percentiles, NACKs and per-node reply skew.
+"""
+
+import math
+import random
+from collections import OrderedDict, defaultdict, deque
+from configparser import ConfigParser
+from hashlib import sha256
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from plenum.client.client import Client
+from plenum.client.signer import SimpleSigner
+from plenum.common.looper import Looper
+from plenum.common.txn import REPLY, REQACK, REQNACK
+from plenum.common.types import OP_FIELD_NAME, f, HA
+from plenum.common.util import getlogger
+
+logger = getlogger()
+
+
+def percentiles(values: Sequence[float],
+                ps: Sequence[float]=(50, 90, 99)) -> Dict[str, float]:
+    """
+    Return the mean, the given percentiles (nearest rank) and the maximum of
+    the values, in milliseconds when the values are in seconds.
+    """
+    if not values:
+        return OrderedDict()
+    ordered = sorted(values)
+    stats = OrderedDict([("mean", round(sum(ordered) / len(ordered) * 1000,
+                                        3))])
+    for p in ps:
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        stats["p{}".format(p)] = round(ordered[rank - 1] * 1000, 3)
+    stats["max"] = round(ordered[-1] * 1000, 3)
+    return stats
+
+
+def loadCliNodeReg(path: str) -> OrderedDict:
+    """
+    Read the client stack addresses of the nodes from the `client_node_reg`
+    section of a node registry file like `scripts/node_reg.conf`.
+    """
+    cfg = ConfigParser()
+    cfg.optionxform = str  # keep the case of node names
+    cfg.read(path)
+    registry = OrderedDict()
+    for name, value in cfg.items('client_node_reg'):
+        host, port = value.split()
+        registry[name] = HA(host, int(port))
+    return registry
+
+
+def benchSigners(count: int, seed: str) -> List[SimpleSigner]:
+    """
+    Create signers for the clients, deterministically from the seed so their
+    keys can be registered with the pool ahead of a run.
+    """
+    return [SimpleSigner("bench{}".format(i),
+                         sha256("{}{}".format(seed, i).encode()).digest())
+            for i in range(count)]
+
+
+class BenchClient(Client):
+    """
+    A client that records when its requests were sent, acknowledged and
+    confirmed, and when each node replied.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # replies are tallied per request, so the inBox need not keep them
+        self.inBox = deque(maxlen=0)
+        self.sentAt = {}  # type: Dict[int, float]
+        self.ackedAt = {}  # type: Dict[int, float]
+        self.confirmedAt = {}  # type: Dict[int, float]
+        self.replyTimes = defaultdict(dict)  # type: Dict[int, Dict[str, float]]
+        self.nacks = defaultdict(int)  # type: Dict[str, int]
+        # called with the request id when a request reaches consensus
+        self.onConfirmed = None
+
+    def submitTimed(self, operation: Mapping) -> int:
+        """
+        Submit an operation and return the request id.
+        """
+        request, = self.submit(operation)
+        self.sentAt[request.reqId] = self.clock.now()
+        return request.reqId
+
+    def handleOneNodeMsg(self, wrappedMsg) -> None:
+        super().handleOneNodeMsg(wrappedMsg)
+        now = self.clock.now()
+        msg, frm = wrappedMsg
+        op = msg.get(OP_FIELD_NAME)
+        if op == REQACK:
+            self.ackedAt.setdefault(msg[f.REQ_ID.nm], now)
+        elif op == REQNACK:
+            self.nacks[frm] += 1
+        elif op == REPLY:
+            reqId = msg[f.RESULT.nm][f.REQ_ID.nm]
+            self.replyTimes[reqId].setdefault(frm, now)
+            if reqId not in self.confirmedAt and \
+                    self.hasConsensus(reqId) is not False:
+                self.confirmedAt[reqId] = now
+                if self.onConfirmed:
+                    self.onConfirmed(reqId)
+
+
+class LoadGenerator:
+    """
+    Drives requests from clients at a target rate (open loop) or with a
+    fixed number of requests outstanding (closed loop).
+    """
+
+    def __init__(self,
+                 looper: Looper,
+                 clients: Sequence[BenchClient],
+                 rate: float=None,
+                 concurrency: int=None,
+                 duration: float=10,
+                 drain: float=5,
+                 operation=None):
+        """
+        :param rate: requests per second across all clients, for open loop
+        :param concurrency: requests outstanding across all clients, for
+            closed loop; mutually exclusive with rate
+        :param duration: seconds to send requests for
+        :param drain: seconds to wait for replies after the last request
+        :param operation: callable returning the operation of each request
+        """
+        if (rate is None) == (concurrency is None):
+            raise ValueError("exactly one of 'rate' or 'concurrency' must be "
+                             "given")
+        self.looper = looper
+        # timings are taken by the looper's clock, which is virtual when the
+        # pool is simulated
+        self.clock = looper.clock
+        self.clients = list(clients)
+        self.rate = rate
+        self.concurrency = concurrency
+        self.duration = duration
+        self.drain = drain
+        self.operation = operation or self.randomOperation
+        self.started = None
+        self.stopped = None
+        self.sent = 0
+
+    @staticmethod
+    def randomOperation(rng: random.Random=random):
+        return {"type": "buy", "amount": rng.randint(10, 100)}
+
+    async def waitForConnections(self, timeout: float=30) -> None:
+        """
+        Wait until every client is connected to enough nodes to submit.
+        """
+        end = self.clock.now() + timeout
+        while not all(len(c.conns) >= c.minimumNodes for c in self.clients):
+            if self.clock.now() > end:
+                raise TimeoutError("clients could not connect to the pool "
+                                   "within {} seconds".format(timeout))
+            await self.looper.sleep(.1)
+
+    def _submit(self) -> None:
+        client = self.clients[self.sent % len(self.clients)]
+        client.submitTimed(self.operation())
+        self.sent += 1
+
+    async def _runOpenLoop(self, end: float) -> None:
+        interval = 1 / self.rate
+        while True:
+            now = self.clock.now()
+            if now >= end:
+                break
+            # catch up if the loop fell behind the schedule
+            due = int((now - self.started) / interval) + 1
+            while self.sent < due:
+                self._submit()
+            await self.looper.sleep(max(0.0, self.started + due * interval -
+                                        self.clock.now()))
+
+    async def _runClosedLoop(self, end: float) -> None:
+        def onConfirmed(reqId):
+            if self.clock.now() < end:
+                self._submit()
+
+        for client in self.clients:
+            client.onConfirmed = onConfirmed
+        try:
+            for _ in range(self.concurrency):
+                self._submit()
+            await self.looper.sleep(max(0.0, end - self.clock.now()))
+        finally:
+            for client in self.clients:
+                client.onConfirmed = None
+
+    def outstanding(self) -> int:
+        return sum(len(c.sentAt) - len(c.confirmedAt) for c in self.clients)
+
+    async def run(self) -> None:
+        """
+        Send requests for `duration` seconds, then wait up to `drain`
+        seconds for the outstanding requests to be confirmed.
+        """
+        self.started = self.clock.now()
+        end = self.started + self.duration
+        if self.rate:
+            await self._runOpenLoop(end)
+        else:
+            await self._runClosedLoop(end)
+        self.stopped = self.clock.now()
+        drainEnd = self.stopped + self.drain
+        while self.outstanding() and self.clock.now() < drainEnd:
+            await self.looper.sleep(.05)
+
+    def report(self) -> OrderedDict:
+        """
+        Return the results of the run as a JSON-serializable dictionary.
+        Throughput counts the requests confirmed while requests were being
+        sent.
+        """
+        ackLatencies, replyLatencies = [], []
+        nodeLatencies = defaultdict(list)
+        nodeSkews = defaultdict(list)
+        nacks = defaultdict(int)
+        acked = confirmed = inWindow = 0
+        for c in self.clients:
+            for reqId, sentAt in c.sentAt.items():
+                if reqId in c.ackedAt:
+                    acked += 1
+                    ackLatencies.append(c.ackedAt[reqId] - sentAt)
+                if reqId in c.confirmedAt:
+                    confirmed += 1
+                    replyLatencies.append(c.confirmedAt[reqId] - sentAt)
+                    if c.confirmedAt[reqId] <= self.stopped:
+                        inWindow += 1
+                times = c.replyTimes.get(reqId)
+                if times:
+                    first = min(times.values())
+                    for node, t in times.items():
+                        nodeLatencies[node].append(t - sentAt)
+                        nodeSkews[node].append(t - first)
+            for node, count in c.nacks.items():
+                nacks[node] += count
+        elapsed = self.stopped - self.started
+        return OrderedDict([
+            ("mode", "open" if self.rate else "closed"),
+            ("clients", len(self.clients)),
+            ("rate", self.rate),
+            ("concurrency", self.concurrency),
+            ("duration", round(elapsed, 3)),
+            ("sent", self.sent),
+            ("acked", acked),
+            ("confirmed", confirmed),
+            ("unconfirmed", self.sent - confirmed),
+            ("nacks", OrderedDict(sorted(nacks.items()))),
+            ("throughput", round(inWindow / elapsed, 3) if elapsed else 0),
+            ("ackLatencyMs", percentiles(ackLatencies)),
+            ("replyLatencyMs", percentiles(replyLatencies)),
+            ("nodes", OrderedDict(
+                (node, OrderedDict([
+                    ("replies", len(nodeLatencies[node])),
+                    ("replyLatencyMs", percentiles(nodeLatencies[node])),
+                    ("skewMs", percentiles(nodeSkews[node]))]))
+                for node in sorted(nodeLatencies)))
+        ])
+
+
+def startClients(looper: Looper,
+                 cliNodeReg: Mapping[str, HA],
+                 signers: Sequence[SimpleSigner],
+                 host: str,
+                 firstPort: int,
+                 basedirpath: Optional[str]=None) -> List[BenchClient]:
+    """
+    Create a client for each signer, listening on consecutive ports, and
+    add them to the looper.
+    """
+    clients = []
+    for i, signer in enumerate(signers):
+        client = BenchClient(signer.identifier,
+                             nodeReg=cliNodeReg,
+                             ha=HA(host, firstPort + i),
+                             signer=signer,
+                             basedirpath=basedirpath)
+        looper.add(client)
+        clients.append(client)
+    return clients
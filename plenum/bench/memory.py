@@ -0,0 +1,128 @@
+"""
+A benchmark of the memory a node holds per request in flight: the request as
+it was decoded off the wire, its digest and serialization, and its state in
+the node's store of requests with the PROPAGATEs received for it.
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from base64 import b64encode
+from collections import OrderedDict
+from typing import Iterable, Sequence
+
+from plenum.common.types import Request
+from plenum.common.util import getlogger
+from plenum.server.propagator import Requests
+
+logger = getlogger()
+
+
+def wireRequest(reqId: int, requestSize: int=0) -> str:
+    """
+    A request as a client sends it, with a signature of the usual length.
+    """
+    operation = {"type": "buy", "amount": reqId}
+    if requestSize:
+        operation["data"] = "x" * requestSize
+    signature = b64encode(reqId.to_bytes(64, "big")).decode()
+    return json.dumps({"identifier": "2gj8fJzhYgx4qnbpYuUGU3sXQDYJNpSiwT5qpK"
+                                     "Fkqd4n",
+                       "reqId": reqId,
+                       "operation": operation,
+                       "signature": signature})
+
+
+def residentBytes() -> int:
+    """
+    The resident memory of this process, where /proc tells it.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def addInFlight(requests: Requests, reqIds: Iterable[int],
+                senders: Sequence[str], requestSize: int=0) -> None:
+    """
+    Add requests to `requests` as a node does that got them propagated by
+    all of `senders` and forwarded them to its replicas.
+    """
+    for reqId in reqIds:
+        req = Request.fromState(json.loads(wireRequest(reqId, requestSize)))
+        # what authenticating and forwarding the request computes
+        req.digest
+        for sender in senders:
+            requests.addPropagate(req, sender)
+        requests.flagAsForwarded(req)
+
+
+def inFlightMemory(count: int=1000000,
+                   nodeCount: int=4,
+                   requestSize: int=0,
+                   sample: int=10000) -> OrderedDict:
+    """
+    Build the state a node keeps for `count` requests that are propagated by
+    all nodes but not yet ordered, and return the memory it takes.
+
+    The bytes per request are traced by `tracemalloc` over the first
+    `sample` requests, as tracing all of them takes several times longer;
+    the growth of the resident memory is measured over all of them.
+
+    :param count: number of requests in flight
+    :param nodeCount: number of nodes propagating each request
+    :param requestSize: bytes of padding in the operation of requests
+    :param sample: number of requests to trace allocations of
+    """
+    senders = ["Node{}".format(i) for i in range(1, nodeCount + 1)]
+    sample = min(sample, count)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        sampled = Requests()
+        addInFlight(sampled, range(sample), senders, requestSize)
+        traced = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del sampled
+
+    gc.collect()
+    rssBefore = residentBytes()
+    start = time.perf_counter()
+    requests = Requests()
+    addInFlight(requests, range(count), senders, requestSize)
+    took = time.perf_counter() - start
+    rss = residentBytes() - rssBefore if rssBefore is not None else None
+
+    state = next(iter(requests.values()))
+    req = state.request
+    return OrderedDict([
+        ("count", count),
+        ("nodes", nodeCount),
+        ("requestSize", requestSize),
+        ("bytesPerRequest", round(traced / sample, 1)),
+        ("rssBytesPerRequest", round(rss / count, 1) if rss else None),
+        ("rssMB", round(rss / 2 ** 20, 1) if rss else None),
+        ("seconds", round(took, 3)),
+        # shallow sizes of the parts of one request's state
+        ("objectBytes", OrderedDict([
+            ("Request", sys.getsizeof(req)),
+            ("operation", sys.getsizeof(req.operation)),
+            ("signature", sys.getsizeof(req.signature)),
+            ("signingBytes", sys.getsizeof(req.signingBytes)),
+            ("digest", sys.getsizeof(req.digest)),
+            ("ReqState", sys.getsizeof(state)),
+            ("propagates", sys.getsizeof(state.propagates)),
+            ("key", sys.getsizeof(req.key)),
+        ])),
+        ("hasDict", OrderedDict([
+            ("Request", hasattr(req, "__dict__")),
+            ("ReqState", hasattr(state, "__dict__")),
+        ])),
+    ])
@@ -0,0 +1,303 @@
+"""
+Microbenchmarks of the functions every message goes through: serializing and
+signing requests, authenticating them, converting messages to and from
+dictionaries, validating and routing node messages, the replica's PREPARE and
+COMMIT processing, the monitor and the store of propagated requests, and
+the check of the node registry against the stack's remotes that connection
+maintenance runs.
+
+Each benchmark is timed over several rounds, and run once more with
+`tracemalloc` tracing to count the memory it allocates per operation. The
+benchmarks that need a node run against a ready pool of four nodes on a
+simulated network (see `plenum.bench.sim`).
+"""
+
+import gc
+import time
+import tracemalloc
+from collections import OrderedDict
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from plenum.bench.report import compareMetrics, reportHeader
+from plenum.bench.sim import SimPool, seedFor
+from plenum.client.signer import SimpleSigner
+from plenum.common.signing import serializeCanonical, serializeForSig, \
+    serlize
+from plenum.common.types import Commit, Prepare, Propagate, Request
+from plenum.common.util import getlogger
+from plenum.server.client_authn import SimpleAuthNr
+from plenum.server.propagator import Requests
+from plenum.server.router import Router
+
+logger = getlogger()
+
+# Metrics compared between reports, and whether a higher value is better
+COMPARED_METRICS = OrderedDict([
+    ("opsPerSec", True),
+    ("allocations.retainedBytes", False),
+    ("allocations.peakBytes", False),
+])
+
+
+class MicroBench:
+    """
+    An operation to benchmark.
+
+    :param name: name of the benchmark in reports
+    :param op: the operation; called with the arguments `args` makes for it
+    :param args: makes the arguments for the i-th call of `op`; it is called
+        for all calls of a round before the round is timed, so that
+        preparing state a call needs is not measured
+    """
+
+    def __init__(self, name: str, op: Callable,
+                 args: Callable[[int], Tuple]=None):
+        self.name = name
+        self.op = op
+        self.args = args or (lambda i: ())
+        self.calls = 0
+
+    def prepare(self, number: int) -> List[Tuple]:
+        args = [self.args(self.calls + i) for i in range(number)]
+        self.calls += number
+        return args
+
+    def timeRound(self, number: int) -> float:
+        """
+        Call the operation `number` times and return the seconds it took.
+        """
+        op = self.op
+        args = self.prepare(number)
+        gcWasEnabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for a in args:
+                op(*a)
+            return time.perf_counter() - start
+        finally:
+            if gcWasEnabled:
+                gc.enable()
+
+    def allocations(self, number: int) -> Dict[str, float]:
+        """
+        Call the operation `number` times with `tracemalloc` tracing, and
+        return the bytes and memory blocks still allocated per call after it,
+        and the most bytes a call had allocated at any moment. The peak needs
+        `tracemalloc.reset_peak` (Python 3.9) and is None without it.
+        """
+        op = self.op
+        args = self.prepare(number)
+        resetPeak = getattr(tracemalloc, "reset_peak", None)
+        peak = 0
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            for a in args:
+                if resetPeak:
+                    resetPeak()
+                    base = tracemalloc.get_traced_memory()[0]
+                    op(*a)
+                    peak += tracemalloc.get_traced_memory()[1] - base
+                else:
+                    op(*a)
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        diff = after.compare_to(before, "filename")
+        return OrderedDict([
+            ("retainedBytes", round(sum(d.size_diff for d in diff) / number,
+                                    1)),
+            ("retainedBlocks", round(sum(d.count_diff for d in diff) / number,
+                                     2)),
+            ("peakBytes", round(peak / number, 1) if resetPeak else None),
+        ])
+
+    def run(self, number: int, repeat: int) -> OrderedDict:
+        # one untimed round, for caches and lazily created state
+        self.timeRound(min(number, 100))
+        times = [self.timeRound(number) for _ in range(repeat)]
+        best = min(times)
+        return OrderedDict([
+            ("name", self.name),
+            ("number", number),
+            ("repeat", repeat),
+            ("opsPerSec", round(number / best, 1)),
+            ("usPerOp", OrderedDict([
+                ("best", round(best / number * 1e6, 3)),
+                ("median", round(sorted(times)[len(times) // 2] /
+                                 number * 1e6, 3))])),
+            ("allocations", self.allocations(min(number, 1000))),
+        ])
+
+
+def signedRequest(signer: SimpleSigner, reqId: int,
+                  size: int=0) -> Request:
+    operation = {"type": "buy", "amount": reqId}
+    if size:
+        operation["data"] = "x" * size
+    req = Request(signer.identifier, reqId, operation)
+    req.signature = signer.sign(req.__getstate__())
+    return req
+
+
+def clientBenchmarks(requestSize: int=0) -> List[MicroBench]:
+    """
+    Benchmarks of the functions that only need a client's signer.
+    """
+    signer = SimpleSigner("client1", seedFor("client1", "sig"))
+    authNr = SimpleAuthNr()
+    authNr.addClient(signer.identifier, signer.verkey)
+    req = signedRequest(signer, 1, requestSize)
+    state = req.__getstate__()
+    propagate = Propagate(state, "client1")
+
+    requests = Requests()
+
+    def addPropagateArgs(i):
+        return signedRequest(signer, i, requestSize), "Node{}".format(i % 4)
+
+    router = Router((Prepare, lambda msg, frm: None))
+    prepare = Prepare(0, 0, 1, req.digest, 1.0)
+
+    return [
+        MicroBench("signing.serlize", serlize, lambda i: (state,)),
+        MicroBench("signing.serializeCanonical", serializeCanonical,
+                   lambda i: (state,)),
+        MicroBench("signing.serializeForSig", serializeForSig,
+                   lambda i: (state,)),
+        MicroBench("SimpleSigner.sign", signer.sign, lambda i: (state,)),
+        MicroBench("NaclAuthNr.authenticate", authNr.authenticate,
+                   lambda i: (state,)),
+        MicroBench("TaggedTupleBase.melted", propagate.melted),
+        MicroBench("Router.handleSync", router.handleSync,
+                   lambda i: ((prepare, "Node2"),)),
+        MicroBench("Requests.addPropagate", requests.addPropagate,
+                   addPropagateArgs),
+    ]
+
+
+def nodeBenchmarks(pool: SimPool, requestSize: int=0) -> List[MicroBench]:
+    """
+    Benchmarks of the functions that need a node, run against a node of a
+    ready pool whose master replica is not the primary.
+    """
+    node = next(n for n in pool.nodes.values()
+                if not n.replicas[0].isPrimary)
+    replica = node.replicas[0]
+    others = [n for n in pool.nodes if n != node.name]
+    primary = replica.getNodeName(replica.primaryName)
+    sender, voter = [replica.generateName(n, replica.instId)
+                     for n in others if n != primary][:2]
+
+    signer = SimpleSigner("client1", seedFor("client1", "sig"))
+    node.clientAuthNr.addClient(signer.identifier, signer.verkey)
+    req = signedRequest(signer, 1, requestSize)
+    propagate = Propagate(req.__getstate__(), "client1")
+    prepare = Prepare(replica.instId, replica.viewNo, 1, req.digest, 1.0)
+
+    # the replica checks PREPAREs and COMMITs against the PRE-PREPARE for
+    # their sequence number, so each call gets a new one
+    firstSeqNo = 1000000
+
+    def threePhaseKey(i):
+        ppSeqNo = firstSeqNo + i
+        digest = "{:064x}".format(ppSeqNo)
+        replica.prePrepares[(replica.viewNo, ppSeqNo)] = \
+            ((signer.identifier, ppSeqNo, digest), 1.0)
+        return ppSeqNo, digest
+
+    def prepareArgs(i):
+        ppSeqNo, digest = threePhaseKey(i)
+        return Prepare(replica.instId, replica.viewNo, ppSeqNo, digest,
+                       1.0), sender
+
+    def commitArgs(i):
+        ppSeqNo, digest = threePhaseKey(i)
+        replica.prepares.addVote(Prepare(replica.instId, replica.viewNo,
+                                         ppSeqNo, digest, 1.0), voter)
+        return Commit(replica.instId, replica.viewNo, ppSeqNo, digest,
+                      1.0), sender
+
+    def requestOrderedArgs(i):
+        node.monitor.requestUnOrdered(signer.identifier, i)
+        return signer.identifier, i, replica.instId, True
+
+    def nodeMsgArgs(msg, frm):
+        wire = msg.melted()
+        return lambda i: ((OrderedDict(wire), frm),)
+
+    return [
+        MicroBench("Node.validateNodeMsg[PREPARE]", node.validateNodeMsg,
+                   nodeMsgArgs(prepare, others[0])),
+        MicroBench("Node.validateNodeMsg[PROPAGATE]", node.validateNodeMsg,
+                   nodeMsgArgs(propagate, others[0])),
+        MicroBench("Replica.processPrepare", replica.processPrepare,
+                   prepareArgs),
+        MicroBench("Replica.processCommit", replica.processCommit,
+                   commitArgs),
+        MicroBench("Monitor.requestOrdered", node.monitor.requestOrdered,
+                   requestOrderedArgs),
+        MicroBench("NodeStacked.reconcileNodeReg", node.reconcileNodeReg),
+    ]
+
+
+def runMicro(names: Sequence[str]=None,
+             number: int=10000,
+             repeat: int=5,
+             requestSize: int=0) -> OrderedDict:
+    """
+    Run the microbenchmarks and return the report.
+
+    :param names: names of the benchmarks to run, or the prefixes of their
+        names; all by default
+    :param number: calls of the operation per timed round
+    :param repeat: number of timed rounds; the best is reported as ops/s
+    :param requestSize: bytes of padding in the operation of requests
+    """
+    def wanted(bench):
+        return not names or any(bench.name.startswith(n) for n in names)
+
+    results = []
+    with TemporaryDirectory() as tmpdir:
+        benches = [b for b in clientBenchmarks(requestSize) if wanted(b)]
+        pool = None
+        if not names or any(n.startswith(p) for p in ("Node", "Replica",
+                                                      "Monitor")
+                            for n in names):
+            pool = SimPool(4, tmpdir)
+            pool.runUntil(pool.isReady, timeout=120)
+            benches += [b for b in nodeBenchmarks(pool, requestSize)
+                        if wanted(b)]
+        try:
+            for bench in benches:
+                logger.info("running microbenchmark {}".format(bench.name),
+                            extra={"cli": False})
+                results.append(bench.run(number, repeat))
+        finally:
+            if pool:
+                pool.close()
+    report = reportHeader()
+    report["params"] = OrderedDict([("number", number),
+                                    ("repeat", repeat),
+                                    ("requestSize", requestSize)])
+    report["results"] = results
+    return report
+
+
+def benchKey(result: Dict[str, Any]) -> OrderedDict:
+    return OrderedDict([("name", result["name"])])
+
+
+def compareMicro(baseline: Dict[str, Any], current: Dict[str, Any],
+                 tolerance: float=0.1) -> List[OrderedDict]:
+    """
+    Compare the ops/s and the bytes allocated per op of the benchmarks that
+    are in both reports.
+
+    :param tolerance: the fraction by which a metric can get worse before
+        it is a regression
+    """
+    return compareMetrics(baseline, current, benchKey, COMPARED_METRICS,
+                          tolerance)
@@ -0,0 +1,170 @@
+"""
+Replays a node's recorded traffic (see `plenum.server.traffic`) into a node
+on a simulated network, to reproduce and benchmark its processing offline.
+
+The other nodes of the pool and the clients in the recording are stacks on
+the network that connect to the node and drop whatever it sends them, so
+only the node does any work. By default the node runs on a virtual clock
+that is moved to each message's recorded time, so its timers fire as they
+did while messages are fed as fast as the node processes them; `paced`
+runs by the system clock at the recorded pace instead.
+
+What the node sends is not recorded, so a node whose own timing differs
+from the recording, e.g. nominating itself at another moment, may end up
+in a state other than the recorded node's.
+"""
+
+import time
+from collections import OrderedDict, deque
+from copy import copy
+from typing import Callable
+
+from plenum.bench.sim import SimNode, seedFor, simNodeReg
+from plenum.common.clock import VirtualClock, systemClock
+from plenum.common.looper import Looper
+from plenum.common.raet import initLocalKeep
+from plenum.common.sim_stack import SimNetwork, SimStack
+from plenum.common.types import HA
+from plenum.common.util import getlogger
+from plenum.server.traffic import CLIENT_MSG, NODE_MSG, readTraffic, \
+    recordingSummary
+
+logger = getlogger()
+
+
+def sinkStack(network: SimNetwork, name: str, ha: HA,
+              main: bool) -> SimStack:
+    """
+    A stack that accepts connections and drops the messages it receives.
+    """
+    stack = network.newStack(dict(name=name, ha=ha, main=main))
+    stack.rxMsgs = deque(maxlen=0)
+    return stack
+
+
+class TrafficReplayer:
+    """
+    Feeds a recording into a node.
+
+    :param path: the recording
+    :param basedirpath: directory for the node's keys and ledgers
+    :param paced: replay at the recorded pace by the system clock
+    :param nodeClass: class of the node to replay into
+    """
+
+    def __init__(self, path: str, basedirpath: str, paced: bool=False,
+                 nodeClass=SimNode):
+        self.path = path
+        self.paced = paced
+        self.summary = recordingSummary(path)
+        self.clock = systemClock if paced else VirtualClock()
+        self.network = SimNetwork(clock=self.clock)
+        nodeReg = simNodeReg(names=self.summary["nodes"])
+        name = self.summary["node"]
+        initLocalKeep(name, basedirpath, seedFor(name, "pk"),
+                      seedFor(name, "sig"), override=True)
+        self.node = nodeClass(name, nodeRegistry=copy(nodeReg),
+                              basedirpath=basedirpath, network=self.network)
+        for identifier, verkey in self.summary["verkeys"].items():
+            self.node.clientAuthNr.addClient(identifier, verkey)
+
+        self.sinks = [sinkStack(self.network, peer, detail.ha, True)
+                      for peer, detail in nodeReg.items() if peer != name]
+        cliha = nodeReg[name].cliha
+        for i, client in enumerate(self.summary["clients"]):
+            sink = sinkStack(self.network, client, HA("replay", i), False)
+            remote = sink.newRemote(cliha)
+            sink.addRemote(remote)
+            sink.join(remote.uid)
+            self.sinks.append(sink)
+
+        self.looper = Looper([self.node], clock=self.clock,
+                             eventDriven=False)
+
+    def runUntil(self, condition: Callable[[], bool],
+                 timeout: float=60) -> None:
+        start = self.clock.now()
+
+        async def wait():
+            while not condition():
+                if self.clock.now() - start > timeout:
+                    raise TimeoutError("condition not met within {} "
+                                       "seconds".format(timeout))
+                await self.looper.runOnceNicely()
+
+        self.looper.run(wait())
+
+    async def runTo(self, due: float) -> None:
+        """
+        Run the node until the clock reaches `due`.
+        """
+        while self.clock.now() < due:
+            if self.paced:
+                await self.looper.runOnceNicely()
+            else:
+                now = self.clock.now()
+                nxt = self.looper.nextWakeup()
+                self.clock.advanceTo(min(due, nxt if nxt > now
+                                         else now + self.looper.pollInterval))
+                await self.looper.prodAllOnce()
+
+    async def _replay(self, drain: float) -> OrderedDict:
+        counts = {NODE_MSG: 0, CLIENT_MSG: 0}
+        stacks = {NODE_MSG: self.node.nodestack,
+                  CLIENT_MSG: self.node.clientstack}
+        start = self.clock.now()
+        first = None
+        for record in readTraffic(self.path):
+            if isinstance(record, dict):
+                continue
+            t, kind, frm, msg = record
+            if kind not in stacks:
+                continue
+            if first is None:
+                first = t
+            await self.runTo(start + t - first)
+            stacks[kind].rxMsgs.append((msg, frm))
+            counts[kind] += 1
+            await self.looper.prodAllOnce()
+        await self.runTo(self.clock.now() + drain)
+        return counts
+
+    def replay(self, drain: float=1) -> OrderedDict:
+        """
+        Connect the node to the pool's and the clients' stacks, feed it the
+        recorded messages and return how long processing them took.
+
+        :param drain: seconds to run the node for after the last message
+        """
+        self.runUntil(lambda: self.node.nodestack.connecteds() >=
+                      set(self.summary["nodes"]) - {self.node.name} and
+                      len(self.node.clientstack.connecteds()) ==
+                      len(self.summary["clients"]))
+        self.looper.prodTimings.reset()
+        started = time.perf_counter()
+        counts = self.looper.run(self._replay(drain))
+        took = time.perf_counter() - started
+        msgs = counts[NODE_MSG] + counts[CLIENT_MSG]
+        ordered = self.node.monitor.numOrderedRequests
+        return OrderedDict([
+            ("node", self.node.name),
+            ("paced", self.paced),
+            ("nodeMsgs", counts[NODE_MSG]),
+            ("clientMsgs", counts[CLIENT_MSG]),
+            ("recordedSeconds", round(self.summary["seconds"], 3)),
+            ("seconds", round(took, 3)),
+            ("msgsPerSec", round(msgs / took, 1) if took else None),
+            ("nodeTimeMs", round(self.looper.prodTimings[self.node.name].
+                                 total * 1000, 3)),
+            ("orderedByMaster", ordered[0][0] if ordered else 0),
+        ])
+
+    def close(self) -> None:
+        self.looper.shutdownSync()
+
+    def __enter__(self):
+        return self
+
+    # noinspection PyUnusedLocal
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
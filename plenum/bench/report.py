@@ -0,0 +1,86 @@
+"""
+What the benchmarks' JSON reports have in common: the header saying where a
+report was made, and the comparison of the results of two reports.
+"""
+
+import platform
+import subprocess
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping
+
+
+def currentCommit() -> str:
+    """
+    The commit the benchmark is run at, if it is run from a git checkout.
+    """
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"],
+                                       stderr=subprocess.DEVNULL,
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def reportHeader() -> OrderedDict:
+    """
+    The start of a report: the commit, Python and platform it was made with
+    and when it was started. A benchmark adds its params and results.
+    """
+    return OrderedDict([
+        ("commit", currentCommit()),
+        ("python", platform.python_version()),
+        ("platform", platform.platform()),
+        ("started", time.strftime("%Y-%m-%dT%H:%M:%S%z")),
+    ])
+
+
+def metric(result: Dict[str, Any], name: str):
+    """
+    The value of a metric of a result, with the parts of a dotted name
+    looked up in nested results; None if the result does not have it.
+    """
+    value = result
+    for part in name.split("."):
+        value = value.get(part) if value else None
+    return value
+
+
+def compareMetrics(baseline: Dict[str, Any], current: Dict[str, Any],
+                   keyFn: Callable[[Dict[str, Any]], OrderedDict],
+                   metrics: Mapping[str, bool],
+                   tolerance: float=0.1) -> List[OrderedDict]:
+    """
+    Compare the metrics of the results that are in both reports.
+
+    :param keyFn: returns the fields that identify a result, which are the
+        same for a result in both reports
+    :param metrics: the names of the metrics compared, and whether a higher
+        value is better
+    :param tolerance: the fraction by which a metric can get worse before
+        it is a regression
+    :return: a row per result and metric with the fields that identify the
+        result, both values, the relative change and whether it is a
+        regression
+    """
+    baseResults = {tuple(keyFn(r).items()): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        key = keyFn(result)
+        base = baseResults.get(tuple(key.items()))
+        if base is None:
+            continue
+        for name, higherIsBetter in metrics.items():
+            old, new = metric(base, name), metric(result, name)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            worse = -change if higherIsBetter else change
+            row = OrderedDict(key)
+            row["metric"] = name
+            row["baseline"] = old
+            row["current"] = new
+            row["change"] = round(change, 4)
+            row["regression"] = worse > tolerance
+            rows.append(row)
+    return rows
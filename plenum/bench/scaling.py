@@ -0,0 +1,168 @@
+"""
+A pool-scaling benchmark. Runs closed loop load against pools on a simulated
+network for a matrix of pool sizes, request sizes and client counts, and
+reports ordering throughput, latency, messages and bytes per ordered request
+and the time each node spent processing, as JSON that can be compared with a
+report from another commit.
+
+By default the pools run on a virtual clock: runs are repeatable and
+latencies are those of the protocol and the network, while processing cost
+shows in the time per node. With `realTime`, the pools run by the system
+clock, so processing also limits throughput.
+"""
+
+import random
+from collections import OrderedDict
+from itertools import product
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Sequence
+
+from plenum.bench.load import LoadGenerator
+from plenum.bench.report import compareMetrics, reportHeader
+from plenum.bench.sim import SimPool
+from plenum.common.clock import VirtualClock, systemClock
+from plenum.common.sim_stack import SimNetwork
+from plenum.common.util import getlogger
+
+logger = getlogger()
+
+POOL_SIZES = (4, 7, 10, 13, 19)
+REQUEST_SIZES = (0, 1024)
+CLIENT_COUNTS = (1, 4)
+
+# Metrics compared between reports, and whether a higher value is better
+COMPARED_METRICS = OrderedDict([
+    ("throughput", True),
+    ("latencyMs.p50", False),
+    ("latencyMs.p99", False),
+    ("msgsPerReq", False),
+    ("bytesPerReq", False),
+    ("nodeTimeMs.mean", False),
+])
+
+
+def paddedOperation(size: int, rng: random.Random=random):
+    """
+    Return a callable making operations padded with `size` bytes of data.
+
+    :param rng: the source of the operations' random amounts
+    """
+    def operation():
+        op = LoadGenerator.randomOperation(rng)
+        if size:
+            op["data"] = "x" * size
+        return op
+    return operation
+
+
+def runCase(poolSize: int,
+            clientCount: int,
+            requestSize: int,
+            concurrency: int=None,
+            duration: float=5,
+            drain: float=10,
+            realTime: bool=False,
+            latency: float=0.001,
+            bandwidth: float=None,
+            seed: int=0) -> OrderedDict:
+    """
+    Run closed loop load against a simulated pool and return its results.
+
+    :param poolSize: number of nodes
+    :param clientCount: number of clients
+    :param requestSize: bytes of padding in each request's operation
+    :param concurrency: requests outstanding across all clients; two per
+        client by default
+    :param duration: seconds to send requests for
+    :param drain: seconds to wait for replies after sending
+    :param realTime: run by the system clock rather than a virtual one
+    :param latency: latency of every link, in seconds
+    :param bandwidth: bandwidth of every link, in bytes per second
+    :param seed: seed for the random numbers of the pool and network
+    """
+    concurrency = concurrency or 2 * clientCount
+    network = SimNetwork(clock=systemClock if realTime else VirtualClock(),
+                         seed=seed, latency=latency, bandwidth=bandwidth)
+    with TemporaryDirectory() as tmpdir:
+        with SimPool(poolSize, tmpdir, network=network, seed=seed) as pool:
+            if realTime:
+                pool.looper.pollInterval = 0.001
+            pool.runUntil(pool.isReady, timeout=120)
+            clients = [pool.newClient() for _ in range(clientCount)]
+            generator = LoadGenerator(pool.looper, clients,
+                                      concurrency=concurrency,
+                                      duration=duration,
+                                      drain=drain,
+                                      operation=paddedOperation(requestSize,
+                                                                pool.newRandom()))
+            pool.looper.run(generator.waitForConnections())
+
+            stats = dict(network.stats)
+            pool.looper.prodTimings.reset()
+            pool.looper.run(generator.run())
+            load = generator.report()
+
+            ordered = load["confirmed"]
+            msgs = network.stats["delivered"] - stats["delivered"]
+            sentBytes = network.stats["bytes"] - stats["bytes"]
+            nodeTimes = [pool.looper.prodTimings[name].total
+                         for name in pool.nodes]
+    return OrderedDict([
+        ("poolSize", poolSize),
+        ("clients", clientCount),
+        ("requestSize", requestSize),
+        ("concurrency", concurrency),
+        ("sent", load["sent"]),
+        ("ordered", ordered),
+        ("throughput", load["throughput"]),
+        ("latencyMs", OrderedDict((k, load["replyLatencyMs"].get(k))
+                                  for k in ("p50", "p99", "max"))),
+        ("msgsPerReq", round(msgs / ordered, 3) if ordered else None),
+        ("bytesPerReq", round(sentBytes / ordered) if ordered else None),
+        ("nodeTimeMs", OrderedDict([
+            ("mean", round(sum(nodeTimes) / len(nodeTimes) * 1000, 3)),
+            ("max", round(max(nodeTimes) * 1000, 3))])),
+    ])
+
+
+def runMatrix(poolSizes: Sequence[int]=POOL_SIZES,
+              requestSizes: Sequence[int]=REQUEST_SIZES,
+              clientCounts: Sequence[int]=CLIENT_COUNTS,
+              **kwargs) -> OrderedDict:
+    """
+    Run `runCase` for every combination of pool size, request size and
+    client count and return the report.
+
+    :param kwargs: passed on to `runCase`
+    """
+    results = []
+    for poolSize, requestSize, clientCount in \
+            product(poolSizes, requestSizes, clientCounts):
+        logger.info("benchmarking a pool of {} nodes with {} clients sending "
+                    "requests of {} bytes".
+                    format(poolSize, clientCount, requestSize),
+                    extra={"cli": False})
+        results.append(runCase(poolSize, clientCount, requestSize, **kwargs))
+    report = reportHeader()
+    report["params"] = OrderedDict(sorted(kwargs.items()))
+    report["results"] = results
+    return report
+
+
+def caseKey(result: Dict[str, Any]) -> OrderedDict:
+    return OrderedDict((k, result[k])
+                       for k in ("poolSize", "clients", "requestSize"))
+
+
+def compareReports(baseline: Dict[str, Any], current: Dict[str, Any],
+                   tolerance: float=0.1) -> List[OrderedDict]:
+    """
+    Compare the results of the cases that are in both reports.
+
+    :param tolerance: the fraction by which a metric can get worse before
+        it is a regression
+    :return: a row per case and metric with both values, the relative
+        change and whether it is a regression
+    """
+    return compareMetrics(baseline, current, caseKey, COMPARED_METRICS,
+                          tolerance)
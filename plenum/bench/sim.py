@@ -0,0 +1,182 @@
+"""
+Pools of nodes and clients on a simulated network, run by a Looper on the
+network's virtual clock. A pool of tens of nodes runs in one process, and
+the same seed gives the same run (see `plenum.common.sim_stack`).
+
+Processing takes no virtual time, so virtual latencies are those of the
+protocol and the network alone; the real time each node spends is in the
+Looper's `prodTimings`.
+"""
+
+import random
+from collections import OrderedDict
+from copy import copy
+from hashlib import sha256
+from typing import Callable, Dict, List, Sequence
+
+from plenum.bench.load import BenchClient
+from plenum.client.signer import SimpleSigner
+from plenum.common.looper import Looper
+from plenum.common.raet import initLocalKeep
+from plenum.common.sim_stack import SimNetwork
+from plenum.common.types import CLIENT_STACK_SUFFIX, HA, NodeDetail
+from plenum.common.util import getlogger
+from plenum.server.node import Node
+
+logger = getlogger()
+
+
+class SimNode(Node):
+    """
+    A node whose stacks are on a `SimNetwork` and which keeps time by the
+    network's clock.
+    """
+
+    def __init__(self, *args, network: SimNetwork, **kwargs):
+        self.network = network
+        super().__init__(*args, clock=network.clock, **kwargs)
+
+    def stackType(self):
+        return self.network
+
+
+class SimClient(BenchClient):
+    """
+    A client whose stack is on a `SimNetwork`.
+    """
+
+    def __init__(self, *args, network: SimNetwork, **kwargs):
+        self.network = network
+        super().__init__(*args, clock=network.clock, **kwargs)
+
+    def stackType(self):
+        return self.network
+
+
+def simNodeReg(count: int=None,
+               names: Sequence[str]=None) -> Dict[str, NodeDetail]:
+    """
+    A registry of `count` nodes, or of the nodes named `names`, with
+    addresses on a simulated network.
+    """
+    names = names or ["Node{}".format(i) for i in range(1, count + 1)]
+    return OrderedDict(
+        (name, NodeDetail(HA("sim", 2 * i), name + CLIENT_STACK_SUFFIX,
+                          HA("sim", 2 * i + 1)))
+        for i, name in enumerate(names, 1))
+
+
+def seedFor(name: str, purpose: str) -> bytes:
+    return sha256("{}:{}".format(name, purpose).encode()).digest()
+
+
+class SimPool:
+    """
+    A pool of nodes on a simulated network and the Looper that runs them.
+    """
+
+    def __init__(self,
+                 count: int,
+                 basedirpath: str,
+                 network: SimNetwork=None,
+                 seed: int=0,
+                 nodeClass=SimNode,
+                 clientClass=SimClient):
+        """
+        :param count: number of nodes
+        :param basedirpath: directory for the nodes' keys and ledgers
+        :param network: the network to put the nodes on; by default one with
+            the default link characteristics, seeded with `seed`
+        :param seed: seed for the random numbers of the nodes and network
+        """
+        self.random = random.Random(seed)
+        self.network = network or SimNetwork(seed=seed)
+        self.clock = self.network.clock
+        self.basedirpath = basedirpath
+        self.clientClass = clientClass
+        self.nodeReg = simNodeReg(count)
+        self.nodes = OrderedDict()  # type: Dict[str, SimNode]
+        for name in self.nodeReg:
+            initLocalKeep(name, basedirpath, seedFor(name, "pk"),
+                          seedFor(name, "sig"), override=True)
+            self.nodes[name] = nodeClass(name,
+                                         nodeRegistry=copy(self.nodeReg),
+                                         basedirpath=basedirpath,
+                                         network=self.network,
+                                         rng=self.newRandom())
+        self.clients = []  # type: List[SimClient]
+        self.looper = Looper(list(self.nodes.values()), clock=self.clock,
+                             eventDriven=False)
+        for node in self.nodes.values():
+            node.startKeySharing()
+
+    def newRandom(self) -> random.Random:
+        """
+        A source of random numbers for a node or client of the pool, seeded
+        from the pool's so that it is the same in every run with the seed.
+        """
+        return random.Random(self.random.getrandbits(64))
+
+    def cliNodeReg(self) -> Dict[str, HA]:
+        return OrderedDict((d.cliname, d.cliha)
+                           for d in self.nodeReg.values())
+
+    def newClient(self) -> SimClient:
+        """
+        Create a client on the network, make its key known to the nodes and
+        add it to the Looper.
+        """
+        name = "client{}".format(len(self.clients) + 1)
+        signer = SimpleSigner(name, seedFor(name, "sig"))
+        client = self.clientClass(name,
+                                  nodeReg=self.cliNodeReg(),
+                                  ha=HA("sim", 100000 + len(self.clients)),
+                                  signer=signer,
+                                  network=self.network,
+                                  rng=self.newRandom())
+        for node in self.nodes.values():
+            node.clientAuthNr.addClient(signer.identifier, signer.verkey)
+        self.looper.add(client)
+        self.clients.append(client)
+        return client
+
+    def runUntil(self, condition: Callable[[], bool],
+                 timeout: float=60) -> float:
+        """
+        Run the pool until `condition` holds.
+
+        :param timeout: virtual seconds after which to give up
+        :return: the virtual seconds it took
+        :raises: TimeoutError
+        """
+        start = self.clock.now()
+
+        async def wait():
+            while not condition():
+                if self.clock.now() - start > timeout:
+                    raise TimeoutError("condition not met within {} virtual "
+                                       "seconds".format(timeout))
+                await self.looper.sleep(self.looper.pollInterval)
+
+        self.looper.run(wait())
+        return self.clock.now() - start
+
+    def isReady(self) -> bool:
+        """
+        Whether every node is connected to all others and every replica knows
+        its primary.
+        """
+        return all(node.isReady() and
+                   len(node.conns) == len(self.nodes) - 1 and
+                   all(r.primaryName for r in node.replicas)
+                   for node in self.nodes.values())
+
+    def close(self) -> None:
+        self.looper.shutdownSync()
+
+    def __enter__(self):
+        return self
+
+    # noinspection PyUnusedLocal
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
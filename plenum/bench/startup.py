@@ -0,0 +1,129 @@
+"""
+Benchmark of how long a node takes to start: importing the node and the CLI
+modules, constructing a node, and the node's first `prod` after it starts.
+
+Imports are timed in fresh interpreters, as a module is imported only once
+per process; the best of several runs is reported, along with the modules
+that took longest to import as per `python -X importtime`. The node is one
+of a pool on a simulated network (see `plenum.bench.sim`), so that no ports
+are opened, and its peers are not started.
+"""
+
+import asyncio
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+from copy import copy
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Sequence
+
+from plenum.bench.report import reportHeader
+from plenum.bench.sim import SimNode, seedFor, simNodeReg
+from plenum.common.raet import initLocalKeep
+from plenum.common.sim_stack import SimNetwork
+from plenum.common.util import getlogger
+
+logger = getlogger()
+
+# Modules whose import starts a node and the CLI
+STARTUP_MODULES = ("plenum.server.node", "plenum.cli.cli")
+
+_TIME_IMPORT = ("import time; started = time.perf_counter(); import {}; "
+                "print(time.perf_counter() - started)")
+
+
+def timeImport(module: str, repeat: int=3) -> float:
+    """
+    The best time, in seconds, a fresh interpreter took to import `module`,
+    not counting the interpreter's own start.
+    """
+    times = []
+    for _ in range(repeat):
+        out = subprocess.check_output(
+            [sys.executable, "-c", _TIME_IMPORT.format(module)],
+            universal_newlines=True)
+        times.append(float(out.strip().splitlines()[-1]))
+    return min(times)
+
+
+def slowestImports(module: str, top: int=10) -> List[OrderedDict]:
+    """
+    The modules that took longest to import, including the modules they
+    imported, when a fresh interpreter imported `module`.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                           "import {}".format(module)],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        rows.append(OrderedDict([("module", parts[2].strip()),
+                                 ("selfMs", int(parts[0]) / 1000),
+                                 ("cumulativeMs", int(parts[1]) / 1000)]))
+    rows.sort(key=lambda r: r["cumulativeMs"], reverse=True)
+    return rows[:top]
+
+
+def timeNodeStart(basedirpath: str, name: str="Node1",
+                  count: int=4) -> Dict[str, float]:
+    """
+    Construct a node of a pool of `count`, start it and prod it once.
+
+    :return: the seconds taken by each
+    """
+    network = SimNetwork()
+    nodeReg = simNodeReg(count)
+    initLocalKeep(name, basedirpath, seedFor(name, "pk"),
+                  seedFor(name, "sig"), override=True)
+    loop = asyncio.new_event_loop()
+    try:
+        started = time.perf_counter()
+        node = SimNode(name, nodeRegistry=copy(nodeReg),
+                       basedirpath=basedirpath, network=network)
+        constructed = time.perf_counter()
+        node.start(loop)
+        nodeStarted = time.perf_counter()
+        loop.run_until_complete(node.prod())
+        prodded = time.perf_counter()
+        node.stop()
+    finally:
+        loop.close()
+    return OrderedDict([("nodeInit", round(constructed - started, 6)),
+                        ("nodeStart", round(nodeStarted - constructed, 6)),
+                        ("firstProd", round(prodded - nodeStarted, 6))])
+
+
+def runStartup(modules: Sequence[str]=STARTUP_MODULES,
+               repeat: int=3,
+               top: int=10) -> OrderedDict:
+    """
+    Run the startup benchmark and return the report.
+
+    :param modules: the modules whose import is timed
+    :param repeat: number of runs of each measurement; the best is reported
+    :param top: number of slowest imports reported per module
+    """
+    imports = OrderedDict()
+    for module in modules:
+        logger.info("timing the import of {}".format(module),
+                    extra={"cli": False})
+        imports[module] = OrderedDict([
+            ("seconds", round(timeImport(module, repeat), 6)),
+            ("slowest", slowestImports(module, top))])
+    runs = []
+    for _ in range(repeat):
+        with TemporaryDirectory() as tmpdir:
+            runs.append(timeNodeStart(tmpdir))
+    node = OrderedDict((k, min(r[k] for r in runs)) for k in runs[0])
+    report = reportHeader()
+    report["params"] = OrderedDict([("repeat", repeat)])
+    report["imports"] = imports
+    report["node"] = node
+    return report
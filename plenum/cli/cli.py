@@ -3,7 +3,7 @@ from __future__ import unicode_literals
 # noinspection PyUnresolvedReferences
 import plenum.cli.ensure_logging_not_setup
 
-from typing import Dict
+from typing import Dict, List, Tuple
 
 import re
 from prompt_toolkit.utils import is_windows, is_conemu_ansi
@@ -20,6 +20,7 @@ import configparser
 import os
 from configparser import ConfigParser
 
+import asyncio
 import time
 import ast
 
@@ -42,6 +43,7 @@ from prompt_toolkit.styles import PygmentsStyle
 from prompt_toolkit.terminal.vt100_output import Vt100_Output
 from pygments.token import Token
 from plenum.client.client import Client
+from plenum.cli.perf_view import perfLines
 from plenum.common.util import setupLogging, getlogger, CliHandler, \
     TRACE_LOG_LEVEL, getMaxFailures, checkPortAvailable
 from plenum.server.node import Node
@@ -93,9 +95,15 @@ class Cli:
         # To store the nodes created
         self.nodes = {}
         self.externalClientKeys = {}  # type: Dict[str,str]
+        # The node whose live performance view is shown and the timer of the
+        # view's next refresh
+        self.perfView = None  # type: Tuple[str, asyncio.TimerHandle]
+        # Lines printed last by `printInPlace`, if nothing was printed since
+        self.linesInPlace = 0
 
         self.cliCmds = {'status', 'new'}
-        self.nodeCmds = self.cliCmds | {'keyshare'}
+        self.nodeCmds = self.cliCmds | {'keyshare', 'timings', 'memory',
+                                        'snapshot', 'profile', 'perf'}
         self.helpablesCommands = self.cliCmds | self.nodeCmds
         self.simpleCmds = {'status', 'exit', 'quit', 'license'}
         self.commands = {'list', 'help'} | self.simpleCmds
@@ -273,6 +281,34 @@ class Cli:
         def statusNodeHelper():
             self.print("It is used to check status of a created node")
 
+        def timingsNodeHelper():
+            self.print("""Shows where a node spends its time: per phase of the
+                     node and per node in the looper, along with the loop lag
+                     Usage: timings node <nodeName>""")
+
+        def memoryNodeHelper():
+            self.print("""Shows the number of elements in and the approximate
+                     bytes taken by each structure a node keeps
+                     Usage: memory node <nodeName>""")
+
+        def snapshotNodeHelper():
+            self.print("""Dumps a heap snapshot taken with tracemalloc and shows
+                     the lines of code that allocated most memory since the
+                     previous snapshot. The first use starts tracing
+                     Usage: snapshot node <nodeName>""")
+
+        def profileNodeHelper():
+            self.print("""Switches profiling of a node on, or off and shows where
+                     the profile was written. See profileMode in the config
+                     Usage: profile node <nodeName>""")
+
+        def perfNodeHelper():
+            self.print("""Shows the throughput, ordering latency percentiles per
+                     instance, queue depths, signature verifications and
+                     ledger appends of a node, refreshed in place every
+                     perfRefreshInterval seconds. Run it again to stop
+                     Usage: perf node <nodeName>""")
+
         def statusClientHelper():
             self.print("It is used to check status of a created client")
 
@@ -321,6 +357,11 @@ class Cli:
             'newclient': clientHelper,
             'statusnode': statusNodeHelper,
             'statusclient': statusClientHelper,
+            'timingsnode': timingsNodeHelper,
+            'memorynode': memoryNodeHelper,
+            'snapshotnode': snapshotNodeHelper,
+            'profilenode': profileNodeHelper,
+            'perfnode': perfNodeHelper,
             'license': licenseHelper,
             'send': sendHelper,
             'show': showHelper,
@@ -331,6 +372,7 @@ class Cli:
         return defaultdict(lambda: defaultHelper, **mappings)
 
     def print(self, msg, token=None, newline=True):
+        self.linesInPlace = 0
         if newline:
             msg += "\n"
         part = partial(self.cli.print_tokens, [(token, msg)])
@@ -339,6 +381,22 @@ class Cli:
         else:
             self.cli.run_in_terminal(part)
 
+    def printInPlace(self, lines: List[str]):
+        """
+        Print lines over those printed by the previous call, if nothing was
+        printed or entered since.
+        """
+        shown = self.linesInPlace
+        if self.debug or not shown:
+            self.print("\n".join(lines))
+        else:
+            def part():
+                self.cli.output.cursor_up(shown)
+                self.cli.output.erase_down()
+                self.cli.print_tokens([(Token, "\n".join(lines) + "\n")])
+            self.cli.run_in_terminal(part)
+        self.linesInPlace = len(lines)
+
     def printVoid(self):
         self.print(self.voidMsg)
 
@@ -371,6 +429,7 @@ Commands:
     keyshare - manually starts key sharing of a node
     status - Shows general status of the sandbox
     status <node_name>|<client_name> - Shows specific status
+    perf node <node_name> - Shows live performance of a node
     list - Shows the list of commands you can run
     license - Show the license
     exit - exit the command-line interface ('quit' also works)""".
@@ -570,6 +629,100 @@ Commands:
             self.print("    Verification key: {}".format(client.getSigner().verkey))
             self.print("    Submissions: {}".format(client.lastReqId))
 
+    def printTimings(self, title, metrics):
+        self.print("    {}:".format(title))
+        if not metrics:
+            self.printVoid()
+        for name, summary in metrics:
+            self.print("        {}: {}".format(name, ", ".join(
+                "{} {}".format(k, v) for k, v in summary.items())))
+
+    def timingsNode(self, nodeName):
+        if nodeName == "all":
+            for nm in self.nodes:
+                self.timingsNode(nm)
+            return
+        if nodeName not in self.nodes:
+            self.print("Node {} not found".format(nodeName), Token.Error)
+        else:
+            self.print("\n    Name: " + nodeName)
+            node = self.nodes[nodeName]  # type: Node
+            self.printTimings("Phases (seconds)",
+                              node.phaseTimings.metrics())
+            prodTiming = self.looper.prodTimings.get(node.name)
+            if prodTiming:
+                self.printTimings("Looper (seconds)",
+                                  [("prod", prodTiming.summary()),
+                                   ("loop lag",
+                                    self.looper.loopLag.summary())])
+
+    def memoryNode(self, nodeName):
+        if nodeName == "all":
+            for nm in self.nodes:
+                self.memoryNode(nm)
+            return
+        if nodeName not in self.nodes:
+            self.print("Node {} not found".format(nodeName), Token.Error)
+        else:
+            self.print("\n    Name: " + nodeName)
+            node = self.nodes[nodeName]  # type: Node
+            for name, usage in node.memoryUsage().items():
+                self.print("        {}: {} elements, {} bytes".
+                           format(name, usage["count"], usage["bytes"]))
+
+    def snapshotNode(self, nodeName):
+        if nodeName not in self.nodes:
+            self.print("Node {} not found".format(nodeName), Token.Error)
+            return
+        node = self.nodes[nodeName]  # type: Node
+        snapshot = node.dumpHeapSnapshot()
+        if snapshot is None:
+            self.print("Started tracing memory allocations; take a snapshot "
+                       "again once {} has run for a while".format(nodeName))
+            return
+        path, stats = snapshot
+        self.print("Heap snapshot dumped to {}".format(path))
+        for line in stats:
+            self.print("    {}".format(line))
+
+    def profileNode(self, nodeName):
+        if nodeName not in self.nodes:
+            self.print("Node {} not found".format(nodeName), Token.Error)
+            return
+        node = self.nodes[nodeName]  # type: Node
+        path = node.toggleProfiling()
+        if path:
+            self.print("Profile of {} written to {}".format(nodeName, path))
+        elif node.profiler:
+            self.print("Profiling {}; run the command again to stop".
+                       format(nodeName))
+
+    def perfNode(self, nodeName):
+        if nodeName not in self.nodes:
+            self.print("Node {} not found".format(nodeName), Token.Error)
+            return
+        if self.perfView:
+            shown, handle = self.perfView
+            handle.cancel()
+            self.perfView = None
+            if shown == nodeName:
+                self.print("Stopped the performance view of {}".
+                           format(nodeName))
+                return
+        self.refreshPerfView(nodeName)
+
+    def refreshPerfView(self, nodeName, previous=None):
+        node = self.nodes.get(nodeName)  # type: Node
+        if node is None:
+            self.perfView = None
+            return
+        snapshot = node.perfSnapshot()
+        self.printInPlace(perfLines(nodeName, previous, snapshot))
+        handle = self.looper.loop.call_later(
+            node.config.perfRefreshInterval, self.refreshPerfView, nodeName,
+            snapshot)
+        self.perfView = (nodeName, handle)
+
     def statusNode(self, nodeName):
         if nodeName == "all":
             for nm in self.nodes:
@@ -754,6 +907,36 @@ Commands:
             self.statusNode(node)
             return True
 
+    def _timingsNodeAction(self, matchedVars):
+        if matchedVars.get('node_command') == 'timings':
+            node = matchedVars.get('node_name')
+            self.timingsNode(node)
+            return True
+
+    def _memoryNodeAction(self, matchedVars):
+        if matchedVars.get('node_command') == 'memory':
+            node = matchedVars.get('node_name')
+            self.memoryNode(node)
+            return True
+
+    def _snapshotNodeAction(self, matchedVars):
+        if matchedVars.get('node_command') == 'snapshot':
+            node = matchedVars.get('node_name')
+            self.snapshotNode(node)
+            return True
+
+    def _profileNodeAction(self, matchedVars):
+        if matchedVars.get('node_command') == 'profile':
+            node = matchedVars.get('node_name')
+            self.profileNode(node)
+            return True
+
+    def _perfNodeAction(self, matchedVars):
+        if matchedVars.get('node_command') == 'perf':
+            node = matchedVars.get('node_name')
+            self.perfNode(node)
+            return True
+
     def _statusClientAction(self, matchedVars):
         if matchedVars.get('client_command') == 'status':
             client = matchedVars.get('client_name')
@@ -834,10 +1017,15 @@ Commands:
         return [self._simpleAction, self._helpAction, self._listAction,
                 self._newNodeAction, self._newClientAction,
                 self._statusNodeAction, self._statusClientAction,
+                self._timingsNodeAction, self._memoryNodeAction,
+                self._snapshotNodeAction, self._profileNodeAction,
+                self._perfNodeAction,
                 self._keyShareAction, self._loadPluginDirAction,
                 self._clientCommand, self._loadPluginAction, self._addKeyAction]
 
     def parse(self, cmdText):
+        # the entered command is shown under any view printed in place
+        self.linesInPlace = 0
         m = self.grammar.match(cmdText)
         if m:
             matchedVars = m.variables()
@@ -0,0 +1,79 @@
+"""
+Rendering of the live performance view of a node, from two consecutive
+snapshots taken with `Node.perfSnapshot`.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+def _rate(previous: float, current: float, seconds: float) -> Optional[float]:
+    return (current - previous) / seconds if seconds > 0 else None
+
+
+def _fmt(value: Any, digits: int=3) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return str(round(value, digits))
+    return str(value)
+
+
+def perfRates(previous: Dict[str, Any],
+              current: Dict[str, Any]) -> OrderedDict:
+    """
+    Return the requests ordered per second by each protocol instance and the
+    signatures verified per second between two snapshots.
+
+    :param previous: the earlier snapshot, or None when there is only one
+    :param current: the later snapshot
+    """
+    if previous is None:
+        return OrderedDict([("ordered", OrderedDict(
+            (i, None) for i in current["ordered"])),
+                            ("signatures verified", None)])
+    seconds = current["time"] - previous["time"]
+    return OrderedDict([
+        ("ordered", OrderedDict(
+            (i, _rate(previous["ordered"].get(i, 0), n, seconds))
+            for i, n in current["ordered"].items())),
+        ("signatures verified", _rate(previous["signatures verified"],
+                                      current["signatures verified"],
+                                      seconds))])
+
+
+def perfLines(name: str, previous: Dict[str, Any],
+              current: Dict[str, Any]) -> List[str]:
+    """
+    Return the lines of the performance view of the node named `name`.
+
+    :param previous: the snapshot shown last time, or None
+    :param current: the snapshot to show
+    """
+    rates = perfRates(previous, current)
+    lines = ["    Performance of {} (master instance {})".
+             format(name, _fmt(current["master"])),
+             "        instance  ordered  req/s  throughput  "
+             "p50 (s)  p90 (s)  p99 (s)"]
+    for i, ordered in current["ordered"].items():
+        latency = current["latency"].get(i, {})
+        lines.append("        {:>8}  {:>7}  {:>5}  {:>10}  {:>7}  {:>7}  {:>7}".
+                     format(i, ordered, _fmt(rates["ordered"][i], 1),
+                            _fmt(current["throughput"][i]),
+                            _fmt(latency.get(50)), _fmt(latency.get(90)),
+                            _fmt(latency.get(99))))
+    lines.append("        master throughput ratio: {}".
+                 format(_fmt(current["master throughput ratio"])))
+    lines.append("        queues: {}".format(", ".join(
+        "{} {}".format(q, n) for q, n in current["queues"].items())))
+    sigs = current["signature verification"]
+    lines.append("        signatures: {} verified, {}/s, mean {} ms".
+                 format(current["signatures verified"],
+                        _fmt(rates["signatures verified"], 1),
+                        _fmt(sigs["mean"] * 1000)))
+    appends = current["ledger appends"]
+    lines.append("        ledger appends: {}, mean {} ms, p99 {} ms, "
+                 "max {} ms".format(appends["count"],
+                                    _fmt(appends["mean"] * 1000),
+                                    _fmt(appends["p99"] * 1000),
+                                    _fmt(appends["max"] * 1000)))
+    return lines
@@ -3,10 +3,11 @@ A client in an RBFT system.
 Client sends requests to each of the nodes,
 and receives result of the request execution from nodes.
 """
+import asyncio
 import base64
 import json
 import logging
-import time
+import random
 from collections import deque, OrderedDict, namedtuple
 from typing import List, Union, Dict, Optional, Mapping, Tuple, Set
 
@@ -16,16 +17,57 @@ from ledger.merkle_verifier import MerkleVerifier
 from ledger.serializers.json_serializer import JsonSerializer
 from ledger.util import F
 from plenum.client.signer import Signer, SimpleSigner
+from plenum.common.clock import Clock, systemClock
 from plenum.common.motor import Motor
 from plenum.common.stacked import NodeStacked
 from plenum.common.startable import Status
 from plenum.common.txn import REPLY
 from plenum.common.types import Request, Reply, OP_FIELD_NAME, f, HA
-from plenum.common.util import getMaxFailures, getlogger
+from plenum.common.util import getMaxFailures, getlogger, getConfig
 
 logger = getlogger()
 
 
+class ReplyTally:
+    """
+    The replies received from nodes for one request, with the number of
+    nodes that replied with each distinct result.
+    """
+
+    def __init__(self):
+        self.replies = {}  # type: Dict[str, Dict]
+        # node name -> serialized result, to find the count a reply added to
+        self.resultKeys = {}  # type: Dict[str, str]
+        # serialized result -> number of nodes that replied with it
+        self.counts = {}  # type: Dict[str, int]
+        # the result f+1 nodes agreed upon, if any
+        self.consensus = None
+        self.future = None  # type: asyncio.Future
+
+    def add(self, frm: str, reply: Dict, quorum: int) -> bool:
+        """
+        Record the reply of a node, replacing any earlier reply from it.
+
+        :param quorum: the number of matching results needed for consensus
+        :return: whether this reply brought the request to consensus
+        """
+        key = json.dumps(reply[f.RESULT.nm], sort_keys=True)
+        old = self.resultKeys.get(frm)
+        if old is not None:
+            self.counts[old] -= 1
+            if not self.counts[old]:
+                del self.counts[old]
+        self.replies[frm] = reply
+        self.resultKeys[frm] = key
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if self.consensus is None and self.counts[key] >= quorum:
+            self.consensus = reply[f.RESULT.nm]
+            if self.future and not self.future.done():
+                self.future.set_result(self.consensus)
+            return True
+        return False
+
+
 class Client(NodeStacked, Motor):
 
     def __init__(self,
@@ -35,7 +77,9 @@ class Client(NodeStacked, Motor):
                  lastReqId: int = 0,
                  signer: Signer=None,
                  signers: Dict[str, Signer]=None,
-                 basedirpath: str=None):
+                 basedirpath: str=None,
+                 clock: Clock=None,
+                 rng: random.Random=None):
         """
         Creates a new client.
 
@@ -46,6 +90,9 @@ class Client(NodeStacked, Motor):
         :param signer: Signer; mutually exclusive of signers
         :param signers: Dict of identifier -> Signer; useful for clients that
             need to support multiple signers
+        :param clock: the clock used for connection retries; the system clock
+            by default
+        :param rng: the source of the jitter of connection retries
         """
         self.lastReqId = lastReqId
         self._clientStack = None
@@ -70,10 +117,13 @@ class Client(NodeStacked, Motor):
         if basedirpath:
             stackargs['basedirpath'] = basedirpath
 
-        self.created = time.perf_counter()
+        clock = clock or systemClock
+        self.created = clock.now()
         NodeStacked.__init__(self,
                              stackParams=stackargs,
-                             nodeReg=nodeReg)
+                             nodeReg=nodeReg,
+                             clock=clock,
+                             rng=rng)
         logger.info("Client initialized with the following node registry:")
         lengths = [max(x) for x in zip(*[
             (len(name), len(host), len(str(port)))
@@ -85,7 +135,19 @@ class Client(NodeStacked, Motor):
 
         Motor.__init__(self)
 
-        self.inBox = deque()
+        config = getConfig()
+        self.inBox = deque(maxlen=config.clientInBoxMaxLen)
+
+        # replies received for each request, by request id
+        self.replyTallies = {}  # type: Dict[int, ReplyTally]
+        # ids of requests that reached consensus, oldest first; only the
+        # latest `retainedReplies` of them are kept in `replyTallies`
+        self.confirmedReqIds = deque()
+        self.retainedReplies = config.clientRetainedReplies
+        # ids of requests in `replyTallies` that have not reached consensus,
+        # oldest first, with when their tallies were created
+        self.unconfirmedReqIds = OrderedDict()  # type: Dict[int, float]
+        self.unconfirmedReplyTimeout = config.clientUnconfirmedReplyTimeout
 
         if signer and signers:
             raise ValueError("only one of 'signer' or 'signers' can be used")
@@ -130,8 +192,24 @@ class Client(NodeStacked, Motor):
         s = await self.nodestack.service(limit)
         await self.serviceLifecycle()
         self.flushOutBoxes()
+        if self.unconfirmedReqIds:
+            self.pruneUnconfirmed()
         return s
 
+    def nextWakeup(self) -> float:
+        """
+        The time by which this client needs to be prodded again.
+        """
+        if not self.nodestack:
+            return float('inf')
+        deadlines = [self.nodestack.nextWakeup(), self.nextFlush()]
+        if self.isGoing():
+            deadlines.append(self.nextCheck)
+        return min(deadlines)
+
+    def wakeupFds(self):
+        return [self.nodestack.fileno()] if self.nodestack else []
+
     def createRequest(self, operation: Mapping, identifier: str=None) -> Request:
         """
         Client creates request which include requested operation and request Id
@@ -172,16 +250,19 @@ class Client(NodeStacked, Motor):
         except KeyError:
             return None
 
-    def sign(self, msg: Dict, signer: Signer) -> Dict:
+    def sign(self, msg: Dict, signer: Signer, request: Request=None) -> Dict:
         """
         Signs the message if a signer is configured
 
         :param msg: Message to be signed
+        :param request: the Request `msg` is the state of, if it is one, so
+            that its serialization is signed rather than serializing `msg`
         :return: message
         """
         if f.SIG.nm not in msg or not msg[f.SIG.nm]:
             if signer:
-                msg[f.SIG.nm] = signer.sign(msg)
+                msg[f.SIG.nm] = signer.sign(request if request is not None
+                                            else msg)
             else:
                 logger.warning("{} signer not configured so not signing {}".
                                format(self, msg))
@@ -193,11 +274,72 @@ class Client(NodeStacked, Motor):
 
         :param wrappedMsg: Reply received by the client from the node
         """
+        if self.lastcheck:
+            self.remoteActive(wrappedMsg[1])
         self.inBox.append(wrappedMsg)
         msg, frm = wrappedMsg
         logger.debug("Client {} got msg from node {}: {}".
                      format(self.name, frm, msg),
                      extra={"cli": True})
+        if msg[OP_FIELD_NAME] == REPLY:
+            self.tallyReply(msg, frm)
+
+    def tallyReply(self, reply: Dict, frm: str) -> None:
+        """
+        Add a node's reply to the tally of its request, and prune the oldest
+        confirmed requests once more than `retainedReplies` are kept.
+        """
+        reqId = reply[f.RESULT.nm][f.REQ_ID.nm]
+        tally = self.getTally(reqId)
+        quorum = getMaxFailures(len(self.nodeReg)) + 1
+        if tally.add(frm, reply, quorum):
+            self.unconfirmedReqIds.pop(reqId, None)
+            self.confirmedReqIds.append(reqId)
+            while len(self.confirmedReqIds) > self.retainedReplies:
+                self.replyTallies.pop(self.confirmedReqIds.popleft(), None)
+
+    def replyFuture(self, reqId: int) -> asyncio.Future:
+        """
+        Return a future that resolves to the result of the request once f+1
+        nodes have replied with matching results.
+
+        :param reqId: Request Id
+        """
+        tally = self.getTally(reqId)
+        if tally.future is None:
+            tally.future = asyncio.Future()
+            if tally.consensus is not None:
+                tally.future.set_result(tally.consensus)
+        return tally.future
+
+    def getTally(self, reqId: int) -> ReplyTally:
+        """
+        Return the tally of a request, creating it if there is none, in
+        which case the oldest unconfirmed tallies may be pruned.
+        """
+        tally = self.replyTallies.get(reqId)
+        if tally is None:
+            tally = self.replyTallies[reqId] = ReplyTally()
+            self.unconfirmedReqIds[reqId] = self.clock.now()
+            self.pruneUnconfirmed()
+        return tally
+
+    def pruneUnconfirmed(self) -> None:
+        """
+        Drop the tallies of requests that have not reached consensus within
+        `unconfirmedReplyTimeout` seconds, and the oldest of them while more
+        than `retainedReplies` are kept, cancelling their futures.
+        """
+        expiry = self.clock.now() - self.unconfirmedReplyTimeout
+        while self.unconfirmedReqIds:
+            reqId, created = next(iter(self.unconfirmedReqIds.items()))
+            if created > expiry and \
+                    len(self.unconfirmedReqIds) <= self.retainedReplies:
+                break
+            del self.unconfirmedReqIds[reqId]
+            tally = self.replyTallies.pop(reqId, None)
+            if tally and tally.future and not tally.future.done():
+                tally.future.cancel()
 
     def _statusChanged(self, old, new):
         # do nothing for now
@@ -235,49 +377,26 @@ class Client(NodeStacked, Motor):
         :param reqId: Request ID
         :return: list of request results from all nodes
         """
-        return {frm: msg for msg, frm in self.inBox
-                if msg[OP_FIELD_NAME] == REPLY and
-                msg[f.RESULT.nm][f.REQ_ID.nm] == reqId}
+        tally = self.replyTallies.get(reqId)
+        return dict(tally.replies) if tally else {}
 
     def hasConsensus(self, reqId: int) -> Optional[str]:
         """
-        Accepts a request ID and returns True if consensus was reached
-        for the request or else False
+        Accepts a request ID and returns the result if f+1 nodes replied with
+        matching results for the request or else False
 
         :param reqId: Request ID
+        :raises: KeyError if no replies were received for the request
         """
-        replies = self.getRepliesFromAllNodes(reqId)
-        if not replies:
+        tally = self.replyTallies.get(reqId)
+        if not tally or not tally.replies:
             raise KeyError(reqId)  # NOT_FOUND
-        # Check if at least f+1 replies are received or not.
-        f = getMaxFailures(len(self.nodeReg))
-        if f + 1 > len(replies):
-            return False  # UNCONFIRMED
-        else:
-            onlyResults = {frm: reply['result'] for frm, reply in
-                           replies.items()}
-            resultsList = list(onlyResults.values())
-            # if all the elements in the resultList are equal - consensus
-            # is reached.
-            if all(result == resultsList[0] for result in resultsList):
-                return resultsList[0]  # CONFIRMED
-            else:
-                logging.error(
-                    "Received a different result from at least one of the nodes..")
-                # Now we need to know the counts of different results and so.
-                jsonResults = [json.dumps(result, sort_keys=True) for result in
-                               resultsList]
-                # counts dictionary for calculating the count of different
-                # results
-                counts = {}
-                for jresult in jsonResults:
-                    counts[jresult] = counts.get(jresult, 0) + 1
-                if counts[max(counts, key=counts.get)] > f + 1:
-                    # CONFIRMED, as f + 1 matching results found
-                    return json.loads(max(counts, key=counts.get))
-                else:
-                    # UNCONFIRMED, as f + 1 matching results are not found
-                    return False
+        if tally.consensus is not None:
+            return tally.consensus  # CONFIRMED
+        if len(tally.counts) > 1:
+            logging.error(
+                "Received a different result from at least one of the nodes..")
+        return False  # UNCONFIRMED
 
     def showReplyDetails(self, reqId: int):
         """
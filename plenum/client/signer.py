@@ -1,5 +1,5 @@
 from abc import abstractproperty, abstractmethod
-from typing import Mapping, Dict
+from typing import Mapping, Dict, Union
 
 from libnacl import randombytes
 from libnacl.encode import base64_encode
@@ -7,6 +7,7 @@ from raet.nacling import Signer as NaclSigner
 from raet.nacling import SigningKey
 
 from plenum.common.signing import serializeForSig
+from plenum.common.types import Request
 
 
 class Signer:
@@ -18,7 +19,7 @@ class Signer:
         raise NotImplementedError()
 
     @abstractmethod
-    def sign(self, msg: Dict) -> Dict:
+    def sign(self, msg: Union[Dict, Request]) -> Dict:
         raise NotImplementedError()
 
 
@@ -60,11 +61,15 @@ class SimpleSigner(Signer):
     def identifier(self) -> str:
         return self._identifier
 
-    def sign(self, msg: Dict) -> Dict:
+    def sign(self, msg: Union[Dict, Request]) -> Dict:
         """
-        Return a signature for the given message.
+        Return a signature for the given message. If the message is a
+        Request, its serialization is reused.
         """
-        ser = serializeForSig(msg)
+        if isinstance(msg, Request):
+            ser = msg.signingBytes
+        else:
+            ser = serializeForSig(msg)
         bsig = self.naclSigner.signature(ser)
         b64sig = base64_encode(bsig)
         sig = b64sig.decode('utf-8')
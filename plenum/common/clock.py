@@ -0,0 +1,75 @@
+"""
+Clocks that the Looper, action queues, monitor and replicas read the time
+from. The system clock is used normally; a virtual clock lets a simulation
+decide when time passes, so runs are repeatable and do not wait in real time.
+"""
+import time
+
+
+class Clock:
+    """
+    The system clock.
+    """
+
+    # whether time only passes when the clock is advanced
+    virtual = False
+
+    def now(self) -> float:
+        """
+        A monotonic time in seconds, used for timeouts and deadlines. Only the
+        difference between two values is meaningful.
+        """
+        return time.perf_counter()
+
+    def time(self) -> float:
+        """
+        The wall clock time in seconds since the epoch, used for timestamps
+        that are sent to other nodes.
+        """
+        return time.time()
+
+    def __repr__(self):
+        return "{}()".format(self.__class__.__name__)
+
+
+class VirtualClock(Clock):
+    """
+    A clock that stands still until it is advanced.
+    """
+
+    virtual = True
+
+    def __init__(self, start: float=0.0, epoch: float=1451606400.0):
+        """
+        :param start: the initial value of `now`
+        :param epoch: the value of `time` when `now` is 0
+        """
+        self._now = start
+        self.epoch = epoch
+
+    def now(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self.epoch + self._now
+
+    def advance(self, seconds: float) -> None:
+        """
+        Move the clock forward by the given number of seconds.
+        """
+        if seconds < 0:
+            raise ValueError("cannot move a clock backwards")
+        self._now += seconds
+
+    def advanceTo(self, t: float) -> None:
+        """
+        Move the clock forward to `t`; has no effect if `t` has passed.
+        """
+        if t > self._now:
+            self._now = t
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self._now)
+
+
+systemClock = Clock()
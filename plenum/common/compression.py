@@ -0,0 +1,95 @@
+"""
+Codecs for compressing the batches of messages nodes send each other.
+
+A node tells every node it connects to which codecs it can decode, and
+compresses batches to a node only with a codec that node named, so nodes
+without compression keep getting plain batches. More codecs can be added
+with `registerCodec`.
+"""
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+# codec name -> (compress, decompress), both returning bytes. decompress
+# takes the most bytes it may return as well as the bytes to decompress
+codecs = OrderedDict()  # type: Dict[str, Tuple[Callable, Callable]]
+
+
+def registerCodec(name: str,
+                  compress: Callable[[bytes], bytes],
+                  decompress: Callable[[bytes, int], bytes]) -> None:
+    """
+    Make a codec available for compressing batches.
+
+    :param name: the name by which nodes refer to the codec
+    :param compress: compresses bytes
+    :param decompress: decompresses what `compress` returns, raising
+        ValueError rather than returning more than the given number of bytes
+    """
+    codecs[name] = (compress, decompress)
+
+
+def codecNames() -> List[str]:
+    return list(codecs)
+
+
+def zlibDecompress(data: bytes, maxSize: int) -> bytes:
+    """
+    Decompress zlib data that decompresses to at most `maxSize` bytes.
+
+    :raises: ValueError if the data is not valid zlib data, is incomplete or
+        decompresses to more than `maxSize` bytes
+    """
+    decompressor = zlib.decompressobj()
+    try:
+        raw = decompressor.decompress(data, maxSize)
+    except zlib.error as ex:
+        raise ValueError(str(ex)) from ex
+    if decompressor.unconsumed_tail:
+        raise ValueError("decompresses to more than {} bytes"
+                         .format(maxSize))
+    if not decompressor.eof:
+        raise ValueError("incomplete compressed data")
+    return raw
+
+
+registerCodec("zlib", zlib.compress, zlibDecompress)
+
+
+class CompressionStats:
+    """
+    Counts of the batches compressed and the bytes they took before and
+    after compression.
+    """
+
+    def __init__(self):
+        self.batches = 0
+        self.rawBytes = 0
+        self.compressedBytes = 0
+        # batches that were not sent compressed because that did not make
+        # them smaller
+        self.incompressible = 0
+
+    def add(self, rawBytes: int, compressedBytes: int) -> None:
+        self.batches += 1
+        self.rawBytes += rawBytes
+        self.compressedBytes += compressedBytes
+
+    @property
+    def ratio(self) -> float:
+        """
+        Bytes before compression for each byte after it.
+        """
+        return self.rawBytes / self.compressedBytes \
+            if self.compressedBytes else None
+
+    def summary(self) -> Dict[str, Any]:
+        ratio = self.ratio
+        return OrderedDict([("batches", self.batches),
+                            ("rawBytes", self.rawBytes),
+                            ("compressedBytes", self.compressedBytes),
+                            ("ratio", round(ratio, 3) if ratio else None),
+                            ("incompressible", self.incompressible)])
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, dict(self.summary()))
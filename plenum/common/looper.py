@@ -5,10 +5,12 @@ import sys
 import time
 from asyncio import Task
 from asyncio.coroutines import CoroWrapper
-from typing import List
+from typing import List, Optional, Iterable
 
+from plenum.common.clock import Clock, systemClock
+from plenum.common.metrics import Histogram, Timings
 from plenum.common.startable import Status
-from plenum.common.util import getlogger
+from plenum.common.util import getlogger, getConfig
 
 logger = getlogger()
 
@@ -55,6 +57,21 @@ class Prodable:
         raise NotImplementedError("subclass {} should implement this method"
                                   .format(self))
 
+    def nextWakeup(self) -> Optional[float]:
+        """
+        The time (as per the Looper's clock, `time.perf_counter` by default)
+        by which this Prodable needs to be prodded again even if none of its file descriptors become readable.
+        Return 0 if it has pending work, infinity if it only needs to be
+        prodded on I/O, or None if it cannot tell, in which case it is polled.
+        """
+        return None
+
+    def wakeupFds(self) -> Iterable[int]:
+        """
+        File descriptors which, when readable, mean this Prodable has work.
+        """
+        return ()
+
 
 class Looper:
     """
@@ -65,7 +82,9 @@ class Looper:
                  prodables: List[Prodable]=None,
                  loop=None,
                  debug=False,
-                 autoStart=True):
+                 autoStart=True,
+                 eventDriven: bool=None,
+                 clock: Clock=None):
         """
         Initialize looper with an event loop.
 
@@ -73,10 +92,42 @@ class Looper:
         :param loop: the event loop to use
         :param debug: set_debug on event loop will be set to this value
         :param autoStart: start immediately?
+        :param eventDriven: when idle, wait for a prodable's file descriptor
+            to become readable or its next deadline instead of polling every
+            `pollInterval` seconds; defaults to the config's
+            `eventDrivenLooper`
+        :param clock: the clock deadlines are kept by; when it is virtual,
+            an idle Looper advances it to the next deadline instead of
+            waiting, so a simulation runs as fast as it can be computed. Its
+            Prodables must keep time by the same clock.
         """
         self.prodables = list(prodables) if prodables is not None \
             else []  # type: List[Prodable]
 
+        config = getConfig()
+        self.eventDriven = config.eventDrivenLooper if eventDriven is None \
+            else eventDriven
+        self.pollInterval = 0.01
+        # upper bound on an idle wait in event driven mode, so that timers
+        # internal to the stacks are still serviced
+        self.maxIdleWait = config.looperMaxIdleWait
+        self.wakeupEvent = None  # type: asyncio.Event
+        self.watchedFds = set()
+        self.clock = clock or systemClock
+        # ends of the coroutines sleeping by a virtual clock, which it must
+        # not be advanced past
+        self.sleepers = []  # type: List[float]
+
+        # time spent in each Prodable's `prod`, keyed by the Prodable's name;
+        # these measure the real time taken whatever the clock
+        self.prodTimings = Timings()
+        # duration of each turn, i.e. one `prod` of every Prodable
+        self.turnDurations = Histogram()
+        # how much later than asked for the event loop resumed an idle Looper
+        self.loopLag = Histogram()
+        # the Prodable that took longest in the last turn and how long it took
+        self.slowestProd = None
+
         if loop:
             self.loop = loop
         else:
@@ -113,10 +164,27 @@ class Looper:
         """
         limit = None
         s = 0
+        slowest = None
         for n in self.prodables:
+            start = time.perf_counter()
             s += await n.prod(limit)
+            dur = time.perf_counter() - start
+            name = self.prodableName(n)
+            self.prodTimings.add(name, dur)
+            if slowest is None or dur > slowest[1]:
+                slowest = name, dur
+        self.slowestProd = slowest
         return s
 
+    @staticmethod
+    def prodableName(prodable: Prodable) -> str:
+        """
+        The name of a Prodable, whether it has a `name` attribute or, as
+        `Prodable` declares, a `name()` method
+        """
+        name = prodable.name
+        return name() if callable(name) else name
+
     def add(self, prodable: Prodable) -> None:
         """
         Add one Prodable object to this Looper's list of Prodables
@@ -142,18 +210,135 @@ class Looper:
         """
         Execute `runOnce` with a small tolerance of 0.01 seconds so that the Prodables
         can complete their other asynchronous tasks not running on the event-loop.
+        In event driven mode, wait until there is work instead.
         """
         start = time.perf_counter()
         msgsProcessed = await self.prodAllOnce()
         if msgsProcessed == 0:
-            await asyncio.sleep(0.01)  # if no let other stuff run
+            if self.clock.virtual:
+                self.advanceClock()
+                await asyncio.sleep(0)  # let other stuff run
+            elif self.eventDriven:
+                await self.waitForWork()
+            else:
+                # if no let other stuff run
+                slept = time.perf_counter()
+                await asyncio.sleep(self.pollInterval)
+                self.loopLag.add(max(0.0, time.perf_counter() - slept -
+                                     self.pollInterval))
         dur = time.perf_counter() - start
+        self.turnDurations.add(dur)
         if dur >= 0.5:
-            logger.warning("it took {:.3f} seconds to run once nicely".
+            logger.warning("it took {:.3f} seconds to run once nicely; {} "
+                           "took {:.3f} seconds".
+                           format(dur, *self.slowestProd)
+                           if self.slowestProd else
+                           "it took {:.3f} seconds to run once nicely".
                            format(dur), extra={"cli": False})
 
+    def wake(self) -> None:
+        """
+        Wake this Looper if it is waiting for work. Useful when work is handed
+        to a Prodable from outside of the Looper, e.g. a client submitting a
+        request from another coroutine.
+        """
+        if self.wakeupEvent is not None:
+            self.wakeupEvent.set()
+
+    def advanceClock(self) -> None:
+        """
+        Move a virtual clock to the earliest deadline of the Prodables. If a
+        deadline has passed without any work being done, move it on by
+        `pollInterval` as a polling Looper would, so time cannot stand still.
+        """
+        now = self.clock.now()
+        deadline = self.nextWakeup()
+        self.clock.advanceTo(deadline if deadline > now
+                             else now + self.pollInterval)
+
+    def nextWakeup(self) -> float:
+        """
+        The earliest time by which any of the Prodables needs to be prodded.
+        """
+        now = self.clock.now()
+        nxt = min([now + self.maxIdleWait] + self.sleepers)
+        for p in self.prodables:
+            w = p.nextWakeup()
+            if w is None:
+                w = now + self.pollInterval
+            if w < nxt:
+                nxt = w
+        return nxt
+
+    def watchFds(self) -> None:
+        """
+        Keep the event loop's readers in line with the file descriptors of the
+        Prodables, which change as stacks are opened and closed.
+        """
+        fds = set()
+        for p in self.prodables:
+            fds.update(p.wakeupFds())
+        for fd in self.watchedFds - fds:
+            self.loop.remove_reader(fd)
+        for fd in fds - self.watchedFds:
+            self.loop.add_reader(fd, self.wake)
+        self.watchedFds = fds
+
+    def unwatchFds(self) -> None:
+        for fd in self.watchedFds:
+            self.loop.remove_reader(fd)
+        self.watchedFds = set()
+
+    async def waitForWork(self):
+        """
+        Wait until one of the Prodables' file descriptors becomes readable,
+        the earliest deadline of the Prodables is reached, or `wake` is called.
+        """
+        if self.wakeupEvent is None:
+            self.wakeupEvent = asyncio.Event()
+        # clearing before collecting deadlines means that a wakeup that
+        # happens in between is not lost; readers are level triggered so
+        # unread data wakes us up again
+        self.wakeupEvent.clear()
+        self.watchFds()
+        deadline = self.nextWakeup()
+        timeout = deadline - self.clock.now()
+        if timeout <= 0:
+            await asyncio.sleep(0)  # let other stuff run
+            return
+        try:
+            await asyncio.wait_for(self.wakeupEvent.wait(), timeout)
+        except asyncio.TimeoutError:
+            self.loopLag.add(max(0.0, self.clock.now() - deadline))
+
+    def metrics(self):
+        """
+        Return this Looper's timing metrics as a list of name and value tuples.
+        """
+        return [("turn durations", self.turnDurations.summary()),
+                ("loop lag", self.loopLag.summary())] + \
+               [("prod {}".format(n), v)
+                for n, v in self.prodTimings.metrics()]
+
+    async def sleep(self, seconds: float) -> None:
+        """
+        Wait for the given number of seconds by this Looper's clock.
+        """
+        if not self.clock.virtual:
+            await asyncio.sleep(seconds)
+            return
+        end = self.clock.now() + seconds
+        self.sleepers.append(end)
+        try:
+            while self.clock.now() < end:
+                if self.runFut.done():
+                    raise RuntimeError("looper stopped while sleeping")
+                await asyncio.sleep(0)
+        finally:
+            self.sleepers.remove(end)
+
     def runFor(self, timeout):
-        self.run(asyncio.sleep(timeout))
+        self.run(self.sleep(timeout))
 
     async def runForever(self):
         """
@@ -201,6 +386,7 @@ class Looper:
     def onSigInt(self):
         logger.info("SIGINT received, stopping looper...")
         self.running = False
+        self.wake()
 
     async def shutdown(self):
         """
@@ -209,8 +395,10 @@ class Looper:
         logger.info("Looper shutting down now...",
                     extra={"cli": False})
         self.running = False
+        self.wake()
         start = time.perf_counter()
         await self.runFut
+        self.unwatchFds()
         self.stopall()
         logger.info("Looper shut down in {:.3f} seconds.".
                     format(time.perf_counter() - start),
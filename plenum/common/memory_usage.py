@@ -0,0 +1,132 @@
+"""
+Approximate sizes of the structures a node keeps, and heap snapshots taken
+with `tracemalloc`, to find out what a running node is holding on to.
+"""
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from itertools import islice
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Iterable, List, Tuple
+
+# Objects whose size is their own and which are not followed into
+_ATOMIC = (str, bytes, int, float, bool, type(None))
+
+# Objects that are not counted nor followed into, as they are not data a
+# structure holds
+_SKIPPED = (type, ModuleType, FunctionType, BuiltinFunctionType,
+            MethodType)
+
+
+def deepSize(obj: Any, exclude: Iterable[Any]=()) -> int:
+    """
+    The bytes taken by an object and everything it refers to through
+    containers and instance attributes, each object counted once.
+
+    :param exclude: objects not to count nor follow into, e.g. the node
+        that owns the structure
+    """
+    seen = {id(o) for o in exclude}
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _SKIPPED):
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, _ATOMIC):
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+        else:
+            d = getattr(o, "__dict__", None)
+            if d is not None:
+                stack.append(d)
+            for cls in type(o).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    try:
+                        stack.append(getattr(o, slot))
+                    except AttributeError:
+                        pass
+    return size
+
+
+def approxSize(obj: Any, sample: int=100,
+               exclude: Iterable[Any]=()) -> Tuple[int, int]:
+    """
+    The number of elements of a container and the approximate bytes it
+    takes. Of a container with more than `sample` elements, only the first
+    `sample` are measured, and their mean size is taken for all; objects
+    the elements share are then counted for each.
+
+    :return: the number of elements (None if `obj` is not sized) and bytes
+    """
+    try:
+        count = len(obj)
+    except TypeError:
+        return None, deepSize(obj, exclude)
+    if count <= sample:
+        return count, deepSize(obj, exclude)
+    if isinstance(obj, dict):
+        measured = sum(deepSize(k, exclude) + deepSize(v, exclude)
+                       for k, v in islice(obj.items(), sample))
+    else:
+        measured = sum(deepSize(item, exclude)
+                       for item in islice(obj, sample))
+    return count, sys.getsizeof(obj) + measured * count // sample
+
+
+class HeapSnapshots:
+    """
+    Heap snapshots of this process, taken with `tracemalloc`, dumped to a
+    directory and each compared with the one before.
+
+    :param directory: where to dump snapshots
+    :param name: prefix of the snapshots' file names
+    :param frames: frames of traceback `tracemalloc` keeps per allocation
+        when tracing is started here
+    """
+
+    def __init__(self, directory: str, name: str, frames: int=1):
+        self.directory = directory
+        self.name = name
+        self.frames = frames
+        self.previous = None  # type: tracemalloc.Snapshot
+        self.taken = 0
+
+    @property
+    def isTracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def take(self, top: int=10) -> Tuple[str, List[str]]:
+        """
+        Take a snapshot and dump it.
+
+        :param top: number of lines of code to report
+        :return: the file the snapshot is in, and the lines of code that
+            allocated most memory, or that grew most since the previous
+            snapshot
+        """
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),))
+        os.makedirs(self.directory, exist_ok=True)
+        self.taken += 1
+        path = os.path.join(self.directory, "{}-{}-{}.heap".format(
+            self.name, time.strftime("%Y%m%d-%H%M%S"), self.taken))
+        snapshot.dump(path)
+        if self.previous:
+            stats = snapshot.compare_to(self.previous, "lineno")[:top]
+        else:
+            stats = snapshot.statistics("lineno")[:top]
+        self.previous = snapshot
+        return path, [str(s) for s in stats]
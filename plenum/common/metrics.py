@@ -0,0 +1,116 @@
+"""
+Lightweight in-process metrics: histograms of durations, used to find out
+where a node spends its time.
+"""
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Any
+
+# Upper bounds, in seconds, of the histogram buckets; the last bucket holds
+# everything larger
+DURATION_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05,
+                    0.1, 0.5, 1.0, 5.0)
+
+
+class Histogram:
+    """
+    Counts observed values into fixed buckets and keeps their count, sum and
+    maximum. Percentiles are approximated by the upper bound of the bucket
+    they fall in.
+    """
+
+    def __init__(self, bounds: Tuple[float, ...]=DURATION_BUCKETS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        """
+        Record an observed value.
+        """
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """
+        Return the approximate `p`th percentile of the observed values.
+
+        :param p: a number between 0 and 100
+        """
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, c in enumerate(self.buckets):
+            seen += c
+            if seen >= rank and c:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def reset(self) -> None:
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return OrderedDict([("count", self.count),
+                            ("total", round(self.total, 6)),
+                            ("mean", round(self.mean, 6)),
+                            ("p50", self.percentile(50)),
+                            ("p99", self.percentile(99)),
+                            ("max", round(self.max, 6))])
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, dict(self.summary()))
+
+
+class Timings(OrderedDict):
+    """
+    Histograms of durations by name, e.g. one per Prodable or one per phase
+    of a Prodable's `prod`.
+    """
+
+    def add(self, name: str, duration: float) -> None:
+        """
+        Record that `name` took `duration` seconds.
+        """
+        h = self.get(name)
+        if h is None:
+            h = self[name] = Histogram()
+        h.add(duration)
+
+    def lap(self, name: str, start: float) -> float:
+        """
+        Record the time elapsed since `start` against `name` and return the
+        current time, so that consecutive phases can be timed with one clock
+        read each.
+
+        :param name: the name of the phase that just ended
+        :param start: the time (as per `time.perf_counter`) the phase started
+        :return: the current time
+        """
+        now = time.perf_counter()
+        self.add(name, now - start)
+        return now
+
+    def reset(self) -> None:
+        for h in self.values():
+            h.reset()
+
+    def metrics(self) -> List[Tuple[str, Any]]:
+        """
+        Return the summary of each histogram as a list of name and value
+        tuples, in the same form as `Monitor.metrics`.
+        """
+        return [(name, h.summary()) for name, h in self.items()]
@@ -0,0 +1,121 @@
+"""
+Profilers that can be switched on and off in a running node.
+
+`StackSampler` samples the stack of the thread running the Looper from a
+background thread at a fixed interval, which costs the Looper little, and
+writes the samples as collapsed stacks, one line per distinct stack with
+the number of times it was seen, as flame graph tools take them.
+`TimedProfile` runs `cProfile` on the Looper's thread, which measures every
+call but slows the node down, and writes pstats.
+"""
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+
+SAMPLE = "sample"
+CPROFILE = "cprofile"
+
+
+class StackSampler:
+    """
+    Samples the stack of a thread.
+
+    :param interval: seconds between samples
+    :param threadId: the thread to sample; the one that creates the
+        sampler by default
+    """
+
+    def __init__(self, interval: float=0.005, threadId: int=None):
+        self.interval = interval
+        self.threadId = threadId if threadId is not None \
+            else threading.get_ident()
+        # tuples of the code objects of a stack, outermost first -> count
+        self.samples = Counter()
+        self._stopped = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+
+    @property
+    def isRunning(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        frame = sys._current_frames().get(self.threadId)
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        if codes:
+            self.samples[tuple(reversed(codes))] += 1
+
+    @staticmethod
+    def frameName(code) -> str:
+        return "{}:{}".format(os.path.basename(code.co_filename),
+                              code.co_name)
+
+    def collapsed(self) -> Counter:
+        """
+        The samples as collapsed stacks: frame names joined by semicolons,
+        outermost first, with their counts.
+        """
+        stacks = Counter()
+        for codes, count in self.samples.items():
+            stacks[";".join(self.frameName(c) for c in codes)] += count
+        return stacks
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in self.collapsed().most_common():
+                f.write("{} {}\n".format(stack, count))
+
+
+class TimedProfile:
+    """
+    `cProfile` of the thread that starts it.
+    """
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.isRunning = False
+
+    def start(self) -> None:
+        self.profile.enable()
+        self.isRunning = True
+
+    def stop(self) -> None:
+        if self.isRunning:
+            self.profile.disable()
+            self.isRunning = False
+
+    def write(self, path: str) -> None:
+        self.profile.dump_stats(path)
+
+
+def newProfiler(mode: str, sampleInterval: float=0.005):
+    """
+    :param mode: `SAMPLE` or `CPROFILE`
+    """
+    if mode == SAMPLE:
+        return StackSampler(sampleInterval)
+    if mode == CPROFILE:
+        return TimedProfile()
+    raise ValueError("no profiler {}; expected {} or {}".
+                     format(mode, SAMPLE, CPROFILE))
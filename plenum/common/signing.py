@@ -24,7 +24,7 @@ from collections import Iterable
 from typing import Mapping
 
 from plenum.common.types import f
-from plenum.common.util import error, getlogger
+from plenum.common.util import TRACE_LOG_LEVEL, error, getlogger
 
 logger = getlogger()
 
@@ -74,6 +74,61 @@ def serlize(obj, level=0, objname=None):
         return str(obj)
 
 
+def serializeCanonical(msg) -> str:
+    """
+    Create the same string representation of the given object as `serlize`,
+    without recursion and with a single join at the end.
+
+    Values and separators are pushed onto a stack in reverse and popped in
+    order, so the parts of the string are appended to one list. On an
+    object of a type that cannot be signed, `serlize` is called to raise its
+    error, which names where in `msg` the object is.
+
+    :param msg: the object to serialize
+    :return: a string representation of `msg`
+    """
+    if type(msg) is str:
+        return msg
+    parts = []
+    append = parts.append
+    stack = [msg]
+    pop = stack.pop
+    push = stack.append
+    sig = f.SIG.nm
+    top = True
+    while stack:
+        obj = pop()
+        tp = type(obj)
+        if tp is str:
+            append(obj)
+        elif tp is int or tp is float:
+            append(str(obj))
+        elif obj is None:
+            pass
+        elif isinstance(obj, dict):
+            keys = sorted(k for k in obj if k != sig) if top else sorted(obj)
+            for i in range(len(keys) - 1, -1, -1):
+                k = keys[i]
+                push(obj[k])
+                push(k + ":" if type(k) is str else str(k) + ":")
+                if i:
+                    push("|")
+        elif isinstance(obj, list):
+            for i in range(len(obj) - 1, -1, -1):
+                push(obj[i])
+                if i:
+                    push(",")
+        elif isinstance(obj, str):
+            append(obj)
+        elif isinstance(obj, (int, float)):
+            append(str(obj))
+        else:
+            serlize(msg)
+            error("invalid type found: {}".format(obj))
+        top = False
+    return "".join(parts)
+
+
 def serializeForSig(msg: Mapping):
     """
     Serialize a message for signing.
@@ -81,6 +136,7 @@ def serializeForSig(msg: Mapping):
     :param msg: the message to sign
     :return: a uft-8 encoded version of `msg`
     """
-    ser = serlize(msg)
-    logger.trace("serialized for signing {} into {}".format(msg, ser))
+    ser = serializeCanonical(msg)
+    if logger.isEnabledFor(TRACE_LOG_LEVEL):
+        logger.trace("serialized for signing {} into {}".format(msg, ser))
     return ser.encode('utf-8')
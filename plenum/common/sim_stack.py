@@ -0,0 +1,491 @@
+"""
+An in-process simulated network, for running pools of many nodes in one
+process on a virtual clock. Stacks on a `SimNetwork` have the same surface as
+`Stack` and `TcpStack`; messages between them are serialized as they would be
+on the wire and delivered after the latency and transfer time of their link,
+or dropped with the link's drop probability.
+
+Runs are deterministic for a given seed as long as the nodes are too, which
+needs the global `random` module seeded (the elector nominates at random) and
+a fixed PYTHONHASHSEED (some node state is kept in sets of names).
+"""
+import heapq
+import json
+import random
+import sys
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from raet.raeting import AutoMode
+
+from plenum.common.clock import Clock, VirtualClock
+from plenum.common.exceptions import RemoteNotFound
+from plenum.common.types import HA
+from plenum.common.util import getlogger
+
+logger = getlogger()
+
+
+class SimLink:
+    """
+    The characteristics of the link from one stack to another.
+    """
+
+    def __init__(self, latency: float, bandwidth: Optional[float],
+                 drop: float):
+        """
+        :param latency: seconds a message takes to arrive once sent
+        :param bandwidth: bytes per second the link can send, or None for no
+            limit; messages queue behind each other when it is saturated
+        :param drop: probability of a message being lost
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.drop = drop
+        # time at which the link finishes sending what has been given to it
+        self.busyUntil = 0.0
+        # number of messages sent over the link, which orders messages that
+        # arrive at the same time
+        self.sent = 0
+
+    def __repr__(self):
+        return "{}(latency={}, bandwidth={}, drop={})".format(
+            self.__class__.__name__, self.latency, self.bandwidth, self.drop)
+
+
+class SimNetwork:
+    """
+    A network of simulated stacks, which delivers messages between them by a
+    virtual clock. A `SimNetwork` can stand in for a stack class: its
+    `newStack` creates a stack on the network from the usual stack params.
+    """
+
+    def __init__(self,
+                 clock: Clock=None,
+                 seed: int=0,
+                 latency: float=0.001,
+                 bandwidth: float=None,
+                 drop: float=0.0):
+        """
+        :param clock: the clock deliveries are made by; a new virtual clock
+            by default, or the system clock to run in real time
+        :param seed: seed of the random numbers deciding which messages drop
+        :param latency: default latency of a link, in seconds
+        :param bandwidth: default bandwidth of a link, in bytes per second
+        :param drop: default drop probability of a link
+        """
+        self.clock = clock or VirtualClock()
+        self.random = random.Random(seed)
+        self.defaultLink = dict(latency=latency, bandwidth=bandwidth,
+                                drop=drop)
+        self.links = {}  # type: Dict[Tuple[str, str], SimLink]
+        self.stacks = {}  # type: Dict[HA, SimStack]
+        # min-heap of (arrival time, sender, receiver, sequence number on the
+        # link, action)
+        self.inFlight = []  # type: List[Tuple[float, str, str, int, Callable]]
+        self.stats = dict(sent=0, delivered=0, dropped=0, bytes=0)
+
+    def link(self, frm: str, to: str) -> SimLink:
+        """
+        Return the link from the stack named `frm` to the one named `to`.
+        """
+        key = (frm, to)
+        link = self.links.get(key)
+        if link is None:
+            link = self.links[key] = SimLink(**self.defaultLink)
+        return link
+
+    def setLink(self, frm: str, to: str, both: bool=True, **kwargs) -> None:
+        """
+        Change the latency, bandwidth or drop probability of the link between
+        two stacks.
+
+        :param both: change the link in both directions
+        """
+        for a, b in ((frm, to), (to, frm)) if both else ((frm, to),):
+            link = self.link(a, b)
+            for k, v in kwargs.items():
+                if k not in self.defaultLink:
+                    raise AttributeError("links have no attribute {}".
+                                         format(k))
+                setattr(link, k, v)
+
+    def newStack(self, stackParams: dict) -> 'SimStack':
+        """
+        Create a stack on this network.
+
+        :param stackParams: a dictionary of stack constructor arguments, as
+            for `Stack.newStack`
+        """
+        stack = SimStack(self, **stackParams)
+        logger.info("simulated stack {} starting at {}".
+                    format(stack.name, stack.ha), extra={"cli": False})
+        return stack
+
+    def attach(self, stack: 'SimStack') -> None:
+        if stack.ha in self.stacks:
+            raise RuntimeError("a stack is already at {}".format(stack.ha))
+        self.stacks[stack.ha] = stack
+
+    def detach(self, stack: 'SimStack') -> None:
+        if self.stacks.get(stack.ha) is stack:
+            del self.stacks[stack.ha]
+
+    def transfer(self, frm: str, to: str, size: int,
+                 action: Callable) -> None:
+        """
+        Send `size` bytes over the link from `frm` to `to` and call `action`
+        when they arrive, unless they are dropped.
+        """
+        link = self.link(frm, to)
+        self.stats['sent'] += 1
+        if link.drop and self.random.random() < link.drop:
+            self.stats['dropped'] += 1
+            return
+        now = self.clock.now()
+        departure = max(now, link.busyUntil)
+        if link.bandwidth:
+            departure += size / link.bandwidth
+            link.busyUntil = departure
+        link.sent += 1
+        self.stats['bytes'] += size
+        heapq.heappush(self.inFlight, (departure + link.latency, frm, to,
+                                       link.sent, action))
+
+    def deliverDue(self) -> int:
+        """
+        Deliver everything that has arrived by now.
+
+        :return: the number of deliveries
+        """
+        now = self.clock.now()
+        count = 0
+        while self.inFlight and self.inFlight[0][0] <= now:
+            action = heapq.heappop(self.inFlight)[-1]
+            action()
+            count += 1
+        self.stats['delivered'] += count
+        return count
+
+    def nextDelivery(self) -> float:
+        """
+        The time of the next delivery, or infinity if nothing is in flight.
+        """
+        return self.inFlight[0][0] if self.inFlight else float('inf')
+
+
+class SimKeep:
+    """
+    Stands in for the RAET keep of a stack; simulated stacks trust each other
+    so only the auto mode is kept.
+    """
+
+    def __init__(self, auto: AutoMode=None):
+        self.auto = auto if auto is not None else AutoMode.never
+
+    def clearAllDir(self):
+        pass
+
+
+class SimRemote:
+    """
+    A remote on a `SimNetwork`. Mirrors the parts of RAET's `RemoteEstate`
+    that `NodeStacked` relies upon.
+    """
+
+    def __init__(self, stack: 'SimStack', ha: HA=None, name: str=None):
+        stack.nextUid += 1
+        self.uid = stack.nextUid
+        self.stack = stack
+        self.ha = HA(*ha) if ha else None
+        self.name = name
+        self._connected = False
+        self.joining = False
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    @connected.setter
+    def connected(self, value: bool) -> None:
+        self._connected = value
+        self.stack.connsVersion += 1
+
+    @property
+    def joined(self) -> bool:
+        return self.connected
+
+    # as with TCP, there is no separate allow or alive step
+    allowed = joined
+    alived = joined
+
+    def joinInProcess(self) -> bool:
+        return self.joining
+
+    def allowInProcess(self) -> bool:
+        return False
+
+    def reap(self):
+        self.stack.removeRemote(self)
+
+    def __repr__(self):
+        return "{}({}, {}, {})".format(self.__class__.__name__, self.uid,
+                                       self.name, self.ha)
+
+
+class SimStack:
+    """
+    A stack on a `SimNetwork` with the same `service`, `send`, `transmit` and
+    `connecteds` surface as `Stack`.
+    """
+
+    def __init__(self, network: SimNetwork, name: str, ha: HA,
+                 main: bool=True, auto: AutoMode=None, **kwargs):
+        """
+        :param network: the network the stack is on
+        :param name: the name of this stack
+        :param ha: the address of this stack on the network
+        :param main: whether to accept connections from remotes
+        :param auto: the auto mode of the stack's keep, only kept so nodes
+            can tell whether they are key sharing
+        """
+        self.network = network
+        self.name = name
+        self.ha = HA(*ha)
+        self.main = main
+        self.keep = SimKeep(auto)
+
+        self.remotes = OrderedDict()  # type: Dict[int, SimRemote]
+        self.nameRemotes = {}  # type: Dict[str, SimRemote]
+        self.nextUid = 0
+        # changes whenever a remote connects or disconnects, so that the names
+        # of the connected remotes need not be gathered when it has not
+        self.connsVersion = 0
+
+        self.rxMsgs = deque()
+        self.msgHandler = None  # type: Callable
+        self.created = network.clock.now()
+        self.stats = dict(rxMsgs=0, rxBytes=0, txMsgs=0, txBytes=0,
+                          dropped=0)
+        self.closed = False
+        network.attach(self)
+
+    def __repr__(self):
+        return self.name
+
+    @property
+    def age(self):
+        """
+        Returns the time elapsed since this stack was created
+        """
+        return self.network.clock.now() - self.created
+
+    async def service(self, limit=None) -> int:
+        """
+        Deliver what has arrived on the network and service `limit` number of
+        received messages in this stack.
+
+        :param limit: the maximum number of messages to be processed. If None,
+        processes all of the messages in rxMsgs.
+        :return: the number of messages processed.
+        """
+        self.network.deliverDue()
+        pracLimit = limit if limit else sys.maxsize
+        count = 0
+        while self.rxMsgs and count < pracLimit:
+            self.msgHandler(self.rxMsgs.popleft())
+            count += 1
+        return count
+
+    def fileno(self) -> None:
+        """
+        A simulated stack has no file descriptor; it is run by a Looper with
+        a virtual clock, which never waits on one.
+        """
+        return None
+
+    def nextWakeup(self) -> float:
+        """
+        The time by which this stack needs to be serviced again, which is
+        when the next message on the network arrives.
+        """
+        return 0 if self.rxMsgs else self.network.nextDelivery()
+
+    def updateStamp(self, age=None):
+        """
+        Nothing to do; present for compatibility with `Stack`.
+        """
+
+    def flushTx(self):
+        """
+        Nothing to do; messages are put on the network as they are sent.
+        """
+
+    def close(self):
+        """
+        Take this stack off the network, disconnecting its remotes.
+        """
+        for remote in list(self.remotes.values()):
+            self._disconnect(remote)
+        self.network.detach(self)
+        self.closed = True
+
+    def newRemote(self, ha: HA) -> SimRemote:
+        return SimRemote(self, ha)
+
+    def addRemote(self, remote: SimRemote):
+        self.remotes[remote.uid] = remote
+        if remote.name:
+            self.nameRemotes[remote.name] = remote
+
+    def removeRemote(self, remote: SimRemote):
+        self.remotes.pop(remote.uid, None)
+        if remote.name and self.nameRemotes.get(remote.name) is remote:
+            del self.nameRemotes[remote.name]
+        remote.joining = False
+        self._disconnect(remote)
+
+    def _disconnect(self, remote: SimRemote):
+        """
+        Mark the remote disconnected and let the other end know.
+        """
+        if not remote.connected:
+            return
+        remote.connected = False
+        peer = self.network.stacks.get(remote.ha)
+        if peer:
+            self.network.transfer(self.name, remote.name, 0,
+                                  lambda: peer._peerDisconnected(self.name))
+
+    def _peerDisconnected(self, name: str):
+        remote = self.nameRemotes.get(name)
+        if remote:
+            remote.connected = False
+
+    def _findRemote(self, name: str, ha: HA) -> Optional[SimRemote]:
+        remote = self.nameRemotes.get(name)
+        if remote is None:
+            for r in self.remotes.values():
+                if r.ha == ha and r.name is None:
+                    return r
+        return remote
+
+    def join(self, uid: int, cascade=None, timeout=None):
+        """
+        Connect to the remote with the given uid, unless already connected or
+        connecting. The connection is made one round trip later, or the
+        attempt ends then if there is no stack at the remote's address.
+        """
+        remote = self.remotes[uid]
+        if remote.connected or remote.joining:
+            return
+        remote.joining = True
+        peer = self.network.stacks.get(remote.ha)
+        to = peer.name if peer else remote.name or str(remote.ha)
+        self.network.transfer(self.name, to, 0,
+                              lambda: self._joinArrived(remote, to))
+
+    # reconnecting to a remote is the same as connecting to it
+    allow = join
+
+    def _joinArrived(self, remote: SimRemote, to: str):
+        peer = self.network.stacks.get(remote.ha)
+        accepted = peer is not None and peer.main and not self.closed and \
+            peer._accept(self.name, self.ha)
+        peerName = peer.name if peer else to
+        self.network.transfer(peerName, self.name, 0,
+                              lambda: self._joinAnswered(remote, peerName,
+                                                         accepted))
+
+    def _accept(self, name: str, ha: HA) -> bool:
+        remote = self._findRemote(name, ha)
+        if remote is None:
+            remote = SimRemote(self, ha, name)
+        elif remote.name != name:
+            self.nameRemotes.pop(remote.name, None)
+            remote.name = name
+        remote.ha = HA(*ha)
+        self.addRemote(remote)
+        remote.connected = True
+        return True
+
+    def _joinAnswered(self, remote: SimRemote, peerName: str,
+                      accepted: bool):
+        remote.joining = False
+        if self.closed or remote.uid not in self.remotes:
+            return
+        if accepted:
+            if remote.name != peerName:
+                self.nameRemotes.pop(remote.name, None)
+                other = self.nameRemotes.get(peerName)
+                if other is not None and other is not remote:
+                    # the peer joined us first over another remote
+                    self.removeRemote(remote)
+                    return
+                remote.name = peerName
+                self.nameRemotes[peerName] = remote
+            remote.connected = True
+        else:
+            logger.debug("{} could not join {}".format(self, remote))
+
+    def connecteds(self) -> Set[str]:
+        """
+        Return the names of the remotes this stack is connected to.
+        """
+        return {r.name for r in self.remotes.values() if r.connected}
+
+    @staticmethod
+    def isRemoteConnected(r: SimRemote) -> bool:
+        return r.connected
+
+    def getRemote(self, name: str) -> SimRemote:
+        """
+        Find the remote by name.
+
+        :param name: the name of the remote to find
+        :raises: RemoteNotFound
+        """
+        try:
+            return self.nameRemotes[name]
+        except KeyError:
+            raise RemoteNotFound(name)
+
+    def send(self, msg: Any, remoteName: str):
+        """
+        Transmit the specified message to the remote specified by `remoteName`.
+
+        :param msg: a message
+        :param remoteName: the name of the remote
+        """
+        self.transmit(msg, self.getRemote(remoteName).uid)
+
+    def transmit(self, msg: Dict, uid: int, timeout=None):
+        """
+        Send the message to the remote with the given uid. Messages to remotes
+        that are not connected are dropped.
+
+        :param msg: a message that can be serialized to JSON
+        :param uid: the uid of the remote
+        """
+        remote = self.remotes.get(uid)
+        if not remote or not remote.connected:
+            self.stats['dropped'] += 1
+            logger.debug("{} dropping message to {} as it is not connected".
+                         format(self, remote or uid))
+            return
+        data = json.dumps(msg)
+        self.stats['txMsgs'] += 1
+        self.stats['txBytes'] += len(data)
+        self.network.transfer(self.name, remote.name, len(data),
+                              lambda: self._deliver(remote.ha, data))
+
+    def _deliver(self, ha: HA, data: str):
+        peer = self.network.stacks.get(ha)
+        if peer is None:
+            return
+        remote = peer.nameRemotes.get(self.name)
+        if remote is None or not remote.connected:
+            return
+        peer.stats['rxMsgs'] += 1
+        peer.stats['rxBytes'] += len(data)
+        peer.rxMsgs.append((json.loads(data), self.name))
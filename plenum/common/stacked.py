@@ -1,9 +1,13 @@
+import json
 import logging
+from base64 import b64decode, b64encode
+import random
 import sys
 import time
 from collections import Callable
+from collections import OrderedDict
 from collections import deque
-from typing import Any, Set, Optional
+from typing import Any, List, Set, Optional
 from typing import Dict
 from typing import Tuple
 
@@ -14,14 +18,23 @@ from raet.road.stacking import RoadStack
 from raet.road.transacting import Joiner, Allower
 
 from plenum.client.signer import Signer
-from plenum.common.exceptions import RemoteNotFound
+from plenum.common.clock import Clock, systemClock
+from plenum.common.compression import CompressionStats, codecNames, codecs
+from plenum.common.exceptions import InvalidNodeMsg, RemoteNotFound
+from plenum.common.metrics import Histogram
 from plenum.common.ratchet import Ratchet
-from plenum.common.types import Request, Batch, TaggedTupleBase, HA
+from plenum.common.tcp_stack import TcpStack
+from plenum.common.types import Request, Batch, TaggedTupleBase, HA, f, \
+    BatchCodecs, CompressedBatch
 from plenum.common.util import error, distributedConnectionMap, \
-    MessageProcessor, getlogger, checkPortAvailable
+    MessageProcessor, getlogger, checkPortAvailable, getConfig
 
 logger = getlogger()
 
+# Upper bounds of the buckets counting how many messages went into each
+# transmission to a remote
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
 # this overrides the defaults
 Joiner.RedoTimeoutMin = 1.0
 Joiner.RedoTimeoutMax = 2.0
@@ -111,12 +124,40 @@ class Stack(RoadStack):
         """
         self.store.changeStamp(age if age else self.age)
 
+    def flushTx(self):
+        """
+        Send the messages this stack has queued, rather than waiting for it
+        to be serviced.
+        """
+        self.serviceAllTx()
+
     def close(self):
         """
         Close the UDP socket of this stack's server.
         """
         self.server.close()  # close the UDP socket
 
+    def fileno(self) -> int:
+        """
+        Return the file descriptor of this stack's UDP socket.
+        """
+        return self.server.ss.fileno()
+
+    # RAET's transactions (joins, allows, alives and message retries) time out
+    # and redo only when the stack is serviced, so while any are in process
+    # the stack needs to be serviced at least this often
+    timerResolution = 0.1
+
+    def nextWakeup(self) -> float:
+        """
+        The time by which this stack needs to be serviced again.
+        """
+        if self.txMsgs or self.txes:
+            return 0
+        if any(r.transactions for r in self.remotes.values()):
+            return time.perf_counter() + self.timerResolution
+        return float('inf')
+
     def connecteds(self) -> Set[str]:
         """
         Return the names of the nodes this node is connected to.
@@ -133,6 +174,12 @@ class Stack(RoadStack):
         """
         return r.joined and r.allowed and r.alived
 
+    def newRemote(self, ha: HA) -> RemoteEstate:
+        """
+        Create a remote for the given address, to be added to this stack.
+        """
+        return RemoteEstate(stack=self, ha=ha)
+
     def getRemote(self, name: str) -> RemoteEstate:
         """
         Find the remote by name.
@@ -140,10 +187,11 @@ class Stack(RoadStack):
         :param name: the name of the remote to find
         :raises: RemoteNotFound
         """
+        # RAET keeps the remotes indexed by name as they are added, renamed
+        # and removed
         try:
-            return next(r for r in self.remotes.values()
-                        if r.name == name)
-        except StopIteration:
+            return self.nameRemotes[name]
+        except KeyError:
             raise RemoteNotFound(name)
 
     def send(self, msg: Any, remoteName: str):
@@ -212,12 +260,41 @@ class Batched(MessageProcessor):
     A mixin to allow batching of requests to be send to remotes.
     """
 
-    def __init__(self):
+    def __init__(self, clock: Clock=None):
         """
         :param self: 'NodeStacked'
+        :param clock: the clock by which batches are held back and connections
+            retried; the system clock by default
         """
+        self.clock = clock or systemClock
         self.outBoxes = {}  # type: Dict[int, deque]
 
+        config = getConfig()
+        self.maxBatchMessages = config.maxBatchMessages
+        self.maxBatchSize = config.maxBatchSize
+        self.batchFlushDelay = config.batchFlushDelay
+
+        # time at which the oldest message in each remote's outBox was queued
+        self.outBoxQueued = {}  # type: Dict[int, float]
+        # bytes of the messages held in each remote's outBox, when batches
+        # are limited in size
+        self.outBoxSizes = {}  # type: Dict[int, int]
+        # time at which messages were last sent to each remote
+        self.lastFlushed = {}  # type: Dict[int, float]
+
+        # number of messages in each transmission
+        self.batchSizes = Histogram(BATCH_SIZE_BUCKETS)
+
+        # codec with which to compress batches of at least
+        # `batchCompressionThreshold` bytes, to remotes that can decode it
+        self.batchCodec = config.batchCodec
+        self.batchCompressionThreshold = config.batchCompressionThreshold
+        # most bytes a compressed batch from a remote may decompress to
+        self.maxDecompressedBatchSize = config.maxDecompressedBatchSize
+        # codecs each remote said it can decode, by remote name
+        self.remoteCodecs = {}  # type: Dict[str, Set[str]]
+        self.batchCompression = CompressionStats()
+
     def _enqueue(self, msg: Any, rid: int, signer: Signer) -> None:
         """
         Enqueue the message into the remote's queue.
@@ -229,6 +306,11 @@ class Batched(MessageProcessor):
         if rid not in self.outBoxes:
             self.outBoxes[rid] = deque()
         self.outBoxes[rid].append(payload)
+        if self.batchFlushDelay:
+            self.outBoxQueued.setdefault(rid, self.clock.now())
+            if self.maxBatchSize:
+                self.outBoxSizes[rid] = self.outBoxSizes.get(rid, 0) + \
+                                        self.msgSize(payload)
 
     def _enqueueIntoAllRemotes(self, msg: Any, signer: Signer) -> None:
         """
@@ -254,10 +336,14 @@ class Batched(MessageProcessor):
         else:
             self._enqueueIntoAllRemotes(msg, signer)
 
-    def flushOutBoxes(self) -> None:
+    def flushOutBoxes(self, force: bool=False) -> None:
         """
         Clear the outBoxes and transmit batched messages to remotes.
+
+        :param force: send all messages, even those `batchFlushDelay` would
+            hold back to fill a batch
         """
+        now = self.clock.now() if self.batchFlushDelay else None
         removedRemotes = []
         for rid, msgs in self.outBoxes.items():
             try:
@@ -266,21 +352,13 @@ class Batched(MessageProcessor):
                 removedRemotes.append(rid)
                 continue
             if msgs:
-                if len(msgs) == 1:
-                    msg = msgs.popleft()
-                    self.nodestack.transmit(msg, rid)
-                    logger.trace("{} sending msg {} to {}".format(self, msg, dest))
-                else:
-                    logger.debug("{} batching {} msgs to {} into one transmission".
-                                 format(self, len(msgs), dest))
-                    logger.trace("    messages: {}".format(msgs))
-                    batch = Batch([], None)
-                    while msgs:
-                        batch.messages.append(msgs.popleft())
-                    # don't need to sign the batch, when the composed msgs are
-                    # signed
-                    payload = self.prepForSending(batch)
-                    self.nodestack.transmit(payload, rid)
+                if not force and self._holdBatch(rid, msgs, now):
+                    continue
+                self._transmitBatches(msgs, rid, dest)
+                if now is not None:
+                    self.outBoxQueued.pop(rid, None)
+                    self.outBoxSizes.pop(rid, None)
+                    self.lastFlushed[rid] = now
         for rid in removedRemotes:
             logger.warning("{} rid {} has been removed".format(self, rid),
                            extra={"cli": False})
@@ -288,6 +366,236 @@ class Batched(MessageProcessor):
             if msgs:
                 self.discard(msgs, "rid {} no longer available".format(rid))
             del self.outBoxes[rid]
+            self.outBoxQueued.pop(rid, None)
+            self.outBoxSizes.pop(rid, None)
+            self.lastFlushed.pop(rid, None)
+
+    def _holdBatch(self, rid: int, msgs: deque, now: Optional[float]) -> bool:
+        """
+        Whether to hold back the messages for a remote to fill a batch. They
+        are held only while messages are being sent to the remote more often
+        than every `batchFlushDelay` seconds, the batch is not full, by
+        `maxBatchMessages` or by `maxBatchSize`, and the oldest of them has
+        waited less than `batchFlushDelay` seconds.
+        """
+        if not self.batchFlushDelay:
+            return False
+        if self.maxBatchMessages and len(msgs) >= self.maxBatchMessages:
+            return False
+        if self.maxBatchSize and \
+                self.outBoxSizes.get(rid, 0) >= self.maxBatchSize:
+            return False
+        if now - self.lastFlushed.get(rid, 0) >= self.batchFlushDelay:
+            return False
+        return now - self.outBoxQueued.get(rid, now) < self.batchFlushDelay
+
+    def _transmitBatches(self, msgs: deque, rid: int, dest: str) -> None:
+        """
+        Transmit the messages to the remote in as few transmissions as the
+        batch limits allow.
+        """
+        while msgs:
+            batched = self._takeBatch(msgs)
+            self.batchSizes.add(len(batched))
+            if len(batched) == 1:
+                msg = batched[0]
+                self.nodestack.transmit(msg, rid)
+                logger.trace("{} sending msg {} to {}".format(self, msg, dest))
+            else:
+                logger.debug("{} batching {} msgs to {} into one transmission".
+                             format(self, len(batched), dest))
+                logger.trace("    messages: {}".format(batched))
+                batch = Batch(batched, None)
+                # don't need to sign the batch, when the composed msgs are
+                # signed
+                payload = self.prepForSending(batch)
+                if self.batchCodec in self.remoteCodecs.get(dest, ()):
+                    payload = self.compressBatch(payload)
+                self.nodestack.transmit(payload, rid)
+
+    def compressBatch(self, payload: Dict) -> Dict:
+        """
+        Compress a batch with `batchCodec`, if it is at least
+        `batchCompressionThreshold` bytes as JSON and compressing makes it
+        smaller.
+
+        :param payload: the batch as prepared for sending
+        :return: the compressed batch as prepared for sending, or `payload`
+        """
+        raw = json.dumps(payload).encode()
+        if len(raw) < self.batchCompressionThreshold:
+            return payload
+        compress, _ = codecs[self.batchCodec]
+        encoded = b64encode(compress(raw)).decode()
+        if len(encoded) >= len(raw):
+            self.batchCompression.incompressible += 1
+            return payload
+        self.batchCompression.add(len(raw), len(encoded))
+        return self.prepForSending(CompressedBatch(self.batchCodec, encoded))
+
+    def decompressBatch(self, msg: CompressedBatch) -> Dict:
+        """
+        Return the batch a CompressedBatch carries, as it was prepared for
+        sending.
+
+        :raises: InvalidNodeMsg if the codec is not known here or the batch
+            decompresses to more than `maxDecompressedBatchSize` bytes
+        """
+        if msg.codec not in codecs:
+            raise InvalidNodeMsg("unknown codec {}".format(msg.codec))
+        _, decompress = codecs[msg.codec]
+        try:
+            raw = decompress(b64decode(msg.payload),
+                             self.maxDecompressedBatchSize)
+        except ValueError as ex:
+            raise InvalidNodeMsg("could not decompress batch") from ex
+        return json.loads(raw.decode())
+
+    def advertiseCodecs(self, remoteName: str) -> None:
+        """
+        Tell a remote the codecs with which batches to this stack can be
+        compressed.
+        """
+        self.send(BatchCodecs(codecNames()),
+                  self.nodestack.getRemote(remoteName).uid)
+
+    def processBatchCodecs(self, msg: BatchCodecs, frm: str) -> None:
+        """
+        Record the codecs with which batches to a remote can be compressed.
+        """
+        self.remoteCodecs[frm] = set(msg.codecs)
+
+    def _takeBatch(self, msgs: deque) -> List[Any]:
+        """
+        Take as many messages off the front of `msgs` as fit in one batch
+        according to `maxBatchMessages` and `maxBatchSize`. A message larger
+        than `maxBatchSize` is sent on its own.
+        """
+        batched = [msgs.popleft()]
+        maxMsgs = self.maxBatchMessages
+        maxSize = self.maxBatchSize
+        size = self.msgSize(batched[0]) if maxSize else 0
+        while msgs and (not maxMsgs or len(batched) < maxMsgs):
+            if maxSize:
+                size += self.msgSize(msgs[0])
+                if size > maxSize:
+                    break
+            batched.append(msgs.popleft())
+        return batched
+
+    @staticmethod
+    def msgSize(msg: Any) -> int:
+        """
+        The size of a message as serialized for transmission.
+        """
+        return len(json.dumps(msg))
+
+    def nextFlush(self) -> float:
+        """
+        The time by which the outBoxes need to be flushed.
+        """
+        now = None
+        nxt = float('inf')
+        for rid, msgs in self.outBoxes.items():
+            if msgs:
+                if not self.batchFlushDelay:
+                    return 0
+                now = now or self.clock.now()
+                if not self._holdBatch(rid, msgs, now):
+                    return 0
+                nxt = min(nxt, self.outBoxQueued[rid] + self.batchFlushDelay)
+        return nxt
+
+
+class NodeRegistry(OrderedDict):
+    """
+    A node registry, names of nodes mapped to their addresses, that keeps the
+    names indexed by address as entries are added and removed, so that a
+    remote's name can be found from its address without a scan.
+
+    Addresses are indexed as `NodeStacked.sameAddr` compares them: the local
+    addresses in `localips` stand for each other.
+
+    :param localips: hosts taken to be this machine
+    """
+
+    def __init__(self, *args, localips=('127.0.0.1', '0.0.0.0'), **kwargs):
+        self.localips = localips
+        self.haIndex = {}  # type: Dict[Tuple[str, int], List[str]]
+        super().__init__(*args, **kwargs)
+
+    def haKey(self, ha) -> Tuple[str, int]:
+        host, port = ha[0], ha[1]
+        return (None if host in self.localips else host), port
+
+    def _index(self, name: str, ha) -> None:
+        self.haIndex.setdefault(self.haKey(ha), []).append(name)
+
+    def _unindex(self, name: str, ha) -> None:
+        key = self.haKey(ha)
+        names = self.haIndex.get(key)
+        if names and name in names:
+            names.remove(name)
+            if not names:
+                del self.haIndex[key]
+
+    def __setitem__(self, name, ha):
+        if name in self:
+            self._unindex(name, self[name])
+        super().__setitem__(name, ha)
+        self._index(name, ha)
+
+    def __delitem__(self, name):
+        self._unindex(name, self[name])
+        super().__delitem__(name)
+
+    _missing = object()
+
+    def pop(self, name, default=_missing):
+        if name in self:
+            ha = super().pop(name)
+            self._unindex(name, ha)
+            return ha
+        if default is self._missing:
+            raise KeyError(name)
+        return default
+
+    def popitem(self, last=True):
+        name, ha = super().popitem(last)
+        self._unindex(name, ha)
+        return name, ha
+
+    def setdefault(self, name, default=None):
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def update(self, *args, **kwargs):
+        for name, ha in OrderedDict(*args, **kwargs).items():
+            self[name] = ha
+
+    def clear(self):
+        super().clear()
+        self.haIndex.clear()
+
+    def __reduce__(self):
+        # copies and unpickled registries index their own entries rather
+        # than sharing or duplicating the index of this one
+        state = {k: v for k, v in vars(self).items() if k != "haIndex"}
+        return self.__class__, (), state, None, iter(self.items())
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.haIndex = {}
+        for name, ha in self.items():
+            self._index(name, ha)
+
+    def namesAt(self, ha) -> List[str]:
+        """
+        The names of the nodes at an address, or at a local address of the
+        same port if `ha` is local.
+        """
+        return list(self.haIndex.get(self.haKey(ha), ()))
 
 
 class NodeStacked(Batched):
@@ -297,18 +605,38 @@ class NodeStacked(Batched):
 
     localips = ['127.0.0.1', '0.0.0.0']
 
-    def __init__(self, stackParams: dict, nodeReg: Dict[str, HA]):
-        super().__init__()
+    def __init__(self, stackParams: dict, nodeReg: Dict[str, HA],
+                 clock: Clock=None, rng: random.Random=None):
+        """
+        :param rng: the source of the random numbers of the stack and its
+            owner, such as the jitter of connection retries; a simulation
+            passes a seeded one so that its runs can be repeated
+        """
+        super().__init__(clock)
+        self.random = rng or random.Random()
         self._name = stackParams["name"]
         # self.bootstrapped = False
 
         self.nodeStackParams = stackParams
         self.nodestack = None  # type: Stack
 
+        # retries to connect to each disconnected remote by uid: how many
+        # have been made and when the next one is due
         self.lastcheck = {}  # type: Dict[int, Tuple[int, float]]
-        self.ratchet = Ratchet(a=8, b=0.198, c=-4, base=8, peak=3600)
+        config = getConfig()
+        self.ratchet = Ratchet(a=8, b=0.198, c=-4,
+                               base=config.reconnectBackoffBase,
+                               peak=config.reconnectBackoffCap)
+        self.reconnectJitter = config.reconnectBackoffJitter
+        # retries made, checks that found a retry not due yet, and backoffs
+        # cut short by a message from the remote
+        self.reconnectStats = OrderedDict([("retries", 0), ("deferred", 0),
+                                           ("resets", 0)])
         self.nodeReg = nodeReg
 
+        # the stack's `connsVersion` when the connections were last checked
+        self._connsVersion = None
+
         # holds the last time we checked remotes
         self.nextCheck = 0
 
@@ -331,6 +659,19 @@ class NodeStacked(Batched):
     def name(self, value):
         self._name = value
 
+    @property
+    def nodeReg(self) -> NodeRegistry:
+        return self._nodeReg
+
+    @nodeReg.setter
+    def nodeReg(self, value: Dict[str, HA]) -> None:
+        """
+        Set the node registry, indexing it by address unless it already is.
+        """
+        if value is not None and not isinstance(value, NodeRegistry):
+            value = NodeRegistry(value, localips=self.localips)
+        self._nodeReg = value
+
     @property
     def isKeySharing(self):
         return self.nodestack.keep.auto != AutoMode.never
@@ -361,9 +702,14 @@ class NodeStacked(Batched):
 
     def checkConns(self):
         """
-        Evaluate the connected nodes
+        Evaluate the connected nodes. A stack that counts connection changes
+        in `connsVersion` is only asked for its connected nodes when it has
+        changed; others are asked every time.
         """
-        self.conns = self.nodestack.connecteds()
+        version = getattr(self.nodestack, "connsVersion", None)
+        if version is None or version != self._connsVersion:
+            self._connsVersion = version
+            self.conns = self.nodestack.connecteds()
 
     def _connsChanged(self, ins: Set[str], outs: Set[str]) -> None:
         """
@@ -442,8 +788,7 @@ class NodeStacked(Batched):
             else:
                 raise AttributeError()
 
-            remote = RemoteEstate(stack=self.nodestack,
-                                  ha=node_ha)
+            remote = self.nodestack.newRemote(node_ha)
             self.nodestack.addRemote(remote)
         # updates the store time so the join timer is accurate
         self.nodestack.updateStamp()
@@ -453,11 +798,12 @@ class NodeStacked(Batched):
                     extra={"cli": "PLAIN"})
         return remote.uid
 
-    def sign(self, msg: Dict, signer: Signer) -> Dict:
+    def sign(self, msg: Dict, signer: Signer, request: Request=None) -> Dict:
         """
         No signing is implemented in NodeStacked. Returns the msg as it is.
 
         :param msg: the message to sign
+        :param request: the Request `msg` is the state of, if it is one
         """
         return msg  # don't sign by default
 
@@ -481,7 +827,12 @@ class NodeStacked(Batched):
             raise ValueError("Message cannot be converted to an appropriate "
                              "format for transmission")
         if signer:
-            return self.sign(tmsg, signer)
+            tmsg = self.sign(tmsg, signer,
+                             msg if isinstance(msg, Request) else None)
+            if isinstance(msg, Request):
+                # keep the signature with the request, so that sending it to
+                # the next remote does not sign it again
+                msg.signature = tmsg.get(f.SIG.nm)
         return tmsg
 
     def handleOneNodeMsg(self, wrappedMsg):
@@ -504,7 +855,7 @@ class NodeStacked(Batched):
         Ensure appropriate connections.
 
         """
-        cur = time.perf_counter()
+        cur = self.clock.now()
         if cur > self.nextCheck or force:
 
             self.nextCheck = cur + (6 if self.isKeySharing else 15)
@@ -590,24 +941,18 @@ class NodeStacked(Batched):
                              "it's not found in the registry".
                              format(self, disconn.name))
                 return
-        count, last = self.lastcheck.get(disconn.uid, (0, 0))
-        # TODO come back to ratcheting retries
-        # secsSinceLastCheck = cur - last
-        # secsToWait = self.ratchet.get(count)
-        # secsToWaitNext = self.ratchet.get(count + 1)
-        # if secsSinceLastCheck > secsToWait:
+        count, due = self.lastcheck.get(disconn.uid, (0, 0))
+        if cur < due:
+            self.reconnectStats["deferred"] += 1
+            self.nextCheck = min(self.nextCheck, due)
+            return
         dname = self.getRemoteName(disconn)
-        # extra = "" if not last else "; needed to wait at least {} and " \
-        #                             "waited {} (next try will be {} " \
-        #                             "seconds)".format(round(secsToWait, 2),
-        #                                         round(secsSinceLastCheck, 2),
-        #                                         round(secsToWaitNext, 2)))
-
-        logger.debug("{} retrying to connect with {}".
-                     format(self.name, dname))
-        self.lastcheck[disconn.uid] = count + 1, cur
-        # self.nextCheck = min(self.nextCheck,
-        #                      cur + secsToWaitNext)
+        wait = self.reconnectWait(count)
+        logger.debug("{} retrying to connect with {}; next try in {:.2f} "
+                     "seconds".format(self.name, dname, wait))
+        self.lastcheck[disconn.uid] = count + 1, cur + wait
+        self.reconnectStats["retries"] += 1
+        self.nextCheck = min(self.nextCheck, cur + wait)
         if disconn.joinInProcess():
             logger.debug("waiting, because join is already in "
                          "progress")
@@ -619,13 +964,47 @@ class NodeStacked(Batched):
         else:
             self.connect(dname, disconn.uid)
 
+    def reconnectWait(self, count: int) -> float:
+        """
+        Seconds to wait after retry number `count` to a remote before the
+        next: the ratchet's value, less a random part of up to
+        `reconnectJitter` of it, so that nodes that lost their connections
+        at the same time do not retry in step.
+        """
+        return self.ratchet.get(count) * \
+            (1 - self.reconnectJitter * self.random.random())
+
+    def remoteActive(self, name: str) -> None:
+        """
+        Note that a message came from the named remote, so that if retries to
+        connect to it are backing off, the next is made at the next check.
+        """
+        remote = self.nodestack.nameRemotes.get(name)
+        if remote is not None and remote.uid in self.lastcheck:
+            del self.lastcheck[remote.uid]
+            self.reconnectStats["resets"] += 1
+            self.nextCheck = self.clock.now()
+
+    def reconnectSummary(self) -> OrderedDict:
+        """
+        The counts of retries to connect to disconnected remotes, and the
+        seconds until the next retry to each remote that is backing off.
+        """
+        now = self.clock.now()
+        backingOff = OrderedDict()
+        for uid, (count, due) in self.lastcheck.items():
+            remote = self.nodestack.remotes.get(uid)
+            if remote is not None and due > now:
+                backingOff[remote.name] = round(due - now, 3)
+        return OrderedDict(list(self.reconnectStats.items()) +
+                           [("backingOff", backingOff)])
+
     def findInNodeRegByHA(self, remoteHa):
         """
         Returns the name of the remote by HA if found in the node registry, else
         returns None
         """
-        regName = [nm for nm, ha in self.nodeReg.items()
-                   if self.sameAddr(ha, remoteHa)]
+        regName = self.nodeReg.namesAt(remoteHa)
         if len(regName) > 1:
             raise RuntimeError("more than one node registry entry with the "
                                "same ha {}: {}".format(remoteHa, regName))
@@ -662,10 +1041,13 @@ class NodeStacked(Batched):
         matches = set()  # good matches found in nodestack remotes
         legacy = set()  # old remotes that are no longer in registry
         conflicts = set()  # matches found, but the ha conflicts
-        logging.debug("{} nodereg is {}".
-                      format(self, self.nodeReg.items()))
-        logging.debug("{} nodestack is {}".
-                      format(self, self.nodestack.remotes.values()))
+        if logging.root.isEnabledFor(logging.DEBUG):
+            # rendering the whole registry and stack on every check is not
+            # worth it unless it is logged
+            logging.debug("{} nodereg is {}".
+                          format(self, self.nodeReg.items()))
+            logging.debug("{} nodestack is {}".
+                          format(self, self.nodestack.remotes.values()))
         for r in self.nodestack.remotes.values():
             if r.name in self.nodeReg:
                 if self.sameAddr(r.ha, self.nodeReg[r.name]):
@@ -723,9 +1105,9 @@ class NodeStacked(Batched):
     @staticmethod
     def stackType():
         """
-        Return the type of the stack
+        Return the type of the stack, as chosen by `stackType` in the config
         """
-        return Stack
+        return TcpStack if getConfig().stackType == "tcp" else Stack
 
     def remotesByConnected(self):
         """
@@ -735,7 +1117,7 @@ class NodeStacked(Batched):
         """
         conns, disconns = [], []
         for r in self.nodestack.remotes.values():
-            array = conns if Stack.isRemoteConnected(r) else disconns
+            array = conns if self.nodestack.isRemoteConnected(r) else disconns
             array.append(r)
         return conns, disconns
 
@@ -746,8 +1128,8 @@ class NodeStacked(Batched):
         :param remote: the remote object
         """
         if remote.name not in self.nodeReg:
-            find = [name for name, ha in self.nodeReg.items()
-                    if ha == remote.ha]
+            find = [name for name in self.nodeReg.namesAt(remote.ha)
+                    if self.nodeReg[name] == remote.ha]
             assert len(find) == 1
             return find[0]
         return remote.name
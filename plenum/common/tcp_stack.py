@@ -0,0 +1,620 @@
+"""
+A stack that talks to remotes over TCP using asyncio streams, as an
+alternative to RAET's reliable UDP.
+
+Every message travels as one length-prefixed frame, so there are no
+per-message transactions or acknowledgements to service; TCP takes care of
+ordering and retransmits. Connections are authenticated with the Ed25519
+signing keys held in the RAET keep, and frames are encrypted with the key
+derived from both sides' Curve25519 keys from the same keep.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import struct
+import sys
+import time
+from binascii import hexlify, unhexlify
+from collections import deque, OrderedDict
+from hashlib import sha256
+from typing import Any, Callable, Dict, Optional, Set
+
+import libnacl
+from raet.nacling import Signer, Verifier, Privateer
+from raet.raeting import AutoMode, Acceptance
+from raet.road.keeping import RoadKeep
+
+from plenum.common.exceptions import RemoteNotFound
+from plenum.common.types import HA
+from plenum.common.util import getlogger, checkPortAvailable, error, \
+    getConfig
+
+logger = getlogger()
+
+FRAME_HEADER = struct.Struct("!I")
+
+# Frames at least this long are written after their header instead of being
+# copied into one buffer with it
+STREAM_THRESHOLD = 64 * 1024
+
+
+class Connection:
+    """
+    An authenticated TCP connection to a remote.
+
+    Nonces are never sent: both sides derive them from the salts exchanged
+    in the handshake, the direction of the frame and a frame counter, so a
+    frame recorded on one connection cannot be replayed on another.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter, outbound: bool, key: bytes,
+                 noncePrefix: bytes):
+        """
+        :param outbound: whether this side initiated the connection
+        :param key: the precomputed Curve25519 shared key
+        :param noncePrefix: 15 bytes derived from the handshake salts
+        """
+        self.reader = reader
+        self.writer = writer
+        self.outbound = outbound
+        self.key = key
+        self.noncePrefix = noncePrefix
+        self.txCount = 0
+        self.rxCount = 0
+
+    def _nonce(self, sending: bool, count: int) -> bytes:
+        # frames from the initiator use direction 0, replies direction 1
+        direction = b'\x00' if sending == self.outbound else b'\x01'
+        return self.noncePrefix + direction + count.to_bytes(8, 'big')
+
+    def encrypt(self, data: bytes) -> bytes:
+        self.txCount += 1
+        return libnacl.crypto_box_afternm(
+            data, self._nonce(True, self.txCount), self.key)
+
+    def decrypt(self, data: bytes) -> bytes:
+        """
+        :raises: ValueError if the frame was not encrypted by the remote for
+            this position in the stream
+        """
+        self.rxCount += 1
+        return libnacl.crypto_box_open_afternm(
+            data, self._nonce(False, self.rxCount), self.key)
+
+    def close(self):
+        self.writer.close()
+
+    def abort(self):
+        """
+        Close the connection, discarding what has not been sent yet.
+        """
+        self.writer.transport.abort()
+
+
+class TcpRemote:
+    """
+    A remote reached over TCP. Mirrors the parts of RAET's `RemoteEstate`
+    that `NodeStacked` relies upon.
+    """
+
+    def __init__(self, stack: 'TcpStack', ha: HA=None, name: str=None):
+        stack.nextUid += 1
+        self.uid = stack.nextUid
+        self.stack = stack
+        self.ha = HA(*ha) if ha else None
+        self.name = name
+        self.verhex = None
+        self.pubhex = None
+        self._conn = None  # type: Connection
+        self.connecting = None  # type: asyncio.Future
+
+    @property
+    def conn(self) -> Connection:
+        return self._conn
+
+    @conn.setter
+    def conn(self, value: Connection) -> None:
+        self._conn = value
+        self.stack.connsVersion += 1
+
+    @property
+    def joined(self) -> bool:
+        return self._conn is not None
+
+    # a TCP connection is usable as soon as the handshake is done, so there
+    # is no separate allow or alive step
+    allowed = joined
+    alived = joined
+
+    def joinInProcess(self) -> bool:
+        return self.connecting is not None and not self.connecting.done()
+
+    def allowInProcess(self) -> bool:
+        return False
+
+    def reap(self):
+        self.stack.removeRemote(self)
+
+    def __repr__(self):
+        return "{}({}, {}, {})".format(self.__class__.__name__, self.uid,
+                                       self.name, self.ha)
+
+
+class TcpStack:
+    """
+    A stack of TCP connections with the same `service`, `send`, `transmit`
+    and `connecteds` surface as `Stack`.
+    """
+
+    # Largest frame accepted from a remote; a remote sending a larger one
+    # is disconnected
+    maxFrameSize = 128 * 1024 * 1024
+
+    # Seconds to wait for a connection to be opened and authenticated
+    handshakeTimeout = 10
+
+    def __init__(self, name: str, ha: HA, main: bool=True,
+                 auto: AutoMode=None, basedirpath: str=None, **kwargs):
+        """
+        :param name: the name of this stack, sent to remotes in the handshake
+        :param ha: the address to listen at
+        :param main: whether to accept connections from remotes
+        :param auto: whether to accept remotes whose keys are not in the keep
+        :param basedirpath: the base directory of the keep
+        """
+        self.name = name
+        # most bytes waiting to be sent to a remote before it is disconnected
+        self.maxWriteBuffer = getConfig().tcpMaxWriteBuffer
+        self.keep = RoadKeep(basedirpath=basedirpath,
+                             stackname=name,
+                             auto=auto,
+                             baseroledirpath=basedirpath)
+        localRoleData = self.keep.loadLocalRoleData()
+        self.signer = Signer(localRoleData['sighex'])
+        self.privateer = Privateer(localRoleData['prihex'])
+
+        self.remotes = OrderedDict()  # type: Dict[int, TcpRemote]
+        self.nameRemotes = {}  # type: Dict[str, TcpRemote]
+        self.nextUid = 0
+        # changes whenever a remote connects or disconnects, so that the names
+        # of the connected remotes need not be gathered when it has not
+        self.connsVersion = 0
+
+        self.rxMsgs = deque()
+        self.msgHandler = None  # type: Callable
+        self.created = time.perf_counter()
+        self.stats = dict(rxFrames=0, rxBytes=0, txFrames=0, txBytes=0,
+                          dropped=0)
+
+        # written to whenever a frame arrives so the Looper can wait on it
+        self.wakeReader, self.wakeWriter = socket.socketpair()
+        self.wakeReader.setblocking(False)
+        self.wakeWriter.setblocking(False)
+        self.wakePending = False
+
+        self.server = None
+        self.listener = None
+        if main:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR,
+                                     1)
+            self.listener.bind(ha)
+            self.listener.listen(128)
+            self.listener.setblocking(False)
+            self.ha = HA(*self.listener.getsockname()[:2])
+            self.serverTask = asyncio.ensure_future(self._serve())
+        else:
+            self.ha = HA(*ha)
+            self.serverTask = None
+
+    def __repr__(self):
+        return self.name
+
+    @property
+    def age(self):
+        """
+        Returns the time elapsed since this stack was created
+        """
+        return time.perf_counter() - self.created
+
+    async def _serve(self):
+        self.server = await asyncio.start_server(self._accepted,
+                                                 sock=self.listener)
+
+    async def service(self, limit=None) -> int:
+        """
+        Service `limit` number of received messages in this stack.
+
+        :param limit: the maximum number of messages to be processed. If None,
+        processes all of the messages in rxMsgs.
+        :return: the number of messages processed.
+        """
+        if self.wakePending:
+            self.wakePending = False
+            try:
+                while self.wakeReader.recv(4096):
+                    pass
+            except (BlockingIOError, InterruptedError):
+                pass
+        pracLimit = limit if limit else sys.maxsize
+        count = 0
+        while self.rxMsgs and count < pracLimit:
+            self.msgHandler(self.rxMsgs.popleft())
+            count += 1
+        return count
+
+    def fileno(self) -> int:
+        """
+        Return a file descriptor that becomes readable when messages arrive.
+        """
+        return self.wakeReader.fileno()
+
+    def nextWakeup(self) -> float:
+        """
+        The time by which this stack needs to be serviced again. Messages are
+        sent as soon as they are transmitted and there are no timers to
+        service, so that is only ever now or never.
+        """
+        return 0 if self.rxMsgs else float('inf')
+
+    def updateStamp(self, age=None):
+        """
+        Nothing to do; present for compatibility with `Stack`, whose
+        transactions time out according to its stamp.
+        """
+
+    def flushTx(self):
+        """
+        Nothing to do; messages are handed to the connections as they are
+        sent.
+        """
+
+    def close(self):
+        """
+        Close the listening socket and all connections of this stack.
+        """
+        if self.server:
+            self.server.close()
+        elif self.serverTask:
+            self.serverTask.cancel()
+        if self.listener:
+            self.listener.close()
+        for remote in list(self.remotes.values()):
+            self._disconnect(remote)
+        self.wakeReader.close()
+        self.wakeWriter.close()
+
+    def newRemote(self, ha: HA) -> TcpRemote:
+        return TcpRemote(self, ha)
+
+    def addRemote(self, remote: TcpRemote):
+        self.remotes[remote.uid] = remote
+        if remote.name:
+            self.nameRemotes[remote.name] = remote
+
+    def removeRemote(self, remote: TcpRemote):
+        self.remotes.pop(remote.uid, None)
+        if remote.name and self.nameRemotes.get(remote.name) is remote:
+            del self.nameRemotes[remote.name]
+        if remote.joinInProcess():
+            remote.connecting.cancel()
+        remote.connecting = None
+        self._disconnect(remote)
+
+    @staticmethod
+    def _disconnect(remote: TcpRemote):
+        if remote.conn:
+            remote.conn.close()
+            remote.conn = None
+
+    def join(self, uid: int, cascade=None, timeout=None):
+        """
+        Open a connection to the remote with the given uid, unless one is
+        already open or being opened.
+
+        :param timeout: seconds to wait for the connection to be opened
+        """
+        remote = self.remotes[uid]
+        if remote.joined or remote.joinInProcess():
+            return
+        remote.connecting = asyncio.ensure_future(
+            self._connect(remote, timeout or self.handshakeTimeout))
+
+    # reconnecting to a remote is the same as connecting to it
+    allow = join
+
+    def connecteds(self) -> Set[str]:
+        """
+        Return the names of the remotes this stack is connected to.
+        """
+        return {r.name for r in self.remotes.values() if r.joined}
+
+    @staticmethod
+    def isRemoteConnected(r: TcpRemote) -> bool:
+        return r.joined
+
+    def getRemote(self, name: str) -> TcpRemote:
+        """
+        Find the remote by name.
+
+        :param name: the name of the remote to find
+        :raises: RemoteNotFound
+        """
+        try:
+            return self.nameRemotes[name]
+        except KeyError:
+            raise RemoteNotFound(name)
+
+    def send(self, msg: Any, remoteName: str):
+        """
+        Transmit the specified message to the remote specified by `remoteName`.
+
+        :param msg: a message
+        :param remoteName: the name of the remote
+        """
+        self.transmit(msg, self.getRemote(remoteName).uid)
+
+    def transmit(self, msg: Dict, uid: int, timeout=None):
+        """
+        Send the message to the remote with the given uid. The message is
+        handed to the connection straight away; messages to remotes that are
+        not connected are dropped. A remote that has `maxWriteBuffer` bytes
+        waiting to be sent to it is disconnected rather than sent more, so
+        that a remote that stopped reading cannot use up the memory.
+
+        :param msg: a message that can be serialized to JSON
+        :param uid: the uid of the remote
+        """
+        remote = self.remotes.get(uid)
+        if not remote or not remote.conn:
+            self.stats['dropped'] += 1
+            logger.debug("{} dropping message to {} as it is not connected".
+                         format(self, remote or uid))
+            return
+        buffered = remote.conn.writer.transport.get_write_buffer_size()
+        if self.maxWriteBuffer is not None and \
+                buffered >= self.maxWriteBuffer:
+            self.stats['dropped'] += 1
+            logger.warning("{} disconnecting {} as {} bytes are waiting to be "
+                           "sent to it".format(self, remote.name, buffered),
+                           extra={"cli": False})
+            remote.conn.abort()
+            remote.conn = None
+            return
+        data = remote.conn.encrypt(json.dumps(msg).encode())
+        self._writeFrame(remote.conn.writer, data)
+        self.stats['txFrames'] += 1
+        self.stats['txBytes'] += len(data)
+
+    @classmethod
+    def _writeFrame(cls, writer: asyncio.StreamWriter, data: bytes):
+        header = FRAME_HEADER.pack(len(data))
+        if len(data) < STREAM_THRESHOLD:
+            writer.write(header + data)
+        else:
+            writer.write(header)
+            writer.write(data)
+
+    @classmethod
+    async def _readFrame(cls, reader: asyncio.StreamReader) -> bytes:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        size, = FRAME_HEADER.unpack(header)
+        if size > cls.maxFrameSize:
+            raise ValueError("frame of {} bytes is too large".format(size))
+        return await reader.readexactly(size)
+
+    def _wake(self):
+        if not self.wakePending:
+            self.wakePending = True
+            try:
+                self.wakeWriter.send(b'\0')
+            except OSError:
+                pass
+
+    async def _connect(self, remote: TcpRemote, timeout: float):
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(*remote.ha), timeout)
+        except (OSError, asyncio.TimeoutError) as ex:
+            logger.debug("{} could not connect to {}: {}".
+                         format(self, remote.ha, ex))
+            return
+        await self._establish(reader, writer, remote)
+
+    async def _accepted(self, reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter):
+        await self._establish(reader, writer, None)
+
+    async def _establish(self, reader, writer, remote: Optional[TcpRemote]):
+        """
+        Authenticate a new connection, attach it to its remote and read
+        messages from it until it is closed.
+
+        :param remote: the remote connected to, or None for a connection
+            accepted from a remote
+        """
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            conn, peer = await asyncio.wait_for(
+                self._handshake(reader, writer, remote is not None),
+                self.handshakeTimeout)
+        except (OSError, ValueError, KeyError, TypeError,
+                asyncio.TimeoutError, asyncio.IncompleteReadError) as ex:
+            logger.info("{} could not authenticate connection with {}: {}".
+                        format(self, writer.get_extra_info('peername'), ex),
+                        extra={"cli": False})
+            writer.close()
+            return
+        remote = self._attach(conn, peer, remote)
+        if remote:
+            await self._readFrames(remote, conn)
+
+    def _hello(self, salt: str, peerSalt: str=None) -> bytes:
+        hello = OrderedDict([
+            ("name", self.name),
+            ("ha", list(self.ha)),
+            ("verhex", self.signer.verhex.decode()),
+            ("pubhex", self.privateer.pubhex.decode()),
+            ("salt", salt)])
+        if peerSalt:
+            hello["peerSalt"] = peerSalt
+        raw = json.dumps(hello)
+        sig = hexlify(self.signer.signature(raw.encode())).decode()
+        return json.dumps({"hello": raw, "sig": sig}).encode()
+
+    def _checkHello(self, frame: bytes, salt: str=None) -> Dict:
+        """
+        Verify a remote's hello and that its keys are acceptable.
+
+        :param salt: the salt this side sent, which the remote must echo
+        :raises: ValueError if the hello is not acceptable
+        """
+        wrapped = json.loads(frame.decode())
+        raw = wrapped["hello"]
+        hello = json.loads(raw)
+        if not Verifier(hello["verhex"].encode()).verify(
+                unhexlify(wrapped["sig"]), raw.encode()):
+            raise ValueError("bad signature on hello from {}".
+                             format(hello["name"]))
+        if salt and hello.get("peerSalt") != salt:
+            raise ValueError("hello from {} is not a reply to ours".
+                             format(hello["name"]))
+        self._authorize(hello["name"], hello["verhex"], hello["pubhex"])
+        return hello
+
+    def _authorize(self, name: str, verhex: str, pubhex: str):
+        """
+        Accept the keys of a remote if they are the ones in the keep, or if
+        the keep's auto mode allows accepting them.
+
+        :raises: ValueError if the keys are not acceptable
+        """
+        data = self.keep.loadRemoteRoleData(name)
+        known = (data.get('verhex'), data.get('pubhex')) == (verhex, pubhex)
+        acceptance = data.get('acceptance')
+        if acceptance == Acceptance.rejected.value:
+            raise ValueError("keys of {} have been rejected".format(name))
+        if known and acceptance == Acceptance.accepted.value:
+            return
+        auto = self.keep.auto
+        if auto == AutoMode.always or \
+                (auto == AutoMode.once and data.get('verhex') is None):
+            self.keep.dumpRemoteRoleData({
+                "role": name,
+                "acceptance": Acceptance.accepted.value,
+                "verhex": verhex,
+                "pubhex": pubhex
+            }, name)
+            return
+        raise ValueError("keys of {} are not accepted".format(name))
+
+    async def _handshake(self, reader, writer, outbound: bool):
+        """
+        Exchange signed hellos with the remote and derive the keys for the
+        connection.
+
+        :param outbound: whether this side initiated the connection
+        :return: the connection and the remote's hello
+        """
+        salt = hexlify(os.urandom(16)).decode()
+        if outbound:
+            self._writeFrame(writer, self._hello(salt))
+            peer = self._checkHello(await self._readFrame(reader), salt)
+            salts = salt + peer["salt"]
+        else:
+            peer = self._checkHello(await self._readFrame(reader))
+            self._writeFrame(writer, self._hello(salt, peer["salt"]))
+            salts = peer["salt"] + salt
+        key = libnacl.crypto_box_beforenm(unhexlify(peer["pubhex"]),
+                                          self.privateer.keyraw)
+        prefix = sha256(salts.encode()).digest()[:15]
+        return Connection(reader, writer, outbound, key, prefix), peer
+
+    def _attach(self, conn: Connection, peer: Dict,
+                remote: Optional[TcpRemote]) -> Optional[TcpRemote]:
+        """
+        Attach an authenticated connection to the remote for the name the
+        remote gave in its hello.
+
+        When two nodes connect to each other at the same time, both keep the
+        connection initiated by the node whose name sorts first.
+
+        :return: the remote, or None if the connection was discarded
+        """
+        name = peer["name"]
+        if remote:
+            remote.connecting = None
+        existing = self.nameRemotes.get(name)
+        if existing is not None and existing is not remote:
+            if remote:
+                # connected to an address of a remote already known by name
+                self.removeRemote(remote)
+            remote = existing
+        if remote is None:
+            remote = TcpRemote(self, peer["ha"], name)
+            self.addRemote(remote)
+        elif remote.name != name:
+            if self.nameRemotes.get(remote.name) is remote:
+                del self.nameRemotes[remote.name]
+            remote.name = name
+            self.nameRemotes[name] = remote
+
+        if remote.conn:
+            current = self.name if remote.conn.outbound else name
+            initiator = self.name if conn.outbound else name
+            if not initiator < current:
+                logger.debug("{} discarding duplicate connection with {}".
+                             format(self, name))
+                conn.close()
+                return None
+            remote.conn.close()
+        remote.conn = conn
+        remote.verhex = peer["verhex"]
+        remote.pubhex = peer["pubhex"]
+        if not remote.ha:
+            remote.ha = HA(*peer["ha"])
+        logger.debug("{} connected to {}".format(self, name))
+        return remote
+
+    async def _readFrames(self, remote: TcpRemote, conn: Connection):
+        try:
+            while True:
+                data = await self._readFrame(conn.reader)
+                msg = json.loads(conn.decrypt(data).decode())
+                self.stats['rxFrames'] += 1
+                self.stats['rxBytes'] += len(data)
+                self.rxMsgs.append((msg, remote.name))
+                self._wake()
+        except (asyncio.IncompleteReadError, ConnectionError) as ex:
+            logger.debug("{} lost connection with {}: {}".
+                         format(self, remote.name, ex))
+        except (OSError, ValueError) as ex:
+            logger.warning("{} closing connection with {}: {}".
+                           format(self, remote.name, ex),
+                           extra={"cli": False})
+        finally:
+            conn.close()
+            if remote.conn is conn:
+                remote.conn = None
+
+    @classmethod
+    def newStack(cls, stack):
+        """
+        Create a new instance of this stack
+
+        :param stack: a dictionary of stack constructor arguments.
+        :return: the new instance of stack created.
+        """
+        checkPortAvailable(stack['ha'])
+        stk = cls(**stack)
+        if stk.ha[1] != stack['ha'].port:
+            error("the stack port number has changed")
+        logger.info("stack {} starting at {} in {} mode"
+                    .format(stk.name, stk.ha, stk.keep.auto.name),
+                    extra={"cli": False})
+        return stk
@@ -9,12 +9,16 @@ PRIMARY = "PRIMARY"
 PRIMDEC = "PRIMARYDECIDED"
 
 BATCH = "BATCH"
+COMPRESSED_BATCH = "COMPRESSED_BATCH"
+BATCH_CODECS = "BATCH_CODECS"
 
 REQACK = "REQACK"
 
 REQNACK = "REQNACK"
 
 PROPAGATE = "PROPAGATE"
+PROPAGATE_DIGEST = "PROPAGATE_DIGEST"
+REQUEST_FETCH = "REQUEST_FETCH"
 
 PREPREPARE = "PREPREPARE"
 PREPARE = "PREPARE"
@@ -5,7 +5,8 @@ from typing import NamedTuple, Any, List, Mapping, Optional, TypeVar, Dict
 
 from plenum.common.txn import NOMINATE, PRIMARY, REELECTION, REQDIGEST, REQACK,\
     ORDERED, PROPAGATE, PREPREPARE, REPLY, COMMIT, PREPARE, BATCH, INSTANCE_CHANGE, \
-    BLACKLIST, REQNACK
+    BLACKLIST, REQNACK, PROPAGATE_DIGEST, REQUEST_FETCH, COMPRESSED_BATCH, \
+    BATCH_CODECS
 
 Field = namedtuple("Field", ["nm", "tp"])
 
@@ -34,6 +35,9 @@ class f:  # provides a namespace for reusable field constants
     SENDER_CLIENT = Field('senderClient', str)
     PP_TIME = Field("ppTime", float)
     MERKLE_PROOF = Field("merkleProof", Any)
+    CODEC = Field("codec", str)
+    CODECS = Field("codecs", List[str])
+    PAYLOAD = Field("payload", str)
 
 
 # TODO: Move this to `txn.py` which should be renamed to constants.py
@@ -75,6 +79,16 @@ Batch = TaggedTuple(BATCH, [
     f.MSGS,
     f.SIG])
 
+# A Batch compressed with `codec` and base64 encoded, see
+# `plenum.common.compression`
+CompressedBatch = TaggedTuple(COMPRESSED_BATCH, [
+    f.CODEC,
+    f.PAYLOAD])
+
+# The codecs with which the sender can decode compressed batches
+BatchCodecs = TaggedTuple(BATCH_CODECS, [
+    f.CODECS])
+
 # Reelection messages that nodes send when they find the 2 or more nodes have
 # equal nominations for primary. `round` indicates the reelection round
 # number. So the first reelection would have round number 1, the one after
@@ -100,47 +114,98 @@ BlacklistMsg = NamedTuple(BLACKLIST, [
 
 OPERATION = 'operation'
 
+# attributes of a Request that its serialization and digest are computed
+# from; the signature is not part of them
+REQUEST_CONTENT = frozenset(("identifier", "reqId", "operation"))
+
 
 class Request:
+    __slots__ = ("identifier", "reqId", "operation", "signature",
+                 "_signingBytes", "_digest")
+
     def __init__(self,
                  identifier: str=None,
                  reqId: int=None,
                  operation: Mapping=None,
                  signature: str=None):
-        self.identifier = identifier
+        # a client's identifier is in every request it sends, so requests
+        # decoded off the wire share one copy of it
+        self.identifier = sys.intern(identifier) \
+            if type(identifier) is str else identifier
         self.reqId = reqId
         self.operation = operation
         self.signature = signature
+        self._signingBytes = None
+        self._digest = None
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in REQUEST_CONTENT:
+            object.__setattr__(self, "_signingBytes", None)
+            object.__setattr__(self, "_digest", None)
 
     def __eq__(self, other):
-        return self.__dict__ == other.__dict__
+        return self.__getstate__() == other.__getstate__()
 
     def __repr__(self):
-        return "{}: {}".format(self.__class__.__name__, self.__dict__)
+        return "{}: {}".format(self.__class__.__name__, self.__getstate__())
+
+    @property
+    def signingBytes(self) -> bytes:
+        """
+        The canonical serialization of this request, which is what gets
+        signed and verified; the signature is not part of it. It is computed
+        once and computed again only when the identifier, request id or
+        operation is set, so an operation must be replaced rather than
+        changed in place.
+        """
+        if self._signingBytes is None:
+            from plenum.common.signing import serializeForSig
+            self._signingBytes = serializeForSig(self.__getstate__())
+        return self._signingBytes
 
     @property
     def key(self):
         return self.identifier, self.reqId
 
     @property
-    def digest(self):
-        return sha256("{}{}".format(*self.key).encode('utf-8')).hexdigest()
+    def digest(self) -> str:
+        """
+        The sha256 of the request's serialization. It covers the operation
+        as well as the identifier and request id, and like the serialization
+        is computed again when one of them is set.
+        """
+        if self._digest is None:
+            self._digest = sha256(self.signingBytes).hexdigest()
+        return self._digest
 
     @property
     def reqDigest(self):
         return ReqDigest(self.identifier, self.reqId, self.digest)
 
     def __getstate__(self):
-        return self.__dict__
+        return {f.IDENTIFIER.nm: self.identifier,
+                f.REQ_ID.nm: self.reqId,
+                OPERATION: self.operation,
+                f.SIG.nm: self.signature}
 
     def __setstate__(self, state):
-        self.__dict__.update(state)
+        Request.__init__(self,
+                         state.get(f.IDENTIFIER.nm),
+                         state.get(f.REQ_ID.nm),
+                         state.get(OPERATION),
+                         state.get(f.SIG.nm))
         return self
 
     @classmethod
-    def fromState(cls, state):
+    def fromState(cls, state, signingBytes: bytes=None):
+        """
+        :param signingBytes: the serialization of the request, if it is
+            already known
+        """
         obj = cls.__new__(cls)
         cls.__setstate__(obj, state)
+        obj._signingBytes = signingBytes
         return obj
 
 
@@ -173,6 +238,20 @@ Propagate = TaggedTuple(PROPAGATE, [
     f.REQUEST,
     f.SENDER_CLIENT])
 
+# A PROPAGATE without the request's operation; nodes that do not have the
+# request fetch it with a REQUEST_FETCH from a node that propagated it
+PropagateDigest = TaggedTuple(PROPAGATE_DIGEST, [
+    f.IDENTIFIER,
+    f.REQ_ID,
+    f.DIGEST,
+    f.SIG,
+    f.SENDER_CLIENT])
+
+RequestFetch = TaggedTuple(REQUEST_FETCH, [
+    f.IDENTIFIER,
+    f.REQ_ID,
+    f.DIGEST])
+
 PrePrepare = TaggedTuple(PREPREPARE, [
     f.INST_ID,
     f.VIEW_NO,
@@ -1,6 +1,5 @@
 import asyncio
 import importlib.util
-import inspect
 import itertools
 import logging
 import math
@@ -230,9 +229,10 @@ def getlogger(name=None):
     if not loggingConfigured:
         setupLogging(TRACE_LOG_LEVEL)
     if not name:
-        curframe = inspect.currentframe()
-        calframe = inspect.getouterframes(curframe, 2)
-        name = inspect.getmodule(calframe[1][0]).__name__
+        # the caller's module name, read off its frame; walking the stack with
+        # `inspect.getouterframes` reads source files and made every module
+        # level logger slow to create
+        name = sys._getframe(1).f_globals["__name__"]
     logger = logging.getLogger(name)
     return logger
 
@@ -40,3 +40,136 @@ OrientDB = {
     "startScript": "/opt/orientdb/bin/server.sh",
     "shutdownScript": "/opt/orientdb/bin/shutdown.sh"
 }
+
+# When True, an idle Looper waits for stack sockets to become readable or for
+# the next scheduled deadline instead of polling every 10 milliseconds
+eventDrivenLooper = False
+
+# Longest time in seconds an idle event driven Looper waits before prodding,
+# so that timers internal to the stacks keep being serviced
+looperMaxIdleWait = 0.1
+
+# Transport used by nodes and clients: "raet" for RAET's reliable UDP or
+# "tcp" for length-prefixed frames over TCP connections
+stackType = "raet"
+
+# Most bytes the TCP stack queues for a remote that is not reading them fast
+# enough; a connection with more waiting is closed, and reopened later like
+# any lost connection. None for no limit
+tcpMaxWriteBuffer = 64 * 1024 * 1024
+
+# Most messages sent to a remote in one batch; None for no limit
+maxBatchMessages = 100
+
+# Most bytes of messages, as serialized to JSON, sent to a remote in one
+# batch; None for no limit. Measuring messages costs an extra serialization
+maxBatchSize = None
+
+# When greater than 0, messages to a remote that was sent messages less than
+# this many seconds ago are held back for up to this many seconds to fill a
+# batch. Messages to a remote that has been idle go out right away
+batchFlushDelay = 0
+
+# Codec with which batches to other nodes are compressed, for nodes that said
+# they can decode it; None to send batches uncompressed. See
+# plenum.common.compression for the codecs
+batchCodec = None
+
+# Batches smaller than this many bytes as JSON are sent uncompressed
+batchCompressionThreshold = 1024
+
+# Compressed batches from other nodes that decompress to more than this many
+# bytes are discarded
+maxDecompressedBatchSize = 16 * 1024 * 1024
+
+# Retries to connect to a disconnected node back off: the wait after each
+# retry grows along a ratchet from reconnectBackoffBase seconds to at most
+# reconnectBackoffCap seconds, less a random part of up to
+# reconnectBackoffJitter of it so that nodes do not retry in step. A message
+# from the node cuts the wait short
+reconnectBackoffBase = 8
+reconnectBackoffCap = 60
+reconnectBackoffJitter = 0.25
+
+# Number of worker processes that validate and authenticate the requests of
+# clients for a node, so that checking signatures does not take time from
+# consensus; 0 to check them in the node's process
+clientIntakeWorkers = 0
+
+# Number of workers on which a node computes the requests ordered in a batch
+# whose executers declare the state they touch (see
+# plenum.server.execution), running those that do not conflict at the same
+# time; 0 to execute ordered requests one at a time on the event loop
+executionWorkers = 0
+# "thread" or "process"; with processes executers must be picklable
+executionPoolType = "thread"
+
+# Directory to which nodes append the messages they receive, each to a file
+# named after the node, for replaying them with scripts/plenum-replay; None
+# not to record
+trafficRecordDir = None
+
+# Seconds after which records a node appended to its recording are flushed
+# to the file, so that a recording can be read while it is being written
+# and a crash loses no more than this much of it; 0 to flush every record
+trafficFlushInterval = 1
+
+# Frames of traceback tracemalloc keeps for each allocation when a node
+# traces allocations for heap snapshots; more frames tell more about where
+# memory is held but make tracing slower
+heapSnapshotFrames = 1
+
+# When True, a node traces allocations from the start, so that its first
+# heap snapshot covers all it allocated; otherwise tracing starts when the
+# first snapshot is asked for
+traceMemoryFromStart = False
+
+# Signal on which a node started by scripts/start_plenum_node logs the memory
+# its structures take and dumps a heap snapshot; None for no signal
+memorySignal = "SIGUSR2"
+
+# How a node is profiled when profiling is switched on: "sample" samples the
+# stacks of the Looper's thread, which costs little and can run in
+# production; "cprofile" profiles every call, which slows the node down
+profileMode = "sample"
+
+# Seconds between the stack samples of a sampling profile
+profileSampleInterval = 0.005
+
+# Seconds after which a node stops profiling and writes the profile to its
+# data directory; None to profile until profiling is switched off
+profileDuration = 60
+
+# Signal on which a node started by scripts/start_plenum_node switches
+# profiling on or off; None for no signal
+profileSignal = "SIGUSR1"
+
+# Seconds between refreshes of the live performance view of a node in the CLI
+perfRefreshInterval = 1
+
+# Most messages a client keeps in its inBox; None for no limit. Replies are
+# also tallied per request, so the inBox is not needed to check consensus
+clientInBoxMaxLen = None
+
+# Number of requests that reached consensus whose replies a client keeps
+clientRetainedReplies = 10000
+
+# Seconds a client keeps the replies of a request that has not reached
+# consensus, and the future for its result, which is then cancelled; at most
+# clientRetainedReplies such requests are kept, the oldest dropped first
+clientUnconfirmedReplyTimeout = 300
+
+# When True, a PROPAGATE carries only the identifier, request id, digest and
+# signature of a request. A node that did not get the request from the client
+# fetches it from a node that propagated it
+propagateByDigest = False
+
+# Seconds after which a node that fetched a request and did not get it asks
+# the next node that propagated the request by digest
+requestFetchTimeout = 2
+# Number of times a node asks for a request before it gives up on it and
+# forgets the PROPAGATEs by digest it got for it
+requestFetchAttempts = 10
+# Most requests a node fetches at once; PROPAGATEs by digest of further
+# requests make it give up on the oldest
+maxPendingRequestFetches = 10000
@@ -4,7 +4,6 @@ from ledger.stores.text_file_store import TextFileStore
 from plenum.common.exceptions import DataDirectoryNotFound, DBConfigNotFound
 from plenum.common.txn import StorageType
 from plenum.common.types import Reply
-from plenum.persistence.orientdb_store import OrientDbStore
 
 
 class Storage(ABC):
@@ -33,6 +32,8 @@ def initStorage(storageType, name, dataDir=None, config=None):
     elif storageType == StorageType.OrientDB:
         if config is None:
             raise DBConfigNotFound
+        # imported here so that pyorient is only loaded when it is used
+        from plenum.persistence.orientdb_store import OrientDbStore
         orientConf = config.OrientDB
         return OrientDbStore(user=orientConf["user"],
                              password=orientConf["password"],
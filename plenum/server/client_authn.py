@@ -3,7 +3,7 @@ Clients are authenticated with a digital signature.
 """
 from abc import abstractmethod
 from base64 import b64decode
-from typing import Dict
+from typing import Dict, Union
 
 from raet.nacling import Verifier
 
@@ -11,7 +11,7 @@ from plenum.common.exceptions import InvalidSignature, EmptySignature, \
     MissingSignature, EmptyIdentifier, \
     MissingIdentifier, InvalidIdentifier, CouldNotAuthenticate, SigningException
 from plenum.common.signing import serializeForSig
-from plenum.common.types import f
+from plenum.common.types import Request, f
 
 
 class ClientAuthNr:
@@ -62,10 +62,18 @@ class ClientAuthNr:
 
 class NaclAuthNr(ClientAuthNr):
     def authenticate(self,
-                     msg: Dict,
+                     msg: Union[Dict, Request],
                      identifier: str = None,
                      signature: str = None) -> str:
+        """
+        `msg` can also be a Request, whose serialization is then reused.
+        """
         try:
+            if isinstance(msg, Request):
+                ser = msg.signingBytes
+                msg = msg.__getstate__()
+            else:
+                ser = None
             if not signature:
                 try:
                     signature = msg[f.SIG.nm]
@@ -82,7 +90,8 @@ class NaclAuthNr(ClientAuthNr):
                     raise MissingIdentifier
             b64sig = signature.encode('utf-8')
             sig = b64decode(b64sig)
-            ser = serializeForSig(msg)
+            if ser is None:
+                ser = serializeForSig(msg)
             try:
                 verkey = self.getVerkey(identifier)
             except KeyError:
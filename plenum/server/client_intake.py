@@ -0,0 +1,313 @@
+"""
+Validation and authentication of client requests in worker processes.
+
+A node hands the messages its client stack receives to the workers, which
+check them the way `Node.validateClientMsg` does, including the plugins'
+checks of operations and the signature checks, and send back the requests
+that passed along with their serialization, and the reasons the others were
+rejected. The node keeps the client stack, so it still receives the
+messages and sends the acknowledgements and rejections; the workers take
+the checks, most of all the signature verification, off the process that
+runs consensus.
+
+Workers are forked where the platform allows, so that plugins loaded from
+files need not be importable by the workers.
+"""
+import multiprocessing
+import signal
+from collections import OrderedDict, namedtuple
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from plenum.common.exceptions import InvalidClientMsgType, InvalidClientOp, \
+    InvalidClientRequest, SuspiciousClient
+from plenum.common.txn import BATCH
+from plenum.common.types import OP_FIELD_NAME, OPERATION, Request, \
+    TaggedTuples, f
+from plenum.common.util import getlogger
+from plenum.server.client_authn import ClientAuthNr, NaclAuthNr, \
+    SimpleAuthNr
+from plenum.server.plugin_loader import verifyOperations
+
+logger = getlogger()
+
+# A request that passed the checks, with its serialization so the node need
+# not serialize it again
+Accepted = namedtuple("Accepted", ["state", "signingBytes", "frm"])
+
+# A message that did not pass the checks
+Rejected = namedtuple("Rejected", ["msg", "frm", "reqId", "reason",
+                                   "suspicious"])
+
+
+class KnownVerkeys(NaclAuthNr):
+    """
+    An authenticator with the verification keys the node sent along with
+    the messages of clients.
+    """
+
+    def __init__(self):
+        self.verkeys = {}  # type: Dict[str, str]
+
+    def addClient(self, identifier, verkey, pubkey=None, role=None):
+        self.verkeys[identifier] = verkey
+
+    def getVerkey(self, identifier):
+        return self.verkeys[identifier]
+
+
+def checksLikeWorkers(authNr: ClientAuthNr) -> bool:
+    """
+    Whether the workers authenticate requests the way `authNr` does. The
+    workers check signatures against the verification keys the node sends
+    them, as a NaclAuthNr does, so a node whose authenticator checks
+    anything else must authenticate requests itself.
+    """
+    return type(authNr) in (NaclAuthNr, SimpleAuthNr)
+
+
+class IntakeValidator:
+    """
+    Checks the messages of clients in a worker.
+
+    :param opVerifiers: the node's plugins that check operations
+    """
+
+    def __init__(self, opVerifiers: Iterable[Any]=None):
+        self.opVerifiers = opVerifiers or []
+        self.authNr = KnownVerkeys()
+        # the plugins' verdicts on the operations of the requests being
+        # checked, by the id of the request
+        self.opErrors = {}  # type: Dict[int, Optional[Exception]]
+
+    def validate(self, msg: Dict, frm: str,
+                 verkeys: Mapping[str, str]) -> List[tuple]:
+        """
+        Check a message of a client, or each message of a batch.
+
+        :param verkeys: verification keys of the identifiers in `msg`
+        :return: an `Accepted` or `Rejected` for each request
+        """
+        return self.validateMany([(msg, frm, verkeys)])
+
+    def validateMany(self, batch: Iterable[Tuple[Dict, str, Mapping]]) \
+            -> List[tuple]:
+        """
+        Check the messages of a batch handed to the workers, checking the
+        operations of all their requests with the plugins at once.
+
+        :param batch: messages, the names of the clients that sent them and
+            the verification keys of the identifiers in them
+        :return: an `Accepted` or `Rejected` for each request
+        """
+        batch = list(batch)
+        # the keys of each batch come with it, so keeping the keys of
+        # earlier batches would only grow the worker
+        self.authNr.verkeys.clear()
+        for _, _, verkeys in batch:
+            for identifier, verkey in verkeys.items():
+                self.authNr.addClient(identifier, verkey)
+        results = []
+        if self.opVerifiers:
+            requests = []
+            for msg, _, _ in batch:
+                self._collectRequests(msg, requests)
+            errors = verifyOperations(self.opVerifiers,
+                                      [r[OPERATION] for r in requests])
+            self.opErrors = {id(r): e for r, e in zip(requests, errors)}
+        try:
+            for msg, frm, _ in batch:
+                self._validate(msg, frm, results)
+        finally:
+            self.opErrors = {}
+        return results
+
+    def _collectRequests(self, msg: Dict, requests: List[Dict]):
+        # the requests whose operations `_validate` checks, batches included
+        if not isinstance(msg, Mapping):
+            return
+        if all(attr in msg for attr in
+               (OPERATION, f.IDENTIFIER.nm, f.REQ_ID.nm)):
+            requests.append(msg)
+        elif msg.get(OP_FIELD_NAME) == BATCH:
+            msgs = msg.get(f.MSGS.nm)
+            for m in msgs if isinstance(msgs, (list, tuple)) else ():
+                self._collectRequests(m, requests)
+
+    def _validate(self, msg: Dict, frm: str, results: List[tuple]):
+        reqId = msg.get(f.REQ_ID.nm) if isinstance(msg, Mapping) else None
+        try:
+            if not isinstance(msg, Mapping):
+                raise InvalidClientRequest(None, None)
+            if all(attr in msg for attr in
+                   (OPERATION, f.IDENTIFIER.nm, f.REQ_ID.nm)):
+                error = self.opErrors.get(id(msg))
+                if error:
+                    raise InvalidClientRequest(msg[f.IDENTIFIER.nm],
+                                               reqId) from error
+            elif OP_FIELD_NAME in msg:
+                op = msg[OP_FIELD_NAME]
+                cls = TaggedTuples.get(op, None)
+                if not cls:
+                    raise InvalidClientOp(op, reqId)
+                if op != BATCH:
+                    raise InvalidClientMsgType(cls, reqId)
+                for m in msg.get(f.MSGS.nm) or ():
+                    self._validate(m, frm, results)
+                return
+            else:
+                raise InvalidClientRequest(None, reqId)
+            try:
+                req = Request(**msg)
+            except Exception as ex:
+                raise InvalidClientRequest(msg.get(f.IDENTIFIER.nm),
+                                           reqId) from ex
+            try:
+                self.authNr.authenticate(req)
+            except Exception as ex:
+                raise SuspiciousClient from ex
+        except Exception as ex:
+            suspicious = isinstance(ex, SuspiciousClient)
+            exc = ex.__cause__ if ex.__cause__ else ex
+            results.append(Rejected(msg, frm,
+                                    getattr(exc, "reqId", None) or reqId,
+                                    "{} {}".format(exc.__class__.__name__,
+                                                   exc),
+                                    suspicious))
+        else:
+            results.append(Accepted(req.__getstate__(), req.signingBytes,
+                                    frm))
+
+
+def runIntakeWorker(opVerifiers, messages, results) -> None:
+    """
+    Check the batches of messages put on `messages` until a None is put, and
+    send the results of each batch on the connection `results`.
+    """
+    # the node stops its workers; an interrupt from the terminal is for it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    validator = IntakeValidator(opVerifiers)
+    while True:
+        batch = messages.get()
+        if batch is None:
+            break
+        results.send(validator.validateMany(batch))
+    results.close()
+
+
+class ClientIntake:
+    """
+    The worker processes that check a node's client messages.
+
+    :param opVerifiers: the node's plugins that check operations
+    :param workers: number of worker processes
+    :param name: name of the node, used to name the workers
+    """
+
+    def __init__(self, opVerifiers: Iterable[Any]=None, workers: int=1,
+                 name: str=None):
+        self.opVerifiers = list(opVerifiers or [])
+        self.workerCount = workers
+        self.name = name or "node"
+        self.workers = []  # type: List[multiprocessing.Process]
+        self.connections = []
+        self.messages = None
+        # messages to hand to the workers at the next flush
+        self.outgoing = []
+        # batches handed to the workers whose results have not come back
+        self.inFlight = 0
+        self.submitted = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    @property
+    def isRunning(self) -> bool:
+        return bool(self.workers)
+
+    def start(self) -> None:
+        if self.isRunning:
+            return
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods
+                                          else None)
+        self.messages = ctx.Queue()
+        for i in range(self.workerCount):
+            reader, writer = ctx.Pipe(duplex=False)
+            worker = ctx.Process(target=runIntakeWorker,
+                                 args=(self.opVerifiers, self.messages,
+                                       writer),
+                                 name="{}-intake-{}".format(self.name, i),
+                                 daemon=True)
+            worker.start()
+            writer.close()
+            self.workers.append(worker)
+            self.connections.append(reader)
+        logger.info("{} started {} client intake workers".
+                    format(self.name, self.workerCount),
+                    extra={"cli": False})
+
+    def add(self, msg: Dict, frm: str, verkeys: Mapping[str, str]) -> None:
+        """
+        Queue a message of a client to be handed to the workers at the next
+        `flush`.
+
+        :param verkeys: verification keys of the identifiers in `msg`
+        """
+        self.outgoing.append((msg, frm, verkeys))
+        self.submitted += 1
+
+    def flush(self) -> None:
+        """
+        Hand the queued messages to the workers as one batch.
+        """
+        if self.outgoing:
+            self.messages.put(self.outgoing)
+            self.outgoing = []
+            self.inFlight += 1
+
+    def results(self) -> Iterable[tuple]:
+        """
+        The results the workers have sent back, without waiting for more.
+        """
+        for conn in self.connections:
+            while conn.poll():
+                try:
+                    out = conn.recv()
+                except EOFError:
+                    break
+                self.inFlight -= 1
+                for r in out:
+                    if isinstance(r, Accepted):
+                        self.accepted += 1
+                    else:
+                        self.rejected += 1
+                    yield r
+
+    def filenos(self) -> List[int]:
+        return [conn.fileno() for conn in self.connections]
+
+    def stop(self, timeout: float=2) -> None:
+        if not self.isRunning:
+            return
+        for _ in self.workers:
+            self.messages.put(None)
+        for worker in self.workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        for conn in self.connections:
+            conn.close()
+        self.messages.close()
+        self.messages.join_thread()
+        self.workers = []
+        self.connections = []
+        self.messages = None
+        self.outgoing = []
+        self.inFlight = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return OrderedDict([("workers", self.workerCount),
+                            ("submitted", self.submitted),
+                            ("accepted", self.accepted),
+                            ("rejected", self.rejected),
+                            ("inFlight", self.inFlight)])
@@ -0,0 +1,184 @@
+"""
+Execution of ordered requests on a pool of workers.
+
+An executer of a type of transaction that subclasses `ParallelExecuter`
+declares the keys of the state each transaction reads and writes, and splits
+its work into `compute`, which runs on a worker, and `apply`, which runs on
+the node's event loop. The `ExecutionEngine` starts the computations of the
+requests ordered in a batch as soon as every earlier request they conflict
+with has been applied, and applies them one at a time in the order they
+were ordered, so the ledger and the replies keep that order.
+
+Executers that are plain coroutine functions, such as the pool manager's,
+run on the event loop as before; as the state they touch is not declared,
+no later request starts computing before they are done.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, \
+    ThreadPoolExecutor
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple
+
+from plenum.common.types import Request
+from plenum.common.util import getlogger
+
+logger = getlogger()
+
+THREADS = "thread"
+PROCESSES = "process"
+
+
+class ParallelExecuter:
+    """
+    An executer of a type of transaction whose work can run on a worker.
+    It is called like any executer in `Node.requestExecuter`, which computes
+    and applies the request on the event loop, unless the node has an
+    `ExecutionEngine`.
+    """
+
+    def keys(self, req: Request) -> Tuple[FrozenSet, FrozenSet]:
+        """
+        Return the keys of the state the request reads and those it writes.
+        Requests conflict if one writes a key the other reads or writes.
+        """
+        raise NotImplementedError("{} must implement this method".
+                                  format(self))
+
+    def compute(self, ppTime: float, req: Request) -> Any:
+        """
+        Do the work of executing the request and return its result. Runs on
+        a worker, so it must only read the state of the keys it declared
+        and not change any; with worker processes the executer must be
+        picklable.
+        """
+        raise NotImplementedError("{} must implement this method".
+                                  format(self))
+
+    async def apply(self, ppTime: float, req: Request, result: Any) -> None:
+        """
+        Write the result of the request to the node's state, the ledger and
+        the client. Runs on the event loop, in the order requests were
+        ordered.
+        """
+        raise NotImplementedError("{} must implement this method".
+                                  format(self))
+
+    async def __call__(self, ppTime: float, req: Request) -> None:
+        await self.apply(ppTime, req, self.compute(ppTime, req))
+
+
+def newWorkerPool(workers: int, poolType: str=THREADS) -> Executor:
+    """
+    :param workers: the number of workers
+    :param poolType: `THREADS` or `PROCESSES`
+    """
+    if poolType == THREADS:
+        return ThreadPoolExecutor(workers)
+    if poolType == PROCESSES:
+        return ProcessPoolExecutor(workers)
+    raise ValueError("no worker pool {}; expected {} or {}".
+                     format(poolType, THREADS, PROCESSES))
+
+
+class ExecutionEngine:
+    """
+    Executes the requests ordered in a batch, running the computations of
+    those that do not conflict at the same time on a pool of workers.
+
+    :param workers: the number of workers
+    :param poolType: `THREADS`, for executers that release the GIL or wait
+        on I/O, or `PROCESSES`
+    :param name: name of the node, for logs
+    """
+
+    def __init__(self, workers: int, poolType: str=THREADS, name: str=None):
+        self.name = name
+        self.pool = newWorkerPool(workers, poolType)
+        self.parallel = 0
+        self.inline = 0
+        # computations that waited for a conflicting request to be applied
+        self.conflicts = 0
+        self.maxInFlight = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.name)
+
+    @staticmethod
+    def conflict(a: Tuple[FrozenSet, FrozenSet],
+                 b: Tuple[FrozenSet, FrozenSet]) -> bool:
+        aReads, aWrites = a
+        bReads, bWrites = b
+        return bool(aWrites & (bReads | bWrites) or bWrites & aReads)
+
+    async def run(self, batch: List[Tuple[float, Request]],
+                  executerFor: Callable[[Request], Callable]) -> None:
+        """
+        Execute the requests of a batch. The requests executed are removed
+        from `batch`, so if executing one raises, `batch` is left with that
+        request and those after it.
+
+        :param batch: the pre-prepare times and requests, in the order they
+            were ordered
+        :param executerFor: returns the executer of a request
+        """
+        started = time.perf_counter()
+        executed = 0
+        loop = asyncio.get_event_loop()
+        executers = [executerFor(req) for _, req in batch]
+        keys = [executer.keys(req)
+                if isinstance(executer, ParallelExecuter) else None
+                for executer, (_, req) in zip(executers, batch)]
+        computing = {}  # type: Dict[int, asyncio.Future]
+        blocked = set()
+
+        def startComputations(applied: int):
+            # start each request after `applied` that does not come after an
+            # inline one and conflicts with no request not applied yet
+            for j in range(applied + 1, len(batch)):
+                if j in computing:
+                    continue
+                if keys[j] is None:
+                    break
+                if any(keys[k] is None or self.conflict(keys[k], keys[j])
+                       for k in range(applied + 1, j)):
+                    if j not in blocked:
+                        blocked.add(j)
+                        self.conflicts += 1
+                    continue
+                ppTime, req = batch[j]
+                computing[j] = loop.run_in_executor(
+                    self.pool, executers[j].compute, ppTime, req)
+            inFlight = sum(1 for f in computing.values() if not f.done())
+            self.maxInFlight = max(self.maxInFlight, inFlight)
+
+        try:
+            for i, (ppTime, req) in enumerate(batch):
+                startComputations(i - 1)
+                if keys[i] is None:
+                    await executers[i](ppTime, req)
+                    self.inline += 1
+                else:
+                    result = await computing.pop(i)
+                    await executers[i].apply(ppTime, req, result)
+                    self.parallel += 1
+                executed += 1
+        finally:
+            for future in computing.values():
+                future.cancel()
+            del batch[:executed]
+            self.batches += 1
+            self.seconds += time.perf_counter() - started
+
+    def stop(self) -> None:
+        self.pool.shutdown(wait=True)
+
+    def summary(self) -> OrderedDict:
+        return OrderedDict([("batches", self.batches),
+                            ("parallel", self.parallel),
+                            ("inline", self.inline),
+                            ("conflicts", self.conflicts),
+                            ("maxInFlight", self.maxInFlight),
+                            ("seconds", round(self.seconds, 6))])
@@ -1,37 +1,87 @@
+import heapq
 import logging
-import time
 from collections import deque
-from typing import Callable
+from typing import Callable, List, Set, Tuple
+
+from plenum.common.clock import Clock, systemClock
 
 
 class HasActionQueue:
-    def __init__(self):
+    def __init__(self, clock: Clock=None):
+        """
+        :param clock: the clock scheduled actions fall due by; the system
+            clock by default
+        """
+        self.clock = clock or systemClock
         self.actionQueue = deque()  # holds a deque of Callables; use functools.partial if the callable needs arguments
-        self.aqStash = deque()
-        self.aqNextCheck = float('inf')  # next time to check
+
+        # min-heap of scheduled actions, each entry is a tuple of
+        # (time at which the action is due, action id, action)
+        self.aqStash = []  # type: List[Tuple[float, int, Callable]]
+        self.aqCancelled = set()  # type: Set[int]
+        self.aqPending = set()  # type: Set[int]
         self.aid = 0  # action id
 
-    def _schedule(self, action: Callable, seconds: int=0) -> None:
+    @property
+    def aqNextCheck(self) -> float:
+        """
+        The time at which the earliest scheduled action is due, or infinity if
+        no action is scheduled.
+        """
+        self._pruneCancelled()
+        return self.aqStash[0][0] if self.aqStash else float('inf')
+
+    def _schedule(self, action: Callable, seconds: int=0) -> int:
         """
         Schedule an action to be executed after `seconds` seconds.
 
         :param action: a callable to be scheduled
         :param seconds: the time in seconds after which the action must be executed
+        :return: the id of the action, which can be used to cancel it
         """
         self.aid += 1
+        self.aqPending.add(self.aid)
         if seconds > 0:
-            nxt = time.perf_counter() + seconds
-            if nxt < self.aqNextCheck:
-                self.aqNextCheck = nxt
+            nxt = self.clock.now() + seconds
             logging.debug("{} scheduling action {} with id {} to run in {} "
                           "seconds".format(self, action, self.aid, seconds))
-            self.aqStash.append((nxt, (action, self.aid)))
+            heapq.heappush(self.aqStash, (nxt, self.aid, action))
         else:
             logging.debug("{} scheduling action {} with id {} to run now".
                           format(self, action, self.aid))
             self.actionQueue.append((action, self.aid))
         return self.aid
 
+    def _cancel(self, aid: int) -> None:
+        """
+        Cancel a scheduled action. Cancelling an action that has already run
+        has no effect.
+
+        :param aid: the id of the action returned by `_schedule`
+        """
+        if aid in self.aqPending:
+            logging.debug("{} cancelling action with id {}".format(self, aid))
+            self.aqCancelled.add(aid)
+
+    def _pruneCancelled(self) -> None:
+        """
+        Pop cancelled actions off the top of the heap so the earliest due
+        action is always a live one.
+        """
+        while self.aqStash and self.aqStash[0][1] in self.aqCancelled:
+            _, aid, _ = heapq.heappop(self.aqStash)
+            self.aqCancelled.discard(aid)
+            self.aqPending.discard(aid)
+
+    def _clearActions(self) -> None:
+        """
+        Remove all pending and scheduled actions.
+        """
+        self.actionQueue.clear()
+        self.aqStash.clear()
+        self.aqCancelled.clear()
+        self.aqPending.clear()
+
     def _serviceActions(self) -> int:
         """
         Run all pending actions in the action queue.
@@ -39,21 +89,22 @@ class HasActionQueue:
         :return: number of actions executed.
         """
         if self.aqStash:
-            tm = time.perf_counter()
-            if tm > self.aqNextCheck:
-                earliest = float('inf')
-                for d in list(self.aqStash):
-                    nxt, action = d
-                    if tm > nxt:
-                        self.actionQueue.appendleft(action)
-                        self.aqStash.remove(d)
-                    if nxt < earliest:
-                        earliest = nxt
-                self.aqNextCheck = earliest
-        count = len(self.actionQueue)
+            tm = self.clock.now()
+            due = []
+            while self.aqStash and self.aqStash[0][0] <= tm:
+                _, aid, action = heapq.heappop(self.aqStash)
+                due.append((action, aid))
+            # due actions go in front of the queue, in the order they were due
+            self.actionQueue.extendleft(reversed(due))
+        count = 0
         while self.actionQueue:
             action, aid = self.actionQueue.popleft()
+            self.aqPending.discard(aid)
+            if aid in self.aqCancelled:
+                self.aqCancelled.discard(aid)
+                continue
             logging.debug("{} running action {} with id {}".
                           format(self, action, aid))
             action()
+            count += 1
         return count
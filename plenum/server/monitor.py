@@ -1,10 +1,11 @@
 import logging
-import time
 from statistics import mean
 from typing import Dict
 from typing import List
 from typing import Tuple
 
+from plenum.common.clock import Clock, systemClock
+from plenum.common.metrics import Histogram
 from plenum.common.util import getlogger
 from plenum.server.instances import Instances
 
@@ -21,8 +22,10 @@ class Monitor:
     """
 
     def __init__(self, name: str, Delta: float, Lambda: float, Omega: float,
-                 instances: Instances):
+                 instances: Instances, clock: Clock=None):
         self.name = name
+        # the clock request latencies are measured by
+        self.clock = clock or systemClock
         self.instances = instances
 
         self.Delta = Delta
@@ -52,6 +55,10 @@ class Monitor:
         # `i`th protocol instance
         self.clientAvgReqLatencies = []  # type: List[Dict[str, Tuple[int, float]]]
 
+        # Distribution of the time taken to order a request by each protocol
+        # instance, for percentiles of the ordering latency
+        self.orderingLatencies = []  # type: List[Histogram]
+
     def __repr__(self):
         return self.name
 
@@ -74,6 +81,9 @@ class Monitor:
             ("request ordering started", self.requestOrderingStarted),
             ("master request latencies", self.masterReqLatencies),
             ("client avg request latencies", self.clientAvgReqLatencies),
+            ("ordering latency percentiles",
+                {i: self.getLatencyPercentiles(i)
+                 for i in range(len(self.orderingLatencies))}),
             ("throughput", {i: self.getThroughput(i)
                             for i in self.instances.ids}),
             ("master throughput", masterThrp),
@@ -98,6 +108,7 @@ class Monitor:
         self.requestOrderingStarted = {}
         self.masterReqLatencies = {}
         self.clientAvgReqLatencies = [{} for _ in self.instances.started]
+        self.orderingLatencies = [Histogram() for _ in self.instances.started]
 
     def addInstance(self):
         """
@@ -106,6 +117,7 @@ class Monitor:
         self.instances.add()
         self.numOrderedRequests.append((0, 0))
         self.clientAvgReqLatencies.append({})
+        self.orderingLatencies.append(Histogram())
 
     def requestOrdered(self, identifier: str, reqId: int, instId: int,
                        byMaster: bool = False):
@@ -117,10 +129,11 @@ class Monitor:
                           "but it was from a previous view".
                           format(identifier, reqId))
             return
-        duration = time.perf_counter() - self.requestOrderingStarted[
+        duration = self.clock.now() - self.requestOrderingStarted[
             (identifier, reqId)]
         reqs, tm = self.numOrderedRequests[instId]
         self.numOrderedRequests[instId] = (reqs + 1, tm + duration)
+        self.orderingLatencies[instId].add(duration)
         if byMaster:
             self.masterReqLatencies[(identifier, reqId)] = duration
         if identifier not in self.clientAvgReqLatencies[instId]:
@@ -136,7 +149,7 @@ class Monitor:
         """
         Record the time at which request ordering started.
         """
-        self.requestOrderingStarted[(identifier, reqId)] = time.perf_counter()
+        self.requestOrderingStarted[(identifier, reqId)] = self.clock.now()
 
     def isMasterDegraded(self):
         """
@@ -221,6 +234,20 @@ class Monitor:
                      "avg latencies to be acceptable".format(self))
         return False
 
+    def getLatencyPercentiles(self, instId: int,
+                              percentiles=(50, 90, 99)) -> Dict[int, float]:
+        """
+        Return the approximate percentiles of the time the specified instance
+        took to order requests, since the monitor was last reset.
+
+        :param instId: the id of the protocol instance
+        :param percentiles: the percentiles to return, between 0 and 100
+        """
+        if instId >= len(self.orderingLatencies):
+            return {}
+        h = self.orderingLatencies[instId]
+        return {p: h.percentile(p) for p in percentiles}
+
     def getThroughputs(self, masterInstId: int):
         """
         Return a tuple of  the throughput of the given instance and the average
@@ -1,61 +1,71 @@
 import asyncio
+import os
 import random
 import time
 from collections import deque, defaultdict, OrderedDict
 from functools import partial
 from hashlib import sha256
 from typing import Dict, Any, Mapping, Iterable, List, Optional, \
-    Sequence, Set
+    Sequence, Set, TYPE_CHECKING
 from typing import Tuple
 
-import pyorient
 from raet.raeting import AutoMode
 
 from ledger.compact_merkle_tree import CompactMerkleTree
 from ledger.ledger import Ledger
 from ledger.serializers.compact_serializer import CompactSerializer
-from ledger.stores.file_hash_store import FileHashStore
 from ledger.stores.hash_store import HashStore
-from ledger.stores.memory_hash_store import MemoryHashStore
 from ledger.util import F
+from plenum.common.clock import Clock, systemClock
 from plenum.common.exceptions import SuspiciousNode, SuspiciousClient, \
     MissingNodeOp, InvalidNodeOp, InvalidNodeMsg, InvalidClientMsgType, \
     InvalidClientOp, InvalidClientRequest, InvalidSignature, BaseExc, \
     InvalidClientMessageException, RaetKeysNotFoundException as REx
 from plenum.common.has_file_storage import HasFileStorage
+from plenum.common.memory_usage import HeapSnapshots, approxSize
+from plenum.common.metrics import Histogram, Timings
 from plenum.common.motor import Motor
+from plenum.common.profiling import StackSampler, newProfiler
 from plenum.common.raet import isLocalKeepSetup
 from plenum.common.stacked import ClientStacked
 from plenum.common.stacked import NodeStacked
 from plenum.common.startable import Status
-from plenum.common.txn import TXN_TYPE, TXN_ID, TXN_TIME
-from plenum.common.types import Request, Propagate, \
+from plenum.common.txn import TXN_TYPE, TXN_ID, TXN_TIME, BATCH
+from plenum.common.types import Request, Propagate, PropagateDigest, \
+    RequestFetch, BatchCodecs, CompressedBatch, \
     Reply, Nomination, OP_FIELD_NAME, TaggedTuples, Primary, \
     Reelection, PrePrepare, Prepare, Commit, \
     Ordered, RequestAck, InstanceChange, Batch, OPERATION, BlacklistMsg, f, \
     RequestNack, CLIENT_BLACKLISTER_SUFFIX, NODE_BLACKLISTER_SUFFIX, HA, \
     NODE_SECONDARY_STORAGE_SUFFIX, NODE_PRIMARY_STORAGE_SUFFIX, HS_ORIENT_DB, \
-    HS_FILE, NODE_HASH_STORE_SUFFIX, HS_MEMORY
+    HS_FILE, NODE_HASH_STORE_SUFFIX
 from plenum.common.util import getMaxFailures, MessageProcessor, getlogger, \
     getConfig
-from plenum.persistence.orientdb_hash_store import OrientDbHashStore
-from plenum.persistence.orientdb_store import OrientDbStore
 from plenum.persistence.secondary_storage import SecondaryStorage
 from plenum.persistence.storage import Storage, initStorage
 from plenum.server import primary_elector
 from plenum.server import replica
 from plenum.server.blacklister import SimpleBlacklister
 from plenum.server.client_authn import ClientAuthNr, SimpleAuthNr
+from plenum.server.client_intake import Accepted, ClientIntake, \
+    checksLikeWorkers
+from plenum.server.execution import ExecutionEngine
 from plenum.server.has_action_queue import HasActionQueue
 from plenum.server.instances import Instances
 from plenum.server.models import InstanceChanges
 from plenum.server.monitor import Monitor
+from plenum.server.plugin_loader import verifyOperations
 from plenum.server.pool_manager import HasPoolManager
 from plenum.server.primary_decider import PrimaryDecider
 from plenum.server.primary_elector import PrimaryElector
 from plenum.server.propagator import Propagator
 from plenum.server.router import Router
 from plenum.server.suspicion_codes import Suspicions
+from plenum.server.traffic import CLIENT_MSG, NODE_MSG, TrafficRecorder
+
+if TYPE_CHECKING:
+    # imported where it is used so that pyorient is only loaded when needed
+    from plenum.persistence.orientdb_store import OrientDbStore
 
 logger = getlogger()
 
@@ -80,7 +90,9 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
                  primaryDecider: PrimaryDecider = None,
                  opVerifiers: Iterable[Any]=None,
                  storage: Storage=None,
-                 config=None):
+                 config=None,
+                 clock: Clock=None,
+                 rng: random.Random=None):
 
         """
         Create a new node.
@@ -91,8 +103,15 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
             `cstack`
         :param primaryDecider: the mechanism to be used to decide the primary
         of a protocol instance
-        """
-        self.created = time.perf_counter()
+        :param clock: the clock used for timeouts, scheduled actions and
+            latency measurements; the system clock by default, or a
+            `VirtualClock` when the node runs in a simulation
+        :param rng: the source of the node's random numbers, such as those
+            of elections and of the jitter of connection retries; a seeded
+            one when the node runs in a simulation
+        """
+        self.clock = clock or systemClock
+        self.created = self.clock.now()
         self._name = name
         self.config = config or getConfig()
         self.basedirpath = basedirpath or config.baseDir
@@ -110,11 +129,13 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
 
         NodeStacked.__init__(self,
                              self.poolManager.nstack,
-                             self.poolManager.nodeReg)
+                             self.poolManager.nodeReg,
+                             self.clock,
+                             rng)
         ClientStacked.__init__(self,
                                self.poolManager.cstack)
 
-        HasActionQueue.__init__(self)
+        HasActionQueue.__init__(self, self.clock)
         Motor.__init__(self)
         Propagator.__init__(self)
 
@@ -123,6 +144,10 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         self.nodeInBox = deque()
         self.clientInBox = deque()
 
+        # Messages received from clients that are yet to be validated, which
+        # are validated together once the client stack has been serviced
+        self.clientMsgsToValidate = []  # type: List[Tuple[Any, str]]
+
         self.allNodeNames = list(self.nodeReg.keys())
         self.totalNodes = len(self.nodeReg)
         self.f = getMaxFailures(self.totalNodes)
@@ -145,7 +170,16 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
 
         self.monitor = Monitor(self.name,
                                Delta=.8, Lambda=60, Omega=5,
-                               instances=self.instances)
+                               instances=self.instances,
+                               clock=self.clock)
+
+        # Time spent in each phase of `prod`
+        self.phaseTimings = Timings()
+
+        # Time taken to verify the signature of each request, and to append
+        # each transaction to the ledger
+        self.signatureTimings = Histogram()
+        self.ledgerAppendTimings = Histogram()
 
         # Requests that are to be given to the replicas by the node. Each
         # element of the list is a deque for the replica with number equal to
@@ -156,6 +190,9 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         self.msgsToElector = deque()
 
         nodeRoutes = [(Propagate, self.processPropagate),
+                      (PropagateDigest, self.processPropagateDigest),
+                      (RequestFetch, self.processRequestFetch),
+                      (BatchCodecs, self.processBatchCodecs),
                       (InstanceChange, self.processInstanceChange)]
 
         nodeRoutes.extend((msgTyp, self.sendToElector) for msgTyp in
@@ -171,7 +208,9 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
 
         self.perfCheckFreq = 10
 
-        self._schedule(self.checkPerformance, self.perfCheckFreq)
+        # id of the scheduled performance check, so it can be cancelled
+        self.perfCheckAid = self._schedule(self.checkPerformance,
+                                           self.perfCheckFreq)
 
         self.clientBlacklister = SimpleBlacklister(
             self.name + CLIENT_BLACKLISTER_SUFFIX)  # type: Blacklister
@@ -184,17 +223,50 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         # verification. These are still subject to RAET's signature verification
         # but client signatures will not be checked on these. Expressly
         # prohibited from being in this is ClientRequest and Propagation,
-        # which both require client signature verification
+        # which both require client signature verification. A PROPAGATE by
+        # digest carries no request to verify; a request fetched for it
+        # arrives in a Propagation
         self.authnWhitelist = (Nomination, Primary, Reelection,
                                Batch,
                                PrePrepare, Prepare,
-                               Commit, InstanceChange)
+                               Commit, InstanceChange,
+                               PropagateDigest, RequestFetch,
+                               CompressedBatch, BatchCodecs)
         self.addReplicas()
 
         # Map of request identifier to client name. Used for
         # dispatching the processed requests to the correct client remote
         self.clientIdentifiers = {}     # Dict[str, str]
 
+        # Worker processes that check the messages of clients, if the node
+        # is configured to have them
+        self.clientIntake = ClientIntake(self.opVerifiers,
+                                         self.config.clientIntakeWorkers,
+                                         self.name) \
+            if self.config.clientIntakeWorkers else None
+
+        # Workers that compute ordered requests, if the node is configured to
+        # have them, and the requests ordered by the master since its replica
+        # outbox was last serviced, which they execute as a batch
+        self.executionEngine = ExecutionEngine(
+            self.config.executionWorkers, self.config.executionPoolType,
+            self.name) if self.config.executionWorkers else None
+        self.orderedToExecute = []  # type: List[Tuple[float, Request]]
+
+        # Records the messages the node receives, while it is recording
+        self.trafficRecorder = None  # type: TrafficRecorder
+
+        self.heapSnapshots = HeapSnapshots(
+            os.path.join(self.getDataLocation(), "heap"), self.name,
+            self.config.heapSnapshotFrames)
+        if self.config.traceMemoryFromStart:
+            self.heapSnapshots.start()
+
+        # The profiler running while the node is being profiled, and the id
+        # of the action that stops it
+        self.profiler = None
+        self.profilerStopAid = None
+
         self.hashStore = self.getHashStore(self.name)
         self.primaryStorage = storage or self.getPrimaryStorage()
         self.secondaryStorage = self.getSecondaryStorage()
@@ -223,18 +295,24 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
 
     def getHashStore(self, name) -> HashStore:
         """
-        Create and return a hashStore implementation based on configuration
+        Create and return a hashStore implementation based on configuration.
+        Only the module of the configured store is imported, so that a node
+        not using OrientDB does not load pyorient.
         """
         hsConfig = self.config.hashStore['type'].lower()
         if hsConfig == HS_FILE:
+            from ledger.stores.file_hash_store import FileHashStore
             return FileHashStore(dataDir=self.getDataLocation(),
                                  fileNamePrefix=NODE_HASH_STORE_SUFFIX)
         elif hsConfig == HS_ORIENT_DB:
+            import pyorient
+            from plenum.persistence.orientdb_hash_store import \
+                OrientDbHashStore
             return OrientDbHashStore(
                 self._getOrientDbStore(name, pyorient.DB_TYPE_GRAPH))
-        elif hsConfig == HS_MEMORY:
-            return MemoryHashStore()
         else:
+            # HS_MEMORY, which unknown types also fall back to
+            from ledger.stores.memory_hash_store import MemoryHashStore
             return MemoryHashStore()
 
     def getSecondaryStorage(self) -> SecondaryStorage:
@@ -251,7 +329,7 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
             return SecondaryStorage(txnStore=None,
                                     primaryStorage=self.primaryStorage)
 
-    def _getOrientDbStore(self, name, dbType) -> OrientDbStore:
+    def _getOrientDbStore(self, name, dbType) -> 'OrientDbStore':
         """
         Helper method that creates an instance of OrientdbStore.
 
@@ -259,6 +337,8 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         :param dbType: orientdb database type
         :return: orientdb store
         """
+        import pyorient
+        from plenum.persistence.orientdb_store import OrientDbStore
         return OrientDbStore(user=self.config.OrientDB["user"],
                              password=self.config.OrientDB["password"],
                              dbName=name,
@@ -275,6 +355,12 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
             self.primaryStorage.start(loop)
             self.startNodestack()
             self.startClientstack()
+            if self.clientIntake:
+                self.startClientIntake()
+            if self.config.trafficRecordDir:
+                self.startRecording(os.path.join(
+                    self.config.trafficRecordDir,
+                    "{}.traffic".format(self.name)))
 
             self.elector = self.newPrimaryDecider()
 
@@ -295,6 +381,33 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         else:
             return primary_elector.PrimaryElector(self)
 
+    def startRecording(self, path: str) -> None:
+        """
+        Start appending the messages this node receives from nodes and
+        clients to a recording, which `plenum.bench.replay` can replay. The
+        node's stacks must have been started.
+
+        :param path: the file to append to
+        """
+        self.stopRecording()
+        self.trafficRecorder = TrafficRecorder(
+            path, self.name, self.allNodeNames, self.clock,
+            self.config.trafficFlushInterval)
+        self.nodestack.msgHandler = self.trafficRecorder.wrap(
+            NODE_MSG, self.handleOneNodeMsg)
+        self.clientstack.msgHandler = self.trafficRecorder.wrap(
+            CLIENT_MSG, self.handleOneClientMsg)
+
+    def stopRecording(self) -> None:
+        if not self.trafficRecorder:
+            return
+        if self.nodestack:
+            self.nodestack.msgHandler = self.handleOneNodeMsg
+        if self.clientstack:
+            self.clientstack.msgHandler = self.handleOneClientMsg
+        self.trafficRecorder.close()
+        self.trafficRecorder = None
+
     @property
     def nodeCount(self) -> int:
         """
@@ -308,14 +421,27 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         """
         Actions to be performed on stopping the node.
 
+        - Send the messages held back to fill batches
         - Close the UDP socket of the nodestack
+        - Stop the client intake workers
+        - Stop the execution workers
+        - Stop recording received messages
+        - Stop profiling
         """
         if self.nodestack:
+            self.flushOutBoxes(force=True)
+            self.nodestack.flushTx()
             self.nodestack.close()
             self.nodestack = None
         if self.clientstack:
             self.clientstack.close()
             self.clientstack = None
+        if self.clientIntake:
+            self.clientIntake.stop()
+        if self.executionEngine:
+            self.executionEngine.stop()
+        self.stopRecording()
+        self.stopProfiling()
         self.reset()
         self.logstats()
         self.conns.clear()
@@ -325,8 +451,8 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
     def reset(self):
         logger.info("{} reseting...".format(self), extra={"cli": False})
         self.nextCheck = 0
-        self.aqStash.clear()
-        self.actionQueue.clear()
+        self._clearActions()
+        self.perfCheckAid = None
         self.elector = None
 
     async def prod(self, limit: int=None) -> int:
@@ -337,17 +463,56 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         :param limit: the number of items to be serviced in this attempt
         :return: total number of messages serviced by this node
         """
+        t = self.phaseTimings
+        s = time.perf_counter()
         await self.serviceLifecycle()
+        s = t.lap("lifecycle", s)
         c = 0
         if self.status is not Status.stopped:
             c += await self.serviceNodeMsgs(limit)
+            s = t.lap("node msgs", s)
             c += await self.serviceReplicas(limit)
+            s = t.lap("replicas", s)
             c += await self.serviceClientMsgs(limit)
+            s = t.lap("client msgs", s)
             c += self._serviceActions()
+            s = t.lap("actions", s)
             c += await self.serviceElector()
+            s = t.lap("elector", s)
             self.flushOutBoxes()
+            t.lap("flush", s)
         return c
 
+    def nextWakeup(self) -> float:
+        """
+        The time by which this node needs to be prodded again, which is the
+        earliest of its stacks', its action queues' and its connection
+        maintenance deadlines.
+        """
+        if self.status is Status.stopped:
+            return float('inf')
+        if self.actionQueue:
+            return 0
+        deadlines = [self.aqNextCheck]
+        if self.elector:
+            if self.elector.actionQueue:
+                return 0
+            deadlines.append(self.elector.aqNextCheck)
+        if self.isGoing():
+            deadlines.append(self.nextCheck)
+        deadlines.append(self.nextFlush())
+        for stack in (self.nodestack, self.clientstack):
+            if stack:
+                deadlines.append(stack.nextWakeup())
+        return min(deadlines)
+
+    def wakeupFds(self):
+        fds = [stack.fileno() for stack in (self.nodestack, self.clientstack)
+               if stack]
+        if self.clientIntake:
+            fds.extend(self.clientIntake.filenos())
+        return fds
+
     async def serviceReplicas(self, limit) -> int:
         """
         Execute `serviceReplicaMsgs`, `serviceReplicaOutBox` and
@@ -382,6 +547,9 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         :return: the number of messages successfully processed
         """
         c = await self.clientstack.service(limit)
+        if self.clientIntake:
+            self.serviceClientIntake()
+        self.validateClientMsgs()
         await self.processClientInBox()
         return c
 
@@ -406,8 +574,13 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         - Set status to one of started, started_hungry or starting depending on
             the number of protocol instances.
         - Check protocol instances. See `checkProtocolInstaces()`
+        - Tell new connections which codecs batches can be compressed with.
 
         """
+        for n in staleConns:
+            self.remoteCodecs.pop(n, None)
+        for n in newConns:
+            self.advertiseCodecs(n)
         if self.isGoing():
             if self.nodeCount >= self.totalNodes:
                 self.status = Status.started
@@ -540,6 +713,8 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
                 else:
                     logger.error("Received msg {} and don't know how to "
                                  "handle it".format(msg))
+        if self.orderedToExecute:
+            await self.executeOrdered()
         return msgCount
 
     def serviceReplicaInBox(self, limit: int=None):
@@ -654,6 +829,8 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         :param wrappedMsg: Tuple of message and the name of the node that sent
         the message
         """
+        if self.lastcheck:
+            self.remoteActive(wrappedMsg[1])
         try:
             vmsg = self.validateNodeMsg(wrappedMsg)
             if vmsg:
@@ -702,7 +879,8 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
     def unpackNodeMsg(self, msg, frm) -> None:
         """
         If the message is a batch message validate each message in the batch,
-        otherwise add the message to the node's inbox.
+        or the batch in it if it is compressed, otherwise add the message to
+        the node's inbox.
 
         :param msg: a node message
         :param frm: the name of the node that sent this `msg`
@@ -710,6 +888,8 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         if isinstance(msg, Batch):
             for m in msg.messages:
                 self.handleOneNodeMsg((m, frm))
+        elif isinstance(msg, CompressedBatch):
+            self.handleOneNodeMsg((self.decompressBatch(msg), frm))
         else:
             self.postToNodeInBox(msg, frm)
 
@@ -736,12 +916,43 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
 
     def handleOneClientMsg(self, wrappedMsg):
         """
-        Validate and process a client message
+        Queue a client message to be validated along with the others received
+        since the client stack was last serviced, or hand it to the client
+        intake workers to be validated
+
+        :param wrappedMsg: a message from a client
+        """
+        if self.clientIntake:
+            self.sendToClientIntake(wrappedMsg)
+            return
+        self.clientMsgsToValidate.append(wrappedMsg)
+
+    def validateClientMsgs(self):
+        """
+        Validate and process the queued client messages, checking the
+        operations of all their requests with the VERIFICATION plugins at
+        once. The messages of batches are queued as they are unpacked, and
+        validated together afterwards.
+        """
+        while self.clientMsgsToValidate:
+            wrappedMsgs = self.clientMsgsToValidate
+            self.clientMsgsToValidate = []
+            opErrors = self.checkValidOperations(wrappedMsgs)
+            for wrappedMsg, opError in zip(wrappedMsgs, opErrors):
+                self.validateOneClientMsg(wrappedMsg, opError)
+
+    def validateOneClientMsg(self, wrappedMsg, opError: Exception=None):
+        """
+        Validate and process a client message whose operation has been
+        checked by the VERIFICATION plugins.
 
         :param wrappedMsg: a message from a client
+        :param opError: why the plugins found the operation invalid, if they
+            did
         """
         try:
-            vmsg = self.validateClientMsg(wrappedMsg)
+            vmsg = self.validateClientMsg(wrappedMsg, opChecked=True,
+                                          opError=opError)
             if vmsg:
                 self.unpackClientMsg(*vmsg)
         except SuspiciousClient as ex:
@@ -760,11 +971,83 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         self.transmitToClient(RequestNack(ex.reqId, reason), frm)
         self.discard(wrappedMsg, ex, logger.warning, cliOutput=True)
 
-    def validateClientMsg(self, wrappedMsg):
+    def startClientIntake(self):
+        """
+        Start the client intake workers, unless they cannot authenticate
+        requests the way the node's client authenticator does, in which case
+        the node checks the messages of clients itself.
+        """
+        if not checksLikeWorkers(self.clientAuthNr):
+            logger.error("{} cannot check client messages in workers with "
+                         "the client authenticator {}, so it checks them "
+                         "itself".format(self,
+                                         type(self.clientAuthNr).__name__),
+                         extra={"cli": False})
+            self.clientIntake = None
+            return
+        self.clientIntake.start()
+
+    def sendToClientIntake(self, wrappedMsg):
+        """
+        Queue a message from a client for the client intake workers, along
+        with the verification keys of the identifiers it has requests of.
+
+        :param wrappedMsg: a message from a client
+        """
+        msg, frm = wrappedMsg
+        if self.isClientBlacklisted(frm):
+            self.discard(msg, "received from blacklisted client {}"
+                         .format(frm), logger.info)
+            return
+        verkeys = {}
+        if isinstance(msg, Mapping):
+            msgs = msg.get(f.MSGS.nm) if msg.get(OP_FIELD_NAME) == BATCH \
+                else (msg,)
+            for m in msgs or ():
+                identifier = m.get(f.IDENTIFIER.nm) \
+                    if isinstance(m, Mapping) else None
+                if identifier and identifier not in verkeys:
+                    try:
+                        verkeys[identifier] = \
+                            self.clientAuthNr.getVerkey(identifier)
+                    except KeyError:
+                        continue
+                    if self.trafficRecorder:
+                        self.trafficRecorder.addVerkey(identifier,
+                                                       verkeys[identifier])
+        self.clientIntake.add(msg, frm, verkeys)
+
+    def serviceClientIntake(self):
+        """
+        Hand the messages received from clients to the client intake
+        workers, and add the requests they accepted to the clientInBox and
+        reject the others.
+        """
+        self.clientIntake.flush()
+        for result in self.clientIntake.results():
+            if isinstance(result, Accepted):
+                req = Request.fromState(result.state, result.signingBytes)
+                logger.trace("{} received CLIENT message: {}".
+                             format(self.clientstack.name, req))
+                self.postToClientInBox(req, result.frm)
+            else:
+                if result.suspicious:
+                    self.reportSuspiciousClient(result.frm, result.reason)
+                self.transmitToClient(
+                    RequestNack(result.reqId, "client request invalid: {}".
+                                format(result.reason)), result.frm)
+                self.discard((result.msg, result.frm), result.reason,
+                             logger.warning, cliOutput=True)
+
+    def validateClientMsg(self, wrappedMsg, opChecked: bool=False,
+                          opError: Exception=None):
         """
         Validate a message sent by a client.
 
         :param wrappedMsg: a message from a client
+        :param opChecked: whether the VERIFICATION plugins have checked the
+            operation of the message already
+        :param opError: why they found the operation invalid, if they did
         :return: Tuple of clientMessage and client address
         """
         msg, frm = wrappedMsg
@@ -775,9 +1058,13 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
 
         if all(attr in msg.keys()
                for attr in [OPERATION, f.IDENTIFIER.nm, f.REQ_ID.nm]):
-            self.checkValidOperation(msg[f.IDENTIFIER.nm],
-                                     msg[f.REQ_ID.nm],
-                                     msg[OPERATION])
+            if not opChecked:
+                self.checkValidOperation(msg[f.IDENTIFIER.nm],
+                                         msg[f.REQ_ID.nm],
+                                         msg[OPERATION])
+            elif opError:
+                raise InvalidClientRequest(msg[f.IDENTIFIER.nm],
+                                           msg[f.REQ_ID.nm]) from opError
             cls = Request
         elif OP_FIELD_NAME in msg:
             op = msg.pop(OP_FIELD_NAME)
@@ -895,6 +1182,7 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
             self.clientIdentifiers[request.identifier] = clientName
 
         self.requests.addPropagate(request, frm)
+        self.applyDigestPropagates(request)
 
         self.propagate(request, clientName)
         self.tryForwarding(request)
@@ -925,7 +1213,10 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
             key = (identifier, reqId)
             if key in self.requests:
                 req = self.requests[key].request
-                await self.executeRequest(ppTime, req)
+                if self.executionEngine:
+                    self.orderedToExecute.append((ppTime, req))
+                else:
+                    await self.executeRequest(ppTime, req)
                 logger.debug("Node {} executing client request {} {}".
                              format(self.name, identifier, reqId))
             # If the client request hasn't reached the node but corresponding
@@ -933,7 +1224,7 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
             # then retry 3 times
             elif retryNo < 3:
                 retryNo += 1
-                asyncio.sleep(random.randint(2, 4))
+                asyncio.sleep(self.random.randint(2, 4))
                 await self.processOrdered(ordered, retryNo)
                 logger.debug("Node {} retrying executing client request {} {}".
                              format(self.name, identifier, reqId))
@@ -997,7 +1288,9 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         :returns True if master performance is OK, otherwise False
         """
         logger.debug("{} checking its performance".format(self))
-        self._schedule(self.checkPerformance, self.perfCheckFreq)
+        self._cancel(self.perfCheckAid)
+        self.perfCheckAid = self._schedule(self.checkPerformance,
+                                           self.perfCheckFreq)
 
         if self.instances.masterId is not None:
             if self.monitor.isMasterDegraded():
@@ -1024,6 +1317,29 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
 
         await self.requestExecuter[req.operation.get(TXN_TYPE)](ppTime, req)
 
+    async def executeOrdered(self) -> None:
+        """
+        Execute the requests ordered by the master since the last time, on
+        the execution workers, in the order they were ordered. A request
+        whose execution raises is logged and discarded rather than executed
+        again, as it may have changed state before it failed, and the
+        requests after it are executed still.
+        """
+        batch, self.orderedToExecute = self.orderedToExecute, []
+        while batch:
+            try:
+                await self.executionEngine.run(
+                    batch,
+                    lambda req:
+                    self.requestExecuter[req.operation.get(TXN_TYPE)])
+            except Exception as ex:
+                # the engine leaves the request that failed at the head of
+                # the batch
+                _, req = batch.pop(0)
+                logger.error("{} could not execute request {} {}: {}".
+                             format(self, req.identifier, req.reqId,
+                                    ex.__repr__()))
+
     # TODO: Find a better name for the function
     async def doCustomAction(self, ppTime, req):
         reply = await self.generateReply(ppTime, req)
@@ -1089,12 +1405,23 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
             typ = ''
             req = msg
 
-        if not isinstance(req, Mapping):
-            req = msg.__getstate__()
+        # a Request is authenticated as it is, so that its serialization is
+        # kept with it
+        if isinstance(req, Request):
+            reqId = req.reqId
+        else:
+            if not isinstance(req, Mapping):
+                req = msg.__getstate__()
+            reqId = req['reqId']
 
+        started = time.perf_counter()
         identifier = self.clientAuthNr.authenticate(req)
+        self.signatureTimings.add(time.perf_counter() - started)
+        if self.trafficRecorder:
+            self.trafficRecorder.addVerkey(
+                identifier, self.clientAuthNr.getVerkey(identifier))
         logger.debug("{} authenticated {} signature on {}request {}".
-                     format(self, identifier, typ, req['reqId']),
+                     format(self, identifier, typ, reqId),
                      extra={"cli": True})
 
     async def generateReply(self,
@@ -1117,8 +1444,10 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
                   TXN_TIME: ppTime,
                   TXN_TYPE: req.operation.get(TXN_TYPE)}
         txnRslt = Reply(result)
+        started = time.perf_counter()
         merkleProof = await self.primaryStorage.append(
             identifier=req.identifier, reply=txnRslt, txnId=txnId)
+        self.ledgerAppendTimings.add(time.perf_counter() - started)
         result.update(merkleProof)
         return Reply(result)
 
@@ -1146,7 +1475,7 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
                     self.nodestack.removeRemote(r)
 
             # if just starting, then bootstrap
-            force = time.perf_counter() - self.created > 5
+            force = self.clock.now() - self.created > 5
             self.maintainConnections(force=force)
 
     def stopKeySharing(self, timedOut=False):
@@ -1166,11 +1495,34 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
 
     def checkValidOperation(self, clientId, reqId, msg):
         if self.opVerifiers:
-            try:
-                for v in self.opVerifiers:
-                    v.verify(msg)
-            except Exception as ex:
-                raise InvalidClientRequest(clientId, reqId) from ex
+            error, = verifyOperations(self.opVerifiers, [msg])
+            if error:
+                raise InvalidClientRequest(clientId, reqId) from error
+
+    def checkValidOperations(self, wrappedMsgs) -> List[Optional[Exception]]:
+        """
+        Check the operations of the requests among client messages with the
+        VERIFICATION plugins, all at once. The messages of blacklisted
+        clients are not checked, as they are discarded.
+
+        :param wrappedMsgs: messages from clients
+        :return: for each message, why the plugins found its operation
+            invalid, or None
+        """
+        errors = [None] * len(wrappedMsgs)  # type: List[Optional[Exception]]
+        if not self.opVerifiers:
+            return errors
+        requests = [i for i, (msg, frm) in enumerate(wrappedMsgs)
+                    if isinstance(msg, Mapping) and
+                    all(attr in msg for attr in
+                        (OPERATION, f.IDENTIFIER.nm, f.REQ_ID.nm)) and
+                    not self.isClientBlacklisted(frm)]
+        results = verifyOperations(self.opVerifiers,
+                                   [wrappedMsgs[i][0][OPERATION]
+                                    for i in requests])
+        for i, error in zip(requests, results):
+            errors[i] = error
+        return errors
 
     async def checkRequestAuthorized(self, request):
         """
@@ -1285,6 +1637,64 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.stop()
 
+    def metrics(self):
+        """
+        Return this node's metrics, those of its monitor followed by the time
+        spent in each phase of `prod`, the sizes of the batches sent to
+        other nodes and how well they compressed, the retries to connect to
+        disconnected nodes, and the counts of the client intake and the
+        execution workers if it has them, as a list of name and value tuples.
+        """
+        return self.monitor.metrics() + \
+            [("phase {}".format(n), v)
+             for n, v in self.phaseTimings.metrics()] + \
+            [("batch sizes", self.batchSizes.summary()),
+             ("batch compression", self.batchCompression.summary())] + \
+            [("reconnects", self.reconnectSummary())] + \
+            ([("client intake", self.clientIntake.summary())]
+             if self.clientIntake else []) + \
+            ([("execution", self.executionEngine.summary())]
+             if self.executionEngine else [])
+
+    def perfSnapshot(self) -> OrderedDict:
+        """
+        Return what the live performance view of a node shows: the requests
+        ordered by, the throughput of and the ordering latency percentiles of
+        each protocol instance, the master's throughput relative to the
+        backups', the depths of the node's queues, and the counts and times
+        of signature verifications and ledger appends. Counts are cumulative,
+        so rates are worked out from two snapshots (see
+        `plenum.cli.perf_view`).
+        """
+        instIds = range(len(self.monitor.numOrderedRequests))
+        queues = OrderedDict([
+            ("nodeInBox", len(self.nodeInBox)),
+            ("clientInBox", len(self.clientInBox)),
+            ("msgsToReplicas", sum(len(q) for q in self.msgsToReplicas)),
+            ("replica inBoxes", sum(len(r.inBox) for r in self.replicas)),
+            ("replica outBoxes", sum(len(r.outBox) for r in self.replicas)),
+            ("outBoxes", sum(len(q) for q in self.outBoxes.values())),
+            ("unordered requests",
+             len(self.monitor.requestOrderingStarted))])
+        verified = self.signatureTimings.count
+        if self.clientIntake:
+            verified += self.clientIntake.accepted + self.clientIntake.rejected
+        return OrderedDict([
+            ("time", self.clock.now()),
+            ("master", self.instances.masterId),
+            ("ordered", OrderedDict(
+                (i, self.monitor.numOrderedRequests[i][0]) for i in instIds)),
+            ("throughput", OrderedDict(
+                (i, self.monitor.getThroughput(i)) for i in instIds)),
+            ("latency", OrderedDict(
+                (i, self.monitor.getLatencyPercentiles(i)) for i in instIds)),
+            ("master throughput ratio", self.monitor.masterThroughputRatio()
+             if self.instances.masterId is not None else None),
+            ("queues", queues),
+            ("signatures verified", verified),
+            ("signature verification", self.signatureTimings.summary()),
+            ("ledger appends", self.ledgerAppendTimings.summary())])
+
     def logstats(self):
         """
         Print the node's current statistics to log.
@@ -1297,9 +1707,9 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
         l("client inbox size       : {}".
                     format(len(self.clientInBox)))
         l("age (seconds)           : {}".
-                    format(time.perf_counter() - self.created))
+                    format(self.clock.now() - self.created))
         l("next check for reconnect: {}".
-                    format(time.perf_counter() - self.nextCheck))
+                    format(self.clock.now() - self.nextCheck))
         l("node connections        : {}".format(self._conns))
         l("f                       : {}".format(self.f))
         l("master instance         : {}".format(self.instances.masterId))
@@ -1316,3 +1726,158 @@ class Node(HasActionQueue, NodeStacked, ClientStacked, Motor,
                     format(len(self.aqStash), id(self.aqStash)))
 
         logger.info("\n".join(lines), extra={"cli": False})
+
+    def memoryUsage(self, sample: int=100) -> OrderedDict:
+        """
+        Return the number of elements in and the approximate bytes taken by
+        each of the structures this node keeps: its requests and client
+        identifiers, its inboxes and outboxes, the maps and queues of each
+        replica, of the elector and of the monitor, and the remotes of its
+        stacks.
+
+        :param sample: number of elements measured of a larger structure,
+            whose size is then extrapolated (see `approxSize`)
+        """
+        structures = [("requests", self.requests),
+                      ("clientIdentifiers", self.clientIdentifiers),
+                      ("forwardedRequests", self.forwardedRequests),
+                      ("digestPropagates", self.digestPropagates),
+                      ("requestFetches", self.requestFetches),
+                      ("nodeInBox", self.nodeInBox),
+                      ("clientInBox", self.clientInBox),
+                      ("msgsToReplicas", self.msgsToReplicas),
+                      ("msgsToElector", self.msgsToElector),
+                      ("outBoxes", self.outBoxes),
+                      ("aqStash", self.aqStash)]
+        for r in self.replicas:
+            for attr in ("prePrepares", "sentPrePrepares", "prepares",
+                         "commits", "ordered", "reqsPendingPrePrepare",
+                         "preparesWaitingForPrePrepare", "inBox",
+                         "inBoxStash", "outBox", "postElectionMsgs",
+                         "threePhaseMsgsForLaterView"):
+                structures.append(("{} {}".format(r.name, attr),
+                                   getattr(r, attr)))
+        if self.elector:
+            for attr in ("nominations", "primaryDeclarations",
+                         "scheduledPrimaryDecisions", "reElectionProposals",
+                         "reElectionRounds", "pendingMsgsForViews",
+                         "duplicateMsgs", "inBox", "outBox"):
+                if hasattr(self.elector, attr):
+                    structures.append(("elector {}".format(attr),
+                                       getattr(self.elector, attr)))
+        for attr in ("requestOrderingStarted", "masterReqLatencies",
+                     "clientAvgReqLatencies"):
+            structures.append(("monitor {}".format(attr),
+                               getattr(self.monitor, attr)))
+        for stack in (self.nodestack, self.clientstack):
+            if stack:
+                structures.append(("{} remotes".format(stack.name),
+                                   stack.remotes))
+
+        # structures refer back to these, which are not theirs to count
+        exclude = [self, self.nodestack, self.clientstack, self.elector,
+                   self.monitor] + self.replicas
+        usage = OrderedDict()
+        for name, structure in structures:
+            count, size = approxSize(structure, sample, exclude)
+            usage[name] = OrderedDict([("count", count), ("bytes", size)])
+        return usage
+
+    def dumpHeapSnapshot(self, top: int=10):
+        """
+        Dump a heap snapshot of this node's process, taken with
+        `tracemalloc`. If allocations are not traced yet, tracing starts
+        now and the first snapshot is taken at the next call.
+
+        :param top: number of lines of code to report
+        :return: the file the snapshot is in and the lines of code that
+            allocated most memory, or grew most since the previous snapshot;
+            None if tracing just started
+        """
+        if not self.heapSnapshots.isTracing:
+            self.heapSnapshots.start()
+            logger.info("{} started tracing memory allocations; the next "
+                        "heap snapshot can be taken after it has run for a "
+                        "while".format(self), extra={"cli": False})
+            return None
+        path, stats = self.heapSnapshots.take(top)
+        logger.info("{} dumped a heap snapshot to {}; top allocations:\n{}".
+                    format(self, path, "\n".join(stats)),
+                    extra={"cli": False})
+        return path, stats
+
+    def startProfiling(self, mode: str=None, duration: float=None) -> None:
+        """
+        Start profiling the thread this node runs in, which is the Looper's
+        and so covers whatever else the Looper runs.
+
+        :param mode: `sample` to sample stacks or `cprofile` to profile
+            every call; `profileMode` in the config by default
+        :param duration: seconds after which to stop profiling;
+            `profileDuration` in the config by default, and no limit if that
+            is None or 0
+        """
+        if self.profiler:
+            return
+        self.profiler = newProfiler(mode or self.config.profileMode,
+                                    self.config.profileSampleInterval)
+        self.profiler.start()
+        duration = self.config.profileDuration if duration is None \
+            else duration
+        if duration:
+            self.profilerStopAid = self._schedule(self.stopProfiling,
+                                                  duration)
+        logger.info("{} started profiling{}".
+                    format(self, " for {} seconds".format(duration)
+                           if duration else ""),
+                    extra={"cli": False})
+
+    def stopProfiling(self) -> Optional[str]:
+        """
+        Stop profiling and write the profile to the node's data directory,
+        as collapsed stacks for a sampling profile or as pstats for a
+        cProfile one.
+
+        :return: the file the profile is in, or None if the node was not
+            being profiled
+        """
+        if not self.profiler:
+            return None
+        self.profiler.stop()
+        if self.profilerStopAid:
+            self._cancel(self.profilerStopAid)
+            self.profilerStopAid = None
+        directory = os.path.join(self.getDataLocation(), "profiles")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "{}-{}.{}".format(
+            self.name, time.strftime("%Y%m%d-%H%M%S"),
+            "collapsed" if isinstance(self.profiler, StackSampler)
+            else "pstats"))
+        self.profiler.write(path)
+        self.profiler = None
+        logger.info("{} stopped profiling and wrote the profile to {}".
+                    format(self, path), extra={"cli": False})
+        return path
+
+    def toggleProfiling(self) -> Optional[str]:
+        """
+        Start profiling if the node is not being profiled, or else stop and
+        return the file the profile was written to.
+        """
+        if self.profiler:
+            return self.stopProfiling()
+        self.startProfiling()
+
+    def logMemoryUsage(self):
+        """
+        Log the memory usage of this node's structures and dump a heap
+        snapshot. Nodes started by `start_plenum_node` do this on the
+        signal named by `memorySignal` in the config.
+        """
+        lines = ["node {} memory usage".format(self),
+                 "--------------------------------------------------------"]
+        for name, usage in self.memoryUsage().items():
+            lines.append("{:<48}: {:>8} elements {:>12} bytes".
+                         format(name, usage["count"], usage["bytes"]))
+        logger.info("\n".join(lines), extra={"cli": False})
+        self.dumpHeapSnapshot()
@@ -4,7 +4,7 @@ import sys
 from importlib import import_module
 from os import listdir
 from os.path import isfile, join
-from typing import Any, Set, Dict
+from typing import Any, Set, Dict, Iterable, List, Optional, Sequence
 
 from plenum.common.util import getlogger
 
@@ -31,6 +31,12 @@ class PluginLoader:
     of the VERIFICATION plugin should raise an exception if the msg is not
     valid.
 
+    A VERIFICATION plugin may also have a verify_many(operations) method,
+    which the Node calls instead of verify with the operations of all the
+    requests it checks at once (see `verifyOperations`). It returns, for
+    each operation in order, None if it is valid, or an exception or a
+    reason if it is not.
+
     Example plugin, in a file named 'plugin_name_verifier.py':
 
     class NameVerifier:
@@ -104,3 +110,42 @@ class PluginLoader:
             logger.warning("no plugins found in {}".format(self.path),
                            extra={"cli": "WARNING"})
         return plugins
+
+
+def verifyOperations(verifiers: Iterable[Any],
+                     operations: Sequence[Any]) -> List[Optional[Exception]]:
+    """
+    Check operations with VERIFICATION plugins, in turn, each seeing only the
+    operations the ones before it found valid. A plugin with a verify_many
+    method is called once with all of them; the others' verify is called for
+    each.
+
+    :return: for each operation, None if every plugin found it valid, or the
+        exception of the first plugin that did not
+    """
+    errors = [None] * len(operations)  # type: List[Optional[Exception]]
+    for verifier in verifiers:
+        pending = [i for i, e in enumerate(errors) if e is None]
+        if not pending:
+            break
+        verifyMany = getattr(verifier, "verify_many", None)
+        if verifyMany is None:
+            for i in pending:
+                try:
+                    verifier.verify(operations[i])
+                except Exception as ex:
+                    errors[i] = ex
+            continue
+        try:
+            results = list(verifyMany([operations[i] for i in pending]))
+            if len(results) != len(pending):
+                raise ValueError("{} returned {} results for {} operations".
+                                 format(verifyMany, len(results),
+                                        len(pending)))
+        except Exception as ex:
+            results = [ex] * len(pending)
+        for i, result in zip(pending, results):
+            if result is not None:
+                errors[i] = result if isinstance(result, Exception) \
+                    else ValueError(result)
+    return errors
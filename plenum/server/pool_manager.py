@@ -156,7 +156,7 @@ class TxnPoolManager(PoolManager):
         except Exception as ex:
             logger.debug("Exception while initializing keep for remote {}".
                          format(ex))
-        self.node.nodestack.nodeReg[nodeName] = HA(*nodeHa)
+        self.node.nodeReg[nodeName] = HA(*nodeHa)
 
 
 class RegistryPoolManager(PoolManager):
@@ -6,7 +6,8 @@ from plenum.server.has_action_queue import HasActionQueue
 
 class PrimaryDecider(HasActionQueue, MessageProcessor):
     def __init__(self, node):
-        HasActionQueue.__init__(self)
+        HasActionQueue.__init__(self, node.clock)
+        self.random = node.random
 
         self.name = node.name
         self.f = node.f
@@ -1,7 +1,5 @@
 import logging
 import math
-import random
-import time
 from collections import Counter, deque
 from functools import partial
 from typing import Sequence, Any, Union
@@ -36,6 +34,10 @@ class PrimaryElector(PrimaryDecider):
 
         self.scheduledPrimaryDecisions = {}
 
+        # Ids of the delayed primary decision actions, by instance id, so that
+        # they can be cancelled once the decision is no longer needed
+        self.primaryDecisionAids = {}  # Dict[int, int]
+
         self.reElectionProposals = {}
 
         self.reElectionRounds = {}
@@ -206,7 +208,7 @@ class PrimaryElector(PrimaryDecider):
         undecideds = [i for i, r in enumerate(self.replicas)
                       if r.isPrimary is None]
         if undecideds:
-            chosen = random.choice(undecideds)
+            chosen = self.random.choice(undecideds)
             logger.debug("Node {} does not have a primary, "
                          "replicas {} are undecided, "
                          "choosing {} to nominate".
@@ -243,7 +245,7 @@ class PrimaryElector(PrimaryDecider):
         """
         self.nominations[instId] = {}
         self.primaryDeclarations[instId] = {}
-        self.scheduledPrimaryDecisions[instId] = None
+        self.cancelPrimaryDecision(instId)
         self.reElectionProposals[instId] = {}
         self.duplicateMsgs = {}
 
@@ -429,7 +431,7 @@ class PrimaryElector(PrimaryDecider):
                     # until that delay and because a nominate from another
                     # node might be sent
                     self._schedule(partial(self.nominateReplica, instId),
-                                   random.randint(1, 3))
+                                   self.random.randint(1, 3))
                 else:
                     # Now try to nominate self again as there is a reelection
                     self.nominateReplica(instId)
@@ -590,7 +592,7 @@ class PrimaryElector(PrimaryDecider):
         """
         replica = self.replicas[instId]
         self.primaryDeclarations[instId][replica.name] = primaryName
-        self.scheduledPrimaryDecisions[instId] = None
+        self.cancelPrimaryDecision(instId)
         logger.debug("{} declaring primary as: {} on the basis of {}".
                      format(replica, primaryName,
                             self.nominations[instId]))
@@ -609,7 +611,7 @@ class PrimaryElector(PrimaryDecider):
         primaryCandidates = primaryCandidates if primaryCandidates \
             else self.getPrimaryCandidates(instId)
         self.reElectionProposals[instId][replica.name] = primaryCandidates
-        self.scheduledPrimaryDecisions[instId] = None
+        self.cancelPrimaryDecision(instId)
         logger.debug("{} declaring reelection round {} for: {}".
                      format(replica.name,
                             self.reElectionRounds[instId], primaryCandidates))
@@ -634,9 +636,9 @@ class PrimaryElector(PrimaryDecider):
         replica = self.replicas[instId]
         if not self.scheduledPrimaryDecisions[instId]:
             logging.debug("{} scheduling primary decision".format(replica))
-            self.scheduledPrimaryDecisions[instId] = time.perf_counter()
-            self._schedule(partial(self.decidePrimary, instId),
-                           (1 * self.nodeCount))
+            self.scheduledPrimaryDecisions[instId] = self.clock.now()
+            self.primaryDecisionAids[instId] = self._schedule(
+                partial(self.decidePrimary, instId), (1 * self.nodeCount))
         else:
             logger.debug(
                 "{} already scheduled primary decision".format(replica))
@@ -647,13 +649,21 @@ class PrimaryElector(PrimaryDecider):
                     .format(replica))
                 self._schedule(partial(self.decidePrimary, instId))
 
+    def cancelPrimaryDecision(self, instId: int):
+        """
+        Forget the primary decision timer for the protocol instance specified
+        by `instId` and cancel its delayed decision if it has not run yet.
+        """
+        self.scheduledPrimaryDecisions[instId] = None
+        self._cancel(self.primaryDecisionAids.pop(instId, None))
+
     def hasPrimaryDecisionTimerExpired(self, instId: int) -> bool:
         """
         Check whether there has been a timeout while waiting for elections.
 
         :param instId: id of the instance for which elections are happening.
         """
-        return (time.perf_counter() - self.scheduledPrimaryDecisions[instId]) \
+        return (self.clock.now() - self.scheduledPrimaryDecisions[instId]) \
                > (1 * self.nodeCount)
 
     def send(self, msg):
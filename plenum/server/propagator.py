@@ -1,7 +1,11 @@
 import logging
-from typing import Dict, Tuple, Union
+from functools import partial
+from typing import Dict, Set, Tuple, Union
 
-from plenum.common.types import Request, Propagate
+from plenum.common.exceptions import RemoteNotFound
+from plenum.common.types import Request, Propagate, PropagateDigest, \
+    RequestFetch
+from plenum.common.util import getConfig
 
 logger = logging.getLogger(__name__)
 
@@ -10,12 +14,28 @@ class ReqState:
     """
     Object to store the state of the request.
     """
+    __slots__ = ("request", "forwarded", "propagates")
+
     def __init__(self, request: Request):
         self.request = request
         self.forwarded = False
         self.propagates = set()
 
 
+class FetchState:
+    """
+    Object to store the state of fetching a request this node does not have.
+    """
+    __slots__ = ("asked", "attempts", "aid")
+
+    def __init__(self):
+        # the nodes asked since the last time all of them were
+        self.asked = set()
+        self.attempts = 0
+        # the id of the action that asks the next node
+        self.aid = None
+
+
 class Requests(Dict[Tuple[str, int], ReqState]):
     """
     Storing client request object corresponding to each client and its
@@ -99,6 +119,19 @@ class Propagator:
     def __init__(self):
         self.requests = Requests()
 
+        config = getConfig()
+        self.propagateByDigest = config.propagateByDigest
+        self.requestFetchTimeout = config.requestFetchTimeout
+        self.requestFetchAttempts = config.requestFetchAttempts
+        self.maxPendingRequestFetches = config.maxPendingRequestFetches
+
+        # PROPAGATEs by digest of requests this node does not have yet, by
+        # request key, then by digest, to the set of nodes that sent them
+        self.digestPropagates = {}  # type: Dict[Tuple[str, int], Dict[str, Set[str]]]
+
+        # the fetching of each request in `digestPropagates`, oldest first
+        self.requestFetches = {}  # type: Dict[Tuple[str, int], FetchState]
+
     # noinspection PyUnresolvedReferences
     def propagate(self, request: Request, clientName):
         """
@@ -110,7 +143,10 @@ class Propagator:
             logger.trace("{} already propagated {}".format(self, request))
         else:
             self.requests.addPropagate(request, self.name)
-            propagate = self.createPropagate(request, clientName)
+            if self.propagateByDigest:
+                propagate = self.createPropagateDigest(request, clientName)
+            else:
+                propagate = self.createPropagate(request, clientName)
             logger.debug("{} propagating {} request {} from client {}".
                          format(self, request.identifier, request.reqId, clientName),
                          extra={"cli": True})
@@ -127,6 +163,129 @@ class Propagator:
         logging.debug("Creating PROPAGATE for REQUEST {}".format(request))
         return Propagate(request.__getstate__(), clientName)
 
+    @staticmethod
+    def createPropagateDigest(request: Request, clientName) -> PropagateDigest:
+        """
+        Create a new PROPAGATE for the given REQUEST that carries its digest
+        instead of its operation.
+
+        :param request: the client REQUEST
+        :return: a new PROPAGATE_DIGEST msg
+        """
+        return PropagateDigest(request.identifier, request.reqId,
+                               request.digest, request.signature, clientName)
+
+    # noinspection PyUnresolvedReferences
+    def processPropagateDigest(self, msg: PropagateDigest, sender: str) -> None:
+        """
+        Count a PROPAGATE by digest. If this node has the request and its
+        digest matches, the vote counts as a PROPAGATE would. Otherwise it is
+        kept until the request arrives, and the request is fetched from the
+        sender.
+
+        :param msg: the PROPAGATE_DIGEST
+        :param sender: the name of the node that sent it
+        """
+        key = (msg.identifier, msg.reqId)
+        if key in self.requests:
+            request = self.requests[key].request
+            if request.digest != msg.digest:
+                self.discard(msg, "its digest does not match that of request "
+                                  "{}".format(request), logger.warning)
+                return
+            self.requests.addPropagate(request, sender)
+            self.propagate(request, msg.senderClient)
+            self.tryForwarding(request)
+        else:
+            self.digestPropagates.setdefault(key, {}). \
+                setdefault(msg.digest, set()).add(sender)
+            if key not in self.requestFetches:
+                self.requestFetches[key] = FetchState()
+                while len(self.requestFetches) > \
+                        self.maxPendingRequestFetches:
+                    self.dropRequestFetch(next(iter(self.requestFetches)))
+                self.fetchRequest(key)
+
+    # noinspection PyUnresolvedReferences
+    def fetchRequest(self, key: Tuple[str, int]) -> None:
+        """
+        Ask a node that propagated a request by digest for the request, and
+        ask the next one if it has not arrived `requestFetchTimeout` seconds
+        later. Nodes that sent the digest most nodes sent are asked, each once
+        until all of them have been; after `requestFetchAttempts` the request
+        is given up on. A node that is no longer a remote counts as asked.
+        """
+        state = self.requestFetches.get(key)
+        pending = self.digestPropagates.get(key)
+        if state is None or not pending:
+            return
+        if state.attempts >= self.requestFetchAttempts:
+            logger.info("{} could not fetch request {} from {}".
+                        format(self, key, ", ".join(sorted(state.asked))))
+            self.dropRequestFetch(key)
+            return
+        digest, senders = max(pending.items(), key=lambda p: len(p[1]))
+        if senders <= state.asked:
+            state.asked.clear()
+        frm = min(senders - state.asked)
+        state.asked.add(frm)
+        state.attempts += 1
+        try:
+            uid = self.nodestack.getRemote(frm).uid
+        except RemoteNotFound:
+            logger.debug("{} cannot fetch request {} from {} as it is not a "
+                         "remote".format(self, key, frm))
+            self.fetchRequest(key)
+            return
+        logger.debug("{} fetching request {} from {}".format(self, key, frm))
+        self.send(RequestFetch(key[0], key[1], digest), uid)
+        state.aid = self._schedule(partial(self.fetchRequest, key),
+                                   self.requestFetchTimeout)
+
+    # noinspection PyUnresolvedReferences
+    def dropRequestFetch(self, key: Tuple[str, int]) -> None:
+        """
+        Stop fetching a request, and forget the PROPAGATEs by digest for it.
+        """
+        state = self.requestFetches.pop(key, None)
+        if state and state.aid is not None:
+            self._cancel(state.aid)
+        self.digestPropagates.pop(key, None)
+
+    # noinspection PyUnresolvedReferences
+    def processRequestFetch(self, msg: RequestFetch, frm: str) -> None:
+        """
+        Send the node `frm` the request it fetched, as a PROPAGATE with the
+        whole request.
+        """
+        key = (msg.identifier, msg.reqId)
+        state = self.requests.get(key)
+        if not state or state.request.digest != msg.digest:
+            self.discard(msg, "request {} with that digest is not here".
+                         format(key), logger.debug)
+            return
+        try:
+            uid = self.nodestack.getRemote(frm).uid
+        except RemoteNotFound:
+            self.discard(msg, "{} is not a remote".format(frm), logger.debug)
+            return
+        propagate = self.createPropagate(
+            state.request, self.clientIdentifiers.get(msg.identifier))
+        self.send(propagate, uid)
+
+    def applyDigestPropagates(self, request: Request) -> None:
+        """
+        Count the PROPAGATEs by digest that arrived for `request` before the
+        request did, if their digest matches.
+        """
+        pending = self.digestPropagates.get(request.key)
+        self.dropRequestFetch(request.key)
+        if not pending:
+            return
+        for sender in pending.get(request.digest, ()):
+            self.requests.addPropagate(request, sender)
+            self.tryForwarding(request)
+
     # noinspection PyUnresolvedReferences
     def canForward(self, request: Request) -> bool:
         """
@@ -169,6 +328,7 @@ class Propagator:
         """
         self.requests.add(request)
         self.propagate(request, clientName)
+        self.applyDigestPropagates(request)
         self.tryForwarding(request)
 
     def tryForwarding(self, request: Request):
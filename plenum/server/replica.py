@@ -1,5 +1,4 @@
 import logging
-import time
 from collections import deque, OrderedDict
 from enum import IntEnum
 from enum import unique
@@ -75,6 +74,8 @@ class Replica(MessageProcessor):
 
         self.node = node
         self.instId = instId
+        # time stamps of PRE-PREPAREs are taken from the node's clock
+        self.clock = node.clock
 
         self.name = self.generateName(node.name, self.instId)
 
@@ -412,9 +413,29 @@ class Replica(MessageProcessor):
             logger.debug("Non primary replica {} pended request for Pre "
                          "Prepare {}".format(self, (rd.identifier, rd.reqId)))
             self.reqsPendingPrePrepare[(rd.identifier, rd.reqId)] = rd.digest
+            self.tryPrepareReceived(rd)
         else:
             self.doPrePrepare(rd)
 
+    def tryPrepareReceived(self, rd: ReqDigest):
+        """
+        Try to send the PREPARE for a PRE-PREPARE of the request that was
+        received before the node had the request, as when the node had to
+        fetch a request propagated by digest.
+
+        :param rd: the digest of the request the node now has
+        """
+        for (viewNo, ppSeqNo), (reqDigest, ppTime) in \
+                list(self.prePrepares.items()):
+            if reqDigest == (rd.identifier, rd.reqId, rd.digest):
+                self.tryPrepare(PrePrepare(self.instId,
+                                           viewNo,
+                                           ppSeqNo,
+                                           rd.identifier,
+                                           rd.reqId,
+                                           rd.digest,
+                                           ppTime))
+
     def processThreePhaseMsg(self, msg: ThreePhaseMsg, sender: str):
         """
         Process a 3-phase (pre-prepare, prepare and commit) request.
@@ -447,7 +468,7 @@ class Replica(MessageProcessor):
         :param sender: name of the node that sent this message
         """
         logger.debug("{} Receiving PRE-PREPARE at {}".
-                     format(self, time.perf_counter()))
+                     format(self, self.clock.now()))
         if self.canProcessPrePrepare(pp, sender):
             self.addToPrePrepares(pp)
 
@@ -521,9 +542,9 @@ class Replica(MessageProcessor):
         :param reqDigest: a tuple with elements identifier, reqId, and digest
         """
         logger.debug("{} Sending PRE-PREPARE at {}".
-                     format(self, time.perf_counter()))
+                     format(self, self.clock.now()))
         self.prePrepareSeqNo += 1
-        tm = time.time()*1000
+        tm = self.clock.time()*1000
         prePrepareReq = PrePrepare(self.instId,
                                    self.viewNo,
                                    self.prePrepareSeqNo,
@@ -534,7 +555,7 @@ class Replica(MessageProcessor):
 
     def doPrepare(self, pp: PrePrepare):
         logger.debug("{} Sending PREPARE at {}".
-                     format(self, time.perf_counter()))
+                     format(self, self.clock.now()))
         prepare = Prepare(self.instId,
                           pp.viewNo,
                           pp.ppSeqNo,
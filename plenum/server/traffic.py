@@ -0,0 +1,165 @@
+"""
+Recordings of the messages a node receives from other nodes and from
+clients, for replaying them offline (see `plenum.bench.replay`).
+
+A recording is a file of JSON lines, appended to as messages arrive. The
+first line is a header naming the node and the nodes of its pool; every
+other line is a list of the wall clock time, the kind of record, and its
+fields:
+
+    [time, "n", sender, message]    a message from a node
+    [time, "c", sender, message]    a message from a client
+    [time, "k", identifier, verkey] the key the node verified a client by
+
+Messages are recorded as the stack decoded them, before they are validated
+and unpacked, so a batch is one record.
+"""
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Sequence, Tuple
+
+from plenum.common.clock import Clock, systemClock
+from plenum.common.util import getlogger
+
+logger = getlogger()
+
+NODE_MSG = "n"
+CLIENT_MSG = "c"
+VERKEY = "k"
+
+RECORDING_VERSION = 1
+
+
+class TrafficRecorder:
+    """
+    Appends the messages a node receives to a recording.
+
+    :param path: the file to append to
+    :param name: name of the node
+    :param nodeNames: names of the nodes in the node's pool
+    :param clock: the clock the records are timed by
+    :param flushInterval: seconds after which records are flushed to the
+        file; 0 to flush every record
+    """
+
+    def __init__(self, path: str, name: str, nodeNames: Sequence[str],
+                 clock: Clock=None, flushInterval: float=1):
+        self.path = path
+        self.clock = clock or systemClock
+        self.flushInterval = flushInterval
+        self.file = open(path, "a")
+        self.flushedAt = self.clock.now()
+        self.verkeys = {}  # type: Dict[str, str]
+        self.records = 0
+        self.bytes = 0
+        self._write(OrderedDict([("version", RECORDING_VERSION),
+                                 ("node", name),
+                                 ("nodes", list(nodeNames)),
+                                 ("started", self.clock.time())]))
+        logger.info("{} recording received messages to {}".
+                    format(name, path), extra={"cli": False})
+
+    def _write(self, record: Any) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        self.file.write(line)
+        self.bytes += len(line)
+        now = self.clock.now()
+        if now - self.flushedAt >= self.flushInterval:
+            self.file.flush()
+            self.flushedAt = now
+
+    def record(self, kind: str, wrappedMsg: Tuple[Any, str]) -> None:
+        """
+        Append a received message.
+
+        :param kind: `NODE_MSG` or `CLIENT_MSG`
+        :param wrappedMsg: the message and the name of its sender
+        """
+        msg, frm = wrappedMsg
+        try:
+            self._write([round(self.clock.time(), 6), kind, frm, msg])
+        except (TypeError, ValueError) as ex:
+            logger.warning("could not record message {} from {}: {}".
+                           format(msg, frm, ex))
+            return
+        self.records += 1
+
+    def addVerkey(self, identifier: str, verkey: str) -> None:
+        """
+        Append the verification key of a client, unless it was already
+        recorded. A key in bytes is recorded as text, as hex keys are.
+        """
+        if isinstance(verkey, bytes):
+            verkey = verkey.decode()
+        if self.verkeys.get(identifier) != verkey:
+            self.verkeys[identifier] = verkey
+            self._write([round(self.clock.time(), 6), VERKEY, identifier,
+                         verkey])
+
+    def wrap(self, kind: str, handler: Callable) -> Callable:
+        """
+        Return a message handler for a stack that records each message
+        before handing it to `handler`.
+        """
+        def recordAndHandle(wrappedMsg):
+            self.record(kind, wrappedMsg)
+            handler(wrappedMsg)
+        return recordAndHandle
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.file.close()
+
+
+def readTraffic(path: str) -> Iterator[Any]:
+    """
+    The records of a recording in order: headers as dictionaries, and
+    everything else as (time, kind, field, field) tuples.
+    """
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # the last line of a recording still being written
+                logger.warning("skipping a malformed record in {}".
+                               format(path))
+                continue
+            yield record if isinstance(record, dict) else tuple(record)
+
+
+def recordingSummary(path: str) -> Dict[str, Any]:
+    """
+    The header of a recording, with the verification keys, the clients and
+    the counts of messages in it.
+    """
+    header = None
+    verkeys = OrderedDict()  # type: Dict[str, str]
+    clients = OrderedDict()  # type: Dict[str, None]
+    counts = {NODE_MSG: 0, CLIENT_MSG: 0}
+    first = last = None
+    for record in readTraffic(path):
+        if isinstance(record, dict):
+            header = header or record
+            continue
+        t, kind, a, b = record
+        if kind == VERKEY:
+            verkeys[a] = b
+            continue
+        if kind == CLIENT_MSG:
+            clients[a] = None
+        counts[kind] = counts.get(kind, 0) + 1
+        first = t if first is None else first
+        last = t
+    if header is None:
+        raise ValueError("{} is not a recording".format(path))
+    return OrderedDict([("node", header["node"]),
+                        ("nodes", header["nodes"]),
+                        ("verkeys", verkeys),
+                        ("clients", list(clients)),
+                        ("nodeMsgs", counts[NODE_MSG]),
+                        ("clientMsgs", counts[CLIENT_MSG]),
+                        ("seconds", last - first if first is not None
+                         else 0.0)])
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from plenum.common.exceptions import EmptySignature
 from plenum.common.txn import REPLY, REQACK, TXN_ID
@@ -107,7 +109,7 @@ def testSendRequestWithoutSignatureFails(pool):
             params = n.spylog.getLastParams(Node.discard)
             reason = params["reason"]
             (msg, frm) = params["msg"]
-            assert msg == request.__dict__
+            assert msg == request.__getstate__()
             assert frm == client1.name
             assert isinstance(reason, EmptySignature)
 
@@ -214,3 +216,31 @@ def testReplyWhenRequestAlreadyExecuted(looper, nodeSet, client1, sent1):
             chk,
             retryWait=.25,
             timeout=20))
+
+
+def testReplyFutureResolvesOnConsensus(looper, nodeSet, client1, sent1):
+    """
+    The future for a request resolves to its result once f+1 nodes have
+    replied with matching results.
+    """
+    result = looper.run(asyncio.wait_for(client1.replyFuture(sent1.reqId),
+                                         timeout=5 * nodeCount))
+    assert result[f.REQ_ID.nm] == sent1.reqId
+    assert client1.hasConsensus(sent1.reqId) == result
+    assert len(client1.getRepliesFromAllNodes(sent1.reqId)) >= F + 1
+
+
+def testUnconfirmedRepliesArePruned(looper, client1):
+    """
+    The tallies of requests that do not reach consensus are dropped, and
+    their futures cancelled, once too many are kept or they are too old.
+    """
+    client1.retainedReplies = 3
+    futures = [client1.replyFuture(reqId) for reqId in range(1000, 1005)]
+    assert list(client1.unconfirmedReqIds) == [1002, 1003, 1004]
+    assert all(fut.cancelled() for fut in futures[:2])
+    client1.unconfirmedReqIds[1002] -= client1.unconfirmedReplyTimeout + 1
+    client1.pruneUnconfirmed()
+    assert 1002 not in client1.replyTallies
+    assert futures[2].cancelled()
+    assert not futures[3].done()
@@ -0,0 +1,119 @@
+import time
+
+from plenum.bench.sim import seedFor
+from plenum.client.signer import SimpleSigner
+from plenum.common.txn import BATCH
+from plenum.common.types import OP_FIELD_NAME, Request, f
+from plenum.server.client_authn import SimpleAuthNr
+from plenum.server.client_intake import Accepted, ClientIntake, \
+    IntakeValidator, Rejected
+
+
+class RejectSells:
+    def verify(self, operation):
+        if operation["type"] == "sell":
+            raise ValueError("no selling")
+
+
+def signed(signer, reqId, operation):
+    req = Request(signer.identifier, reqId, operation)
+    req.signature = signer.sign(req)
+    return req.__getstate__()
+
+
+def testValidatorAcceptsAndRejects():
+    signer = SimpleSigner("client1", seedFor("client1", "sig"))
+    other = SimpleSigner("client2", seedFor("client2", "sig"))
+    verkeys = {signer.identifier: signer.verkey}
+    validator = IntakeValidator([RejectSells()])
+
+    good = signed(signer, 1, {"type": "buy", "amount": 1})
+    accepted, = validator.validate(good, "client1", verkeys)
+    assert isinstance(accepted, Accepted)
+    req = Request.fromState(accepted.state, accepted.signingBytes)
+    assert req == Request.fromState(good)
+    assert req.digest == Request.fromState(good).digest
+
+    forged = dict(good, operation={"type": "buy", "amount": 1000})
+    rejected, = validator.validate(forged, "client1", verkeys)
+    assert isinstance(rejected, Rejected)
+    assert rejected.suspicious
+    assert rejected.reqId == 1
+
+    # a request of an identifier the node does not know
+    unknown, = validator.validate(signed(other, 2, {"type": "buy"}),
+                                  "client2", {})
+    assert unknown.suspicious
+
+    sell, = validator.validate(signed(signer, 3, {"type": "sell"}),
+                               "client1", verkeys)
+    assert not sell.suspicious
+    assert sell.reason == "ValueError no selling"
+
+    batch = {OP_FIELD_NAME: BATCH,
+             f.MSGS.nm: [signed(signer, 4, {"type": "buy"}), forged],
+             f.SIG.nm: None}
+    results = validator.validate(batch, "client1", verkeys)
+    assert [type(r) for r in results] == [Accepted, Rejected]
+
+    # the keys of earlier batches are not kept
+    assert validator.authNr.verkeys == verkeys
+    again, = validator.validate(good, "client1", {})
+    assert again.suspicious
+    assert not validator.authNr.verkeys
+
+
+def testWorkersCheckRequests():
+    signer = SimpleSigner("client1", seedFor("client1", "sig"))
+    verkeys = {signer.identifier: signer.verkey}
+    intake = ClientIntake([RejectSells()], workers=2)
+    intake.start()
+    try:
+        for i in range(20):
+            op = {"type": "sell" if i % 5 == 0 else "buy", "amount": i}
+            intake.add(signed(signer, i, op), "client1", verkeys)
+            if i % 4 == 3:
+                intake.flush()
+        intake.flush()
+        results = []
+        deadline = time.perf_counter() + 10
+        while intake.inFlight and time.perf_counter() < deadline:
+            results.extend(intake.results())
+            time.sleep(0.01)
+        assert sorted(r.state["reqId"] for r in results
+                      if isinstance(r, Accepted)) == \
+            [i for i in range(20) if i % 5]
+        assert intake.summary()["rejected"] == 4
+    finally:
+        intake.stop()
+    assert not any(w.is_alive() for w in intake.workers)
+
+
+def testPoolOrdersRequestsCheckedByWorkers(simPool, simClient):
+    for node in simPool.nodes.values():
+        node.clientIntake = ClientIntake(node.opVerifiers, 1, node.name)
+        node.clientIntake.start()
+    reqIds = [simClient.submitTimed({"type": "buy", "amount": i})
+              for i in range(5)]
+    # the workers take real time while the pool runs on virtual time
+    simPool.runUntil(lambda: all(r in simClient.confirmedAt for r in reqIds),
+                     timeout=3600)
+    assert all(n.clientIntake.accepted == 5 for n in simPool.nodes.values())
+
+
+class RoleCheckingAuthNr(SimpleAuthNr):
+    def authenticate(self, req_data, identifier=None, signature=None):
+        raise RuntimeError("checks more than signatures")
+
+
+def testNodesWithCustomAuthenticatorsCheckRequestsThemselves(simPool):
+    plain, custom = list(simPool.nodes.values())[:2]
+    custom.clientAuthNr = RoleCheckingAuthNr()
+    for node in (plain, custom):
+        node.clientIntake = ClientIntake(node.opVerifiers, 1, node.name)
+        node.startClientIntake()
+    try:
+        assert plain.clientIntake.isRunning
+        assert custom.clientIntake is None
+    finally:
+        plain.clientIntake.stop()
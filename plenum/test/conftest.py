@@ -10,6 +10,7 @@ import pytest
 from ledger.compact_merkle_tree import CompactMerkleTree
 from ledger.ledger import Ledger
 
+from plenum.bench.sim import SimPool
 from plenum.common.looper import Looper
 from plenum.common.raet import initLocalKeep
 from plenum.common.txn import TXN_TYPE, DATA, NEW_NODE, ALIAS, CLIENT_PORT, \
@@ -141,6 +142,28 @@ def pool(tmpdir_factory, counter):
     return Pool(tmpdir_factory, counter)
 
 
+@pytest.yield_fixture(scope="function")
+def simPool(tdir_for_func):
+    """
+    A pool of four nodes on a simulated network, on virtual time. A module
+    that needs the nodes changed before they connect can override this
+    fixture.
+    """
+    with SimPool(4, os.path.join(tdir_for_func, "pool")) as p:
+        yield p
+
+
+@pytest.fixture(scope="function")
+def simClient(simPool):
+    """
+    A client connected to every node of `simPool`, once the pool is ready.
+    """
+    simPool.runUntil(simPool.isReady, timeout=120)
+    client = simPool.newClient()
+    simPool.runUntil(lambda: len(client.conns) == len(simPool.nodes))
+    return client
+
+
 @pytest.fixture(scope="module")
 def ready(looper, keySharedNodes):
     looper.run(checkNodesConnected(keySharedNodes))
@@ -243,7 +243,8 @@ class TestNodeCore(StackedTester):
         # Reinitialize the monitor
         d, l, o = self.monitor.Delta, self.monitor.Lambda, self.monitor.Omega
         self.instances = Instances()
-        self.monitor = TestMonitor(self.name, d, l, o, self.instances)
+        self.monitor = TestMonitor(self.name, d, l, o, self.instances,
+                                   clock=self.clock)
         for i in range(len(self.replicas)):
             self.monitor.addInstance()
 
@@ -616,7 +617,7 @@ def getRepliesFromClientInbox(inbox, reqId) -> list:
 def checkLastClientReqForNode(node: TestNode, expectedRequest: Request):
     recvRequest = getLastClientReqReceivedForNode(node)
     assert recvRequest
-    assert expectedRequest.__dict__ == recvRequest.__dict__
+    assert expectedRequest.__getstate__() == recvRequest.__getstate__()
 
 
 # noinspection PyIncorrectDocstring
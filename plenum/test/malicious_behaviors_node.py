@@ -26,7 +26,10 @@ def changesRequest(node):
                             request: Request, clientName: str) -> Propagate:
         logger.debug("EVIL: Creating propagate request for client request {}".
                      format(request))
-        request.operation["amount"] += random.random()
+        # a new operation, so the request's digest covers the change
+        request.operation = dict(
+            request.operation,
+            amount=request.operation["amount"] + random.random())
         return Propagate(request.__getstate__(), clientName)
 
     evilMethod = types.MethodType(evilCreatePropagate, node)
@@ -0,0 +1,49 @@
+import os
+import sys
+import tracemalloc
+
+from plenum.common.memory_usage import approxSize, deepSize
+from plenum.common.types import Request
+
+
+def testDeepSizeCountsSharedObjectsOnce():
+    s = "x" * 1000
+    assert deepSize([s, s]) == sys.getsizeof([s, s]) + sys.getsizeof(s)
+    req = Request("client1", 1, {"data": s})
+    assert deepSize(req) > sys.getsizeof(s) + sys.getsizeof(req)
+    # excluded objects are neither counted nor followed
+    assert deepSize(req, exclude=[req.operation]) < sys.getsizeof(s)
+
+
+def testApproxSizeExtrapolatesFromASample():
+    d = {i: "{:0100d}".format(i) for i in range(10000)}
+    count, size = approxSize(d, sample=100)
+    assert count == 10000
+    exact = deepSize(d)
+    assert abs(size - exact) / exact < 0.1
+
+
+def testNodeReportsMemoryUsage(simPool, simClient):
+    reqIds = [simClient.submitTimed({"type": "buy", "amount": i})
+              for i in range(5)]
+    simPool.runUntil(lambda: all(r in simClient.confirmedAt for r in reqIds))
+    node = simPool.nodes["Node1"]
+    usage = node.memoryUsage()
+    assert usage["requests"]["count"] == len(node.requests)
+    assert usage["Node1:0 ordered"]["count"] == 5
+    assert usage["Node1:0 prePrepares"]["bytes"] > 0
+    assert usage["elector nominations"]["count"] is not None
+    assert "Node1 remotes" in usage
+
+    wasTracing = tracemalloc.is_tracing()
+    try:
+        if not wasTracing:
+            assert node.dumpHeapSnapshot() is None
+        path, stats = node.dumpHeapSnapshot()
+        assert os.path.isfile(path)
+        assert stats
+        second, _ = node.dumpHeapSnapshot()
+        assert second != path
+    finally:
+        if not wasTracing:
+            tracemalloc.stop()
@@ -0,0 +1,28 @@
+from plenum.cli.perf_view import perfLines, perfRates
+
+
+def testNodeReportsLivePerformance(simPool, simClient):
+    node = simPool.nodes["Node1"]
+    before = node.perfSnapshot()
+    reqIds = [simClient.submitTimed({"type": "buy", "amount": i})
+              for i in range(5)]
+    simPool.runUntil(lambda: all(r in simClient.confirmedAt for r in reqIds))
+    after = node.perfSnapshot()
+
+    master = after["master"]
+    assert after["ordered"][master] - before["ordered"][master] == 5
+    assert after["latency"][master][99] > 0
+    assert after["signatures verified"] >= 5
+    assert after["ledger appends"]["count"] == 5
+    assert after["queues"]["nodeInBox"] == 0
+
+    rates = perfRates(before, after)
+    assert rates["ordered"][master] > 0
+    assert rates["signatures verified"] > 0
+
+    lines = perfLines("Node1", before, after)
+    assert lines[0].strip().startswith("Performance of Node1")
+    assert len(lines) == 2 + len(after["ordered"]) + 4
+    # the first refresh has no rates yet
+    assert perfRates(None, after)["signatures verified"] is None
+    assert perfLines("Node1", None, after)
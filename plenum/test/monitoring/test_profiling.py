@@ -0,0 +1,46 @@
+import os
+import pstats
+import time
+
+from plenum.common.profiling import StackSampler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+def testSamplerCollapsesStacks(tdir_for_func):
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    busy(0.2)
+    sampler.stop()
+    assert not sampler.isRunning
+    stacks = sampler.collapsed()
+    assert any(s.endswith("test_profiling.py:busy") for s in stacks)
+    path = os.path.join(tdir_for_func, "profile.collapsed")
+    sampler.write(path)
+    with open(path) as f:
+        stack, count = f.readline().rsplit(" ", 1)
+    assert int(count) == max(stacks.values())
+
+
+def testNodeProfilesOnDemand(simPool, simClient):
+    node = simPool.nodes["Node1"]
+
+    node.startProfiling("cprofile", duration=0)
+    reqId = simClient.submitTimed({"type": "buy", "amount": 1})
+    simPool.runUntil(lambda: reqId in simClient.confirmedAt)
+    path = node.toggleProfiling()
+    assert path.endswith(".pstats") and node.profiler is None
+    stats = pstats.Stats(path)
+    assert any(func[2] == "prod" for func in stats.stats)
+
+    # a profile stops itself after its duration
+    node.startProfiling("sample", duration=5)
+    assert node.profiler
+    simPool.runUntil(lambda: node.profiler is None, timeout=10)
+    profiles = os.listdir(os.path.join(node.getDataLocation(),
+                                       "profiles"))
+    assert any(p.endswith(".collapsed") for p in profiles)
@@ -0,0 +1,231 @@
+import asyncio
+import time
+
+import pytest
+
+from plenum.common.types import Request
+from plenum.server.execution import ExecutionEngine, ParallelExecuter, \
+    newWorkerPool
+
+
+class Transfer(ParallelExecuter):
+    """
+    Moves an amount between accounts, after a computation that takes time.
+    """
+
+    def __init__(self, balances, applied, delay=0.05):
+        self.balances = balances
+        self.applied = applied
+        self.delay = delay
+
+    def keys(self, req):
+        accounts = frozenset((req.operation["from"], req.operation["to"]))
+        return accounts, accounts
+
+    def compute(self, ppTime, req):
+        time.sleep(self.delay)
+        op = req.operation
+        return {op["from"]: self.balances[op["from"]] - op["amount"],
+                op["to"]: self.balances[op["to"]] + op["amount"]}
+
+    async def apply(self, ppTime, req, result):
+        self.balances.update(result)
+        self.applied.append(req.reqId)
+
+
+def transfer(reqId, frm, to, amount=1):
+    return 0, Request("client1", reqId,
+                      {"type": "transfer", "from": frm, "to": to,
+                       "amount": amount})
+
+
+def run(engine, batch, executerFor):
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(engine.run(batch, executerFor))
+    finally:
+        loop.close()
+
+
+def testNonConflictingRequestsComputeTogether():
+    balances = {a: 10 for a in "abcdefgh"}
+    applied = []
+    executer = Transfer(balances, applied)
+    engine = ExecutionEngine(4)
+    try:
+        batch = [transfer(i, a, b) for i, (a, b)
+                 in enumerate(["ab", "cd", "ef", "gh"])]
+        started = time.perf_counter()
+        run(engine, batch, lambda req: executer)
+        assert time.perf_counter() - started < 4 * executer.delay
+    finally:
+        engine.stop()
+    assert applied == [0, 1, 2, 3]
+    assert all(balances[a] == 9 for a in "aceg")
+    assert all(balances[a] == 11 for a in "bdfh")
+    summary = engine.summary()
+    assert summary["parallel"] == 4
+    assert summary["conflicts"] == 0
+    assert summary["maxInFlight"] == 4
+
+
+def testConflictingRequestsSeeEarlierResults():
+    balances = {"a": 10, "b": 10, "c": 10}
+    applied = []
+    executer = Transfer(balances, applied, delay=0.01)
+    engine = ExecutionEngine(4)
+    try:
+        batch = [transfer(i, "a", "b") for i in range(5)] + \
+                [transfer(5, "b", "c", 15)]
+        run(engine, batch, lambda req: executer)
+    finally:
+        engine.stop()
+    # without waiting for the earlier transfers, the computations would
+    # all start from the same balances
+    assert balances == {"a": 5, "b": 0, "c": 25}
+    assert applied == list(range(6))
+    assert engine.summary()["conflicts"] == 5
+
+
+def testInlineExecuterIsABarrier():
+    balances = {a: 10 for a in "abcd"}
+    applied = []
+    executer = Transfer(balances, applied, delay=0.01)
+
+    async def audit(ppTime, req):
+        applied.append(("audit", sum(balances.values())))
+
+    batch = [transfer(0, "a", "b"), (0, Request("client1", 1,
+                                                {"type": "audit"})),
+             transfer(2, "c", "d")]
+    engine = ExecutionEngine(2)
+    try:
+        run(engine, batch, lambda req: audit
+            if req.operation["type"] == "audit" else executer)
+    finally:
+        engine.stop()
+    assert applied == [0, ("audit", 40), 2]
+    assert engine.summary()["inline"] == 1
+    assert engine.summary()["parallel"] == 2
+
+
+class FailingTransfer(Transfer):
+    def __init__(self, balances, applied, failOn):
+        super().__init__(balances, applied, delay=0)
+        self.failOn = failOn
+
+    def compute(self, ppTime, req):
+        if req.reqId == self.failOn:
+            raise RuntimeError("cannot transfer")
+        return super().compute(ppTime, req)
+
+
+def testFailedRequestAndLaterOnesAreLeftInBatch():
+    balances = {a: 10 for a in "abcdef"}
+    applied = []
+    executer = FailingTransfer(balances, applied, failOn=1)
+    batch = [transfer(i, a, b) for i, (a, b) in enumerate(["ab", "cd", "ef"])]
+    remaining = batch[1:]
+    engine = ExecutionEngine(2)
+    try:
+        with pytest.raises(RuntimeError):
+            run(engine, batch, lambda req: executer)
+        assert applied == [0]
+        assert batch == remaining
+
+        executer.failOn = None
+        run(engine, batch, lambda req: executer)
+    finally:
+        engine.stop()
+    assert applied == [0, 1, 2]
+    assert batch == []
+    assert set(balances.values()) == {9, 11}
+
+
+def testExecuterRunsInlineWithoutEngine():
+    balances = {"a": 10, "b": 10}
+    applied = []
+    executer = Transfer(balances, applied, delay=0)
+    ppTime, req = transfer(0, "a", "b", 3)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(executer(ppTime, req))
+    finally:
+        loop.close()
+    assert balances == {"a": 7, "b": 13}
+    with pytest.raises(ValueError):
+        newWorkerPool(1, "fibre")
+
+
+class Buy(ParallelExecuter):
+    def __init__(self, node):
+        self.node = node
+        self.order = []
+
+    def keys(self, req):
+        return frozenset(), frozenset([req.identifier])
+
+    def compute(self, ppTime, req):
+        return req.operation["amount"]
+
+    async def apply(self, ppTime, req, result):
+        self.order.append(result)
+        await self.node.doCustomAction(ppTime, req)
+
+
+def testPoolExecutesOrderedRequestsOnWorkers(simPool, simClient):
+    buys = {}
+    for node in simPool.nodes.values():
+        node.executionEngine = ExecutionEngine(2, name=node.name)
+        buys[node.name] = node.requestExecuter["buy"] = Buy(node)
+    reqIds = [simClient.submitTimed({"type": "buy", "amount": i})
+              for i in range(5)]
+    # the workers take real time while the pool runs on virtual time
+    simPool.runUntil(lambda: all(r in simClient.confirmedAt for r in reqIds),
+                     timeout=3600)
+    for node in simPool.nodes.values():
+        assert buys[node.name].order == list(range(5))
+        assert node.executionEngine.summary()["parallel"] == 5
+        assert dict(node.metrics())["execution"]["batches"] >= 1
+
+
+class FailingApply(Transfer):
+    """
+    Fails to execute one request after it has applied its result.
+    """
+
+    def __init__(self, balances, applied, failOn):
+        super().__init__(balances, applied, delay=0)
+        self.failOn = failOn
+
+    async def apply(self, ppTime, req, result):
+        await super().apply(ppTime, req, result)
+        if req.reqId == self.failOn:
+            raise RuntimeError("could not reply")
+
+
+def testNodeDiscardsRequestsItFailedToExecute(simPool):
+    node = simPool.nodes["Node1"]
+    node.executionEngine = ExecutionEngine(2, name=node.name)
+    balances = {a: 10 for a in "abcdefgh"}
+    applied = []
+    node.requestExecuter["transfer"] = FailingTransfer(balances, applied,
+                                                       failOn=1)
+    node.requestExecuter["apply"] = FailingApply(balances, applied,
+                                                 failOn=2)
+    ordered = [transfer(i, a, b) for i, (a, b)
+               in enumerate(["ab", "cd", "ef", "gh"])]
+    ordered[2][1].operation["type"] = "apply"
+    node.orderedToExecute = list(ordered)
+    # a loop of its own, so the looper does not execute them meanwhile
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(node.executeOrdered())
+    finally:
+        loop.close()
+    # a request that failed is not kept to be executed again, as it may have
+    # changed state, and the requests after it are executed still
+    assert node.orderedToExecute == []
+    assert applied == [0, 2, 3]
+    assert balances == {"a": 9, "b": 11, "c": 10, "d": 10,
+                        "e": 9, "f": 11, "g": 9, "h": 11}
@@ -0,0 +1,104 @@
+from plenum.bench.sim import seedFor
+from plenum.client.signer import SimpleSigner
+from plenum.common.txn import BATCH
+from plenum.common.types import OP_FIELD_NAME, Request, f
+from plenum.server.client_intake import Accepted, IntakeValidator, Rejected
+from plenum.server.plugin_loader import verifyOperations
+
+
+class NoSelling:
+    pluginType = 'VERIFICATION'
+
+    def __init__(self):
+        self.calls = []
+
+    def verify_many(self, operations):
+        self.calls.append(len(operations))
+        return [ValueError("no selling") if op["type"] == "sell" else None
+                for op in operations]
+
+
+class SmallAmounts:
+    pluginType = 'VERIFICATION'
+
+    def __init__(self):
+        self.seen = 0
+
+    def verify(self, operation):
+        self.seen += 1
+        if operation.get("amount", 0) >= 100:
+            raise ValueError("amount too large")
+
+
+def testPluginsCheckOperationsInTurn():
+    noSelling, small = NoSelling(), SmallAmounts()
+    ops = [{"type": "buy", "amount": 1}, {"type": "sell", "amount": 1},
+           {"type": "buy", "amount": 500}]
+    errors = verifyOperations([noSelling, small], ops)
+    assert errors[0] is None
+    assert str(errors[1]) == "no selling"
+    assert str(errors[2]) == "amount too large"
+    assert noSelling.calls == [3]
+    # the operation the first plugin rejected is not checked again
+    assert small.seen == 2
+
+    class Reasons:
+        def verify_many(self, operations):
+            return ["bad"] + [None] * (len(operations) - 1)
+
+    class Short:
+        def verify_many(self, operations):
+            return []
+
+    reason, ok = verifyOperations([Reasons()], ops[:2])
+    assert isinstance(reason, ValueError) and str(reason) == "bad"
+    assert ok is None
+    # a plugin that does not answer for each operation rejects them all
+    assert all(isinstance(e, ValueError)
+               for e in verifyOperations([Short()], ops))
+
+
+def signed(signer, reqId, operation):
+    req = Request(signer.identifier, reqId, operation)
+    req.signature = signer.sign(req)
+    return req.__getstate__()
+
+
+def testIntakeChecksOperationsOncePerBatch():
+    signer = SimpleSigner("client1", seedFor("client1", "sig"))
+    verkeys = {signer.identifier: signer.verkey}
+    noSelling = NoSelling()
+    validator = IntakeValidator([noSelling])
+    batch = {OP_FIELD_NAME: BATCH,
+             f.MSGS.nm: [signed(signer, 2, {"type": "sell"}),
+                         signed(signer, 3, {"type": "buy"})],
+             f.SIG.nm: None}
+    results = validator.validateMany([
+        (signed(signer, 1, {"type": "buy"}), "client1", verkeys),
+        (batch, "client1", verkeys),
+        ("not a request", "client1", verkeys)])
+    assert [type(r) for r in results] == [Accepted, Rejected, Accepted,
+                                          Rejected]
+    assert results[1].reqId == 2
+    assert results[1].reason == "ValueError no selling"
+    assert not results[1].suspicious
+    assert noSelling.calls == [3]
+
+
+def testNodeChecksOperationsOfClientsTogether(simPool, simClient):
+    verifiers = {}
+    for node in simPool.nodes.values():
+        verifiers[node.name] = NoSelling()
+        node.opVerifiers = [verifiers[node.name]]
+    ops = [{"type": "sell" if i % 3 == 0 else "buy", "amount": i}
+           for i in range(6)]
+    reqIds = [simClient.submitTimed(op) for op in ops]
+    bought = [r for r, op in zip(reqIds, ops) if op["type"] == "buy"]
+    simPool.runUntil(lambda: all(r in simClient.confirmedAt for r in bought)
+                     and sum(simClient.nacks.values()) ==
+                     2 * len(simPool.nodes))
+    assert not any(r in simClient.confirmedAt for r in reqIds
+                   if r not in bought)
+    for v in verifiers.values():
+        assert sum(v.calls) == len(ops)
+        assert len(v.calls) < len(ops)
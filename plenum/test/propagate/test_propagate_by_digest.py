@@ -0,0 +1,107 @@
+import os
+
+from plenum.bench.sim import SimPool
+from plenum.common.types import PropagateDigest, RequestFetch
+
+
+def orderWithoutClientRequestAt(basedir, byDigest, nodesMissing,
+                                requestSize=10000):
+    """
+    Order a request that some nodes do not get from the client, and return
+    the number of bytes the nodes and client sent for it and the nodes that
+    fetched the request.
+    """
+    with SimPool(4, basedir) as pool:
+        fetched = set()
+        for node in pool.nodes.values():
+            node.propagateByDigest = byDigest
+            node.nodeMsgRouter.routes[RequestFetch] = \
+                lambda msg, frm, node=node: (fetched.add(frm),
+                                             node.processRequestFetch(msg,
+                                                                      frm))
+        pool.runUntil(pool.isReady, timeout=120)
+        client = pool.newClient()
+        pool.runUntil(lambda: len(client.conns) == len(pool.nodes))
+        for name in nodesMissing:
+            pool.network.setLink(client.name, name + "C", both=False, drop=1)
+
+        sentBytes = pool.network.stats["bytes"]
+        reqId = client.submitTimed({"type": "buy", "data": "x" * requestSize})
+        pool.runUntil(lambda: len(client.getRepliesFromAllNodes(reqId)) ==
+                      len(pool.nodes))
+        assert all(not n.digestPropagates and not n.requestFetches
+                   for n in pool.nodes.values())
+        return pool.network.stats["bytes"] - sentBytes, fetched
+
+
+def testNodesFetchRequestsPropagatedByDigest(tdir_for_func):
+    missing = ("Node3", "Node4")
+    full, fetched = orderWithoutClientRequestAt(
+        os.path.join(tdir_for_func, "full"), False, missing)
+    assert not fetched
+    byDigest, fetched = orderWithoutClientRequestAt(
+        os.path.join(tdir_for_func, "digest"), True, missing)
+    assert fetched == set(missing)
+    # each of the two nodes fetched the request once instead of every node
+    # sending it to every other
+    assert byDigest < full / 2
+
+
+def testNodesWithTheRequestCountPropagatesByDigest(tdir_for_func):
+    _, fetched = orderWithoutClientRequestAt(tdir_for_func, True, ())
+    assert not fetched
+
+
+def testNodesAskAnotherNodeWhenAFetchIsNotAnswered(simPool, simClient):
+    asked = []
+    for node in simPool.nodes.values():
+        node.propagateByDigest = True
+        # only Node3 answers fetches
+        node.nodeMsgRouter.routes[RequestFetch] = \
+            lambda msg, frm, node=node: (
+                asked.append(node.name),
+                node.name == "Node3" and node.processRequestFetch(msg, frm))
+    simPool.network.setLink(simClient.name, "Node4C", both=False, drop=1)
+    reqId = simClient.submitTimed({"type": "buy", "amount": 1})
+    node = simPool.nodes["Node4"]
+    simPool.runUntil(lambda: (simClient.defaultIdentifier, reqId) in
+                     node.requests)
+    assert asked[-1] == "Node3"
+    assert len(asked) == len(set(asked)) > 1
+    assert not node.digestPropagates and not node.requestFetches
+
+
+def testNodesGiveUpFetchingRequestsNoNodeHas(simPool):
+    simPool.runUntil(simPool.isReady, timeout=120)
+    node = simPool.nodes["Node1"]
+    node.maxPendingRequestFetches = 5
+    for reqId in range(20):
+        node.processPropagateDigest(
+            PropagateDigest("nobody", reqId, "ab" * 32, None, "nobody"),
+            "Node2")
+    assert len(node.requestFetches) == len(node.digestPropagates) == 5
+    assert sorted(k[1] for k in node.requestFetches) == list(range(15, 20))
+    simPool.runUntil(lambda: not node.requestFetches,
+                     timeout=(node.requestFetchAttempts + 1) *
+                     node.requestFetchTimeout)
+    assert not node.digestPropagates
+
+
+def testNodesDoNotFetchFromOrAnswerNodesThatAreNotRemotes(simPool,
+                                                          simClient):
+    reqId = simClient.submitTimed({"type": "buy", "amount": 1})
+    simPool.runUntil(lambda: reqId in simClient.confirmedAt)
+    node = simPool.nodes["Node1"]
+    request = node.requests[(simClient.defaultIdentifier, reqId)].request
+    sent = []
+    node.send = lambda msg, *rids: sent.append(msg)
+    node.processRequestFetch(
+        RequestFetch(request.identifier, request.reqId, request.digest),
+        "Node9")
+    assert not sent
+
+    node.processPropagateDigest(
+        PropagateDigest("nobody", 1, "ab" * 32, None, "nobody"), "Node9")
+    # every attempt went to the one node that sent the digest
+    assert not sent
+    assert not node.requestFetches and not node.digestPropagates
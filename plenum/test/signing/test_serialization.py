@@ -0,0 +1,120 @@
+import random
+from collections import OrderedDict
+
+import pytest
+
+from plenum.bench.sim import SimClient, seedFor
+from plenum.client.signer import SimpleSigner
+from plenum.common.sim_stack import SimNetwork
+from plenum.common.signing import serializeCanonical, serializeForSig, serlize
+from plenum.common.types import HA, Request
+from plenum.server.client_authn import SimpleAuthNr
+
+
+def randomValue(rnd, depth=0):
+    kinds = ["str", "int", "float", "bool", "none"]
+    if depth < 4:
+        kinds += ["dict", "list"] * 2
+    kind = rnd.choice(kinds)
+    if kind == "str":
+        return rnd.choice(["", "a", "x:y|z,w", "été"])
+    if kind == "int":
+        return rnd.randint(-10 ** 6, 10 ** 6)
+    if kind == "float":
+        return rnd.random() * 1000
+    if kind == "bool":
+        return rnd.random() < 0.5
+    if kind == "none":
+        return None
+    if kind == "list":
+        return [randomValue(rnd, depth + 1) for _ in range(rnd.randint(0, 4))]
+    keys = ["a", "b", "signature", "reqId", "operation", "z"]
+    return {k: randomValue(rnd, depth + 1)
+            for k in rnd.sample(keys, rnd.randint(0, len(keys)))}
+
+
+def testCanonicalSerializationMatchesSerlize():
+    rnd = random.Random(1)
+    for _ in range(2000):
+        value = randomValue(rnd)
+        assert serializeCanonical(value) == serlize(value)
+    msg = OrderedDict([("z", 1), ("signature", "sig"),
+                       ("a", {"signature": "kept", "b": [None, 1.5]})])
+    assert serializeCanonical(msg) == serlize(msg) == \
+        "a:b:,1.5|signature:kept|z:1"
+
+
+def testCanonicalSerializationRejectsWhatSerlizeRejects():
+    for value in ({"a": (1, 2)}, {"a": [b"x"]}, {1, 2}):
+        with pytest.raises(Exception) as canonical:
+            serializeCanonical(value)
+        with pytest.raises(Exception) as recursive:
+            serlize(value)
+        assert str(canonical.value) == str(recursive.value)
+
+
+def testRequestKeepsItsSigningBytes():
+    signer = SimpleSigner("client1", b"1" * 32)
+    req = Request(signer.identifier, 1, {"type": "buy", "amount": [1, 2]})
+    state = req.__getstate__()
+    assert req.signingBytes is req.signingBytes
+    assert req.signingBytes == serializeForSig(state)
+
+    req.signature = signer.sign(req)
+    assert req.signature == signer.sign(state)
+    # the signature is not part of what is signed
+    assert req.signingBytes == serializeForSig(req.__getstate__())
+
+    # the state is a copy, so the wire form can change without changing
+    # the request
+    state["reqId"] = 2
+    assert req.reqId == 1
+
+    authNr = SimpleAuthNr()
+    authNr.addClient(signer.identifier, signer.verkey)
+    assert authNr.authenticate(req) == signer.identifier
+    assert authNr.authenticate(req.__getstate__()) == signer.identifier
+    assert Request.fromState(req.__getstate__()) == req
+
+
+def testRequestDigestIsComputedOnceOverItsContent():
+    req = Request("client1", 1, {"type": "buy", "amount": 1})
+    digest = req.digest
+    assert digest is req.digest
+    assert req.reqDigest == ("client1", 1, digest)
+
+    # the signature is not part of the digest, the operation is
+    signed = Request("client1", 1, {"type": "buy", "amount": 1}, "sig")
+    assert signed.digest == digest
+    changed = Request("client1", 1, {"type": "buy", "amount": 2})
+    assert changed.digest != digest
+    assert Request.fromState(changed.__getstate__()).digest == changed.digest
+
+    # setting what the digest covers computes it again
+    signingBytes = changed.signingBytes
+    changed.signature = "sig"
+    assert changed.signingBytes is signingBytes
+    changed.operation = dict(changed.operation, amount=1)
+    assert changed.digest == digest
+    changed.reqId = 2
+    assert changed.digest != digest
+    assert changed.digest == Request("client1", 2,
+                                     {"type": "buy", "amount": 1}).digest
+
+    assert not hasattr(req, "__dict__")
+
+
+def testClientSignsTheSerializationOfRequests(tdir_for_func):
+    signer = SimpleSigner("client1", seedFor("client1", "sig"))
+    client = SimClient("client1",
+                       nodeReg=OrderedDict([("Node1", HA("sim", 3))]),
+                       ha=HA("sim", 100000), signer=signer,
+                       basedirpath=tdir_for_func, network=SimNetwork())
+    req = client.createRequest({"type": "buy", "amount": 1})
+    msg = client.prepForSending(req, signer)
+    # the request kept the serialization that was signed
+    assert req._signingBytes == serializeForSig(msg)
+    assert req.signature == msg["signature"]
+    authNr = SimpleAuthNr()
+    authNr.addClient(signer.identifier, signer.verkey)
+    assert authNr.authenticate(msg) == signer.identifier
@@ -0,0 +1,181 @@
+import json
+import time
+import zlib
+from base64 import b64encode
+from collections import namedtuple
+
+import pytest
+
+from plenum.common.exceptions import InvalidNodeMsg
+from plenum.common.stacked import Batched
+from plenum.common.types import Batch, CompressedBatch, TaggedTupleBase
+
+FakeRemote = namedtuple("FakeRemote", ["name"])
+
+
+class FakeStack:
+    def __init__(self):
+        self.remotes = {1: FakeRemote("beta")}
+        self.sent = []
+
+    def transmit(self, msg, rid):
+        self.sent.append((msg, rid))
+
+
+class Sender(Batched):
+    def __init__(self):
+        super().__init__()
+        self.nodestack = FakeStack()
+
+    def prepForSending(self, msg, signer=None):
+        return dict(msg._asdict()) if isinstance(msg, TaggedTupleBase) \
+            else msg
+
+
+def msgCounts(sent):
+    return [len(m["messages"]) if "messages" in m else 1 for m, _ in sent]
+
+
+def testBatchesAreSplitAtMessageLimit():
+    s = Sender()
+    s.maxBatchMessages = 4
+    s.maxBatchSize = None
+    s.batchFlushDelay = 0
+    for i in range(10):
+        s.send({"i": i}, 1)
+    s.flushOutBoxes()
+    assert msgCounts(s.nodestack.sent) == [4, 4, 2]
+    assert s.batchSizes.count == 3
+
+
+def testBatchesAreSplitAtSizeLimit():
+    s = Sender()
+    s.maxBatchMessages = None
+    s.maxBatchSize = 3 * Batched.msgSize({"i": 0})
+    s.batchFlushDelay = 0
+    for i in range(7):
+        s.send({"i": i}, 1)
+    s.flushOutBoxes()
+    assert msgCounts(s.nodestack.sent) == [3, 3, 1]
+    assert s.nodestack.sent[-1][0] == {"i": 6}
+
+
+def testFlushDelayHoldsMessagesOnlyUnderLoad():
+    s = Sender()
+    s.maxBatchMessages = 100
+    s.maxBatchSize = None
+    s.batchFlushDelay = .1
+    # the remote has been idle, so the message goes out right away
+    s.send({"i": 0}, 1)
+    s.flushOutBoxes()
+    assert len(s.nodestack.sent) == 1
+    # the remote was just sent to, so messages wait to fill a batch
+    s.send({"i": 1}, 1)
+    s.send({"i": 2}, 1)
+    s.flushOutBoxes()
+    assert len(s.nodestack.sent) == 1
+    assert s.nextFlush() > time.perf_counter()
+    time.sleep(.1)
+    assert s.nextFlush() == 0
+    s.flushOutBoxes()
+    assert msgCounts(s.nodestack.sent) == [1, 2]
+    # messages held back go out when forced, as when the node stops
+    s.send({"i": 3}, 1)
+    s.flushOutBoxes()
+    assert len(s.nodestack.sent) == 2
+    s.flushOutBoxes(force=True)
+    assert msgCounts(s.nodestack.sent) == [1, 2, 1]
+
+
+def testFlushDelayDoesNotHoldBatchesThatReachTheSizeLimit():
+    s = Sender()
+    s.maxBatchMessages = 100
+    s.maxBatchSize = 3 * Batched.msgSize({"i": 0})
+    s.batchFlushDelay = 10
+    s.send({"i": 0}, 1)
+    s.flushOutBoxes()
+    s.send({"i": 1}, 1)
+    s.send({"i": 2}, 1)
+    s.flushOutBoxes()
+    assert len(s.nodestack.sent) == 1
+    assert s.nextFlush() > 0
+    # the held messages now fill a batch, so they go out without waiting
+    s.send({"i": 3}, 1)
+    assert s.nextFlush() == 0
+    s.flushOutBoxes()
+    assert msgCounts(s.nodestack.sent) == [1, 3]
+    assert not s.outBoxSizes
+
+
+def testLargeBatchesAreCompressedForRemotesThatCanDecodeThem():
+    s = Sender()
+    s.maxBatchMessages = 100
+    s.maxBatchSize = None
+    s.batchFlushDelay = 0
+    s.batchCodec = "zlib"
+    s.batchCompressionThreshold = 500
+
+    msgs = [{"op": "PREPARE", "digest": "ab" * 32, "i": i} for i in range(20)]
+
+    def sendAll():
+        for m in msgs:
+            s.send(m, 1)
+        s.flushOutBoxes()
+        return s.nodestack.sent.pop()[0]
+
+    # the remote has not said it can decode any codec
+    assert sendAll()["messages"] == msgs
+
+    s.remoteCodecs["beta"] = {"zlib"}
+    payload = sendAll()
+    assert payload["codec"] == "zlib"
+    batch = s.decompressBatch(CompressedBatch(**payload))
+    assert batch["messages"] == msgs
+    stats = s.batchCompression
+    assert stats.batches == 1
+    assert stats.ratio > 3
+
+    # small batches are sent as they are
+    del msgs[2:]
+    assert sendAll()["messages"] == msgs
+    assert stats.batches == 1
+
+
+def testOversizedCompressedBatchesAreRejected():
+    s = Sender()
+    s.maxDecompressedBatchSize = 100 * 1024
+
+    def compressed(payload):
+        return CompressedBatch("zlib", b64encode(payload).decode())
+
+    batch = {"op": "BATCH", "messages": [], "signature": None}
+    raw = zlib.compress(json.dumps(batch).encode())
+    assert s.decompressBatch(compressed(raw)) == batch
+    # a few kilobytes that decompress to megabytes
+    bomb = compressed(zlib.compress(b" " * 10 * 1024 * 1024))
+    assert len(bomb.payload) < s.maxDecompressedBatchSize
+    with pytest.raises(InvalidNodeMsg):
+        s.decompressBatch(bomb)
+    with pytest.raises(InvalidNodeMsg):
+        s.decompressBatch(compressed(raw[:-4]))
+    with pytest.raises(InvalidNodeMsg):
+        s.decompressBatch(CompressedBatch("lzma", bomb.payload))
+
+
+@pytest.fixture(scope="function")
+def simPool(simPool):
+    # nodes tell each other the codecs they can decode when they connect
+    for node in simPool.nodes.values():
+        node.batchCodec = "zlib"
+        node.batchCompressionThreshold = 200
+    return simPool
+
+
+def testPoolOrdersWithCompressedBatches(simPool, simClient):
+    assert all(set(n.remoteCodecs) == set(simPool.nodes) - {n.name}
+               for n in simPool.nodes.values())
+    reqIds = [simClient.submitTimed({"type": "buy", "amount": i})
+              for i in range(20)]
+    simPool.runUntil(lambda: all(r in simClient.confirmedAt for r in reqIds))
+    assert sum(n.batchCompression.batches
+               for n in simPool.nodes.values()) > 0
@@ -0,0 +1,26 @@
+from plenum.bench.load import BenchClient, LoadGenerator, percentiles
+from plenum.test.helper import genTestClient
+
+
+def testPercentilesUseNearestRank():
+    stats = percentiles([i / 1000 for i in range(1, 101)])
+    assert stats["p50"] == 50
+    assert stats["p99"] == 99
+    assert stats["max"] == 100
+    assert percentiles([]) == {}
+
+
+def testClosedLoopLoadIsConfirmed(looper, nodeSet, up, tdir):
+    clients = [genTestClient(nodeSet, tmpdir=tdir, testClientClass=BenchClient)
+               for _ in range(2)]
+    for client in clients:
+        looper.add(client)
+    generator = LoadGenerator(looper, clients, concurrency=2, duration=3,
+                              drain=10)
+    looper.run(generator.waitForConnections())
+    looper.run(generator.run())
+    report = generator.report()
+    assert report["sent"] > 2
+    assert report["confirmed"] == report["sent"]
+    assert not report["nacks"]
+    assert set(report["nodes"]) == {n.clientstack.name for n in nodeSet}
@@ -0,0 +1,12 @@
+from plenum.bench.memory import inFlightMemory
+
+
+def testInFlightMemoryReport():
+    small = inFlightMemory(2000, sample=500)
+    assert small["count"] == 2000
+    assert 0 < small["bytesPerRequest"] < 4096
+    assert not any(small["hasDict"].values())
+
+    # padding in the operation is held once per request
+    large = inFlightMemory(2000, requestSize=1024, sample=500)
+    assert large["bytesPerRequest"] - small["bytesPerRequest"] >= 1024
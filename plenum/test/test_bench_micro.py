@@ -0,0 +1,37 @@
+from plenum.bench.micro import compareMicro, runMicro
+
+
+def testMicroReportCoversEveryBenchmark():
+    report = runMicro(number=50, repeat=2)
+    names = [r["name"] for r in report["results"]]
+    for name in ("signing.serlize", "SimpleSigner.sign",
+                 "NaclAuthNr.authenticate", "TaggedTupleBase.melted",
+                 "Router.handleSync", "Requests.addPropagate",
+                 "Node.validateNodeMsg[PROPAGATE]", "Replica.processPrepare",
+                 "Replica.processCommit", "Monitor.requestOrdered"):
+        assert name in names
+    for r in report["results"]:
+        assert r["opsPerSec"] > 0
+        assert r["usPerOp"]["best"] <= r["usPerOp"]["median"]
+        assert r["allocations"]["retainedBlocks"] is not None
+
+
+def testMicroRunsOnlyTheNamedBenchmarks():
+    report = runMicro(names=["signing."], number=10, repeat=1)
+    assert [r["name"] for r in report["results"]] == \
+        ["signing.serlize", "signing.serializeCanonical",
+         "signing.serializeForSig"]
+
+
+def testCompareMicroFlagsRegressions():
+    def report(ops, retained):
+        return {"results": [{"name": "signing.serlize", "opsPerSec": ops,
+                             "allocations": {"retainedBytes": retained,
+                                             "peakBytes": None}}]}
+
+    rows = compareMicro(report(1000, 0), report(800, 0), tolerance=0.1)
+    byMetric = {r["metric"]: r for r in rows}
+    assert set(byMetric) == {"opsPerSec", "allocations.retainedBytes"}
+    assert byMetric["opsPerSec"]["regression"]
+    assert byMetric["opsPerSec"]["change"] == -0.2
+    assert not byMetric["allocations.retainedBytes"]["regression"]
@@ -0,0 +1,31 @@
+from plenum.bench.scaling import compareReports, runMatrix
+
+
+def testScalingReportCoversTheMatrix():
+    report = runMatrix(poolSizes=[4], requestSizes=[0, 512],
+                       clientCounts=[1], duration=1, drain=5)
+    results = report["results"]
+    assert [r["requestSize"] for r in results] == [0, 512]
+    for r in results:
+        assert r["ordered"] == r["sent"] > 0
+        assert r["throughput"] > 0
+        assert r["latencyMs"]["p50"] <= r["latencyMs"]["p99"]
+        assert r["msgsPerReq"] > 0
+        assert r["nodeTimeMs"]["max"] > 0
+    # larger requests cost more bytes, but no more messages
+    assert results[1]["bytesPerReq"] > results[0]["bytesPerReq"]
+    assert results[1]["msgsPerReq"] == results[0]["msgsPerReq"]
+
+
+def testCompareReportsFlagsRegressions():
+    def report(throughput, p50):
+        return {"results": [{"poolSize": 4, "clients": 1, "requestSize": 0,
+                             "throughput": throughput,
+                             "latencyMs": {"p50": p50, "p99": 10}}]}
+
+    rows = compareReports(report(100, 5), report(95, 6), tolerance=0.1)
+    byMetric = {r["metric"]: r for r in rows}
+    assert set(byMetric) == {"throughput", "latencyMs.p50", "latencyMs.p99"}
+    assert not byMetric["throughput"]["regression"]
+    assert byMetric["latencyMs.p50"]["regression"]
+    assert byMetric["latencyMs.p50"]["change"] == 0.2
@@ -0,0 +1,28 @@
+import subprocess
+import sys
+
+from plenum.bench.startup import runStartup
+from plenum.common.util import getlogger
+
+
+def testStartupReportTimesImportsAndNodeStart():
+    report = runStartup(modules=["plenum.common.util"], repeat=1, top=3)
+    imported = report["imports"]["plenum.common.util"]
+    assert imported["seconds"] > 0
+    assert 0 < len(imported["slowest"]) <= 3
+    assert imported["slowest"][0]["cumulativeMs"] >= \
+        imported["slowest"][-1]["cumulativeMs"]
+    assert all(report["node"][k] > 0
+               for k in ("nodeInit", "nodeStart", "firstProd"))
+
+
+def testNodeImportDoesNotLoadOrientDb():
+    out = subprocess.check_output(
+        [sys.executable, "-c", "import sys, plenum.server.node; "
+                               "print('pyorient' in sys.modules)"],
+        universal_newlines=True)
+    assert out.strip().splitlines()[-1] == "False"
+
+
+def testLoggerIsNamedAfterCallingModule():
+    assert getlogger().name == __name__
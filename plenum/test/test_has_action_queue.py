@@ -0,0 +1,50 @@
+import time
+
+from plenum.server.has_action_queue import HasActionQueue
+
+
+class Actor(HasActionQueue):
+    def __init__(self):
+        super().__init__()
+        self.ran = []
+
+    def act(self, name):
+        return lambda: self.ran.append(name)
+
+
+def testScheduledActionsRunInDueOrder():
+    a = Actor()
+    a._schedule(a.act('late'), .2)
+    a._schedule(a.act('early'), .1)
+    a._schedule(a.act('now'))
+    assert a._serviceActions() == 1
+    assert a.ran == ['now']
+    time.sleep(.25)
+    assert a._serviceActions() == 2
+    assert a.ran == ['now', 'early', 'late']
+    assert a.aqNextCheck == float('inf')
+
+
+def testCancelledActionsDoNotRun():
+    a = Actor()
+    aid1 = a._schedule(a.act('first'), .1)
+    aid2 = a._schedule(a.act('second'), .2)
+    aid3 = a._schedule(a.act('third'))
+    a._cancel(aid1)
+    a._cancel(aid3)
+    assert a.aqNextCheck == a.aqStash[0][0]
+    assert a.aqStash[0][1] == aid2
+    time.sleep(.25)
+    assert a._serviceActions() == 1
+    assert a.ran == ['second']
+    assert not a.aqCancelled
+    assert not a.aqPending
+
+
+def testCancellingAnActionThatAlreadyRanHasNoEffect():
+    a = Actor()
+    aid = a._schedule(a.act('once'))
+    a._serviceActions()
+    a._cancel(aid)
+    assert not a.aqCancelled
+    assert a.ran == ['once']
@@ -0,0 +1,85 @@
+import time
+
+from plenum.common.clock import VirtualClock, systemClock
+from plenum.common.looper import Looper, Prodable
+from plenum.common.startable import Status
+
+
+class Ticker(Prodable):
+    """
+    A Prodable that has work only at the deadlines it is given.
+    """
+
+    def __init__(self, name, deadlines):
+        self._name = name
+        self.deadlines = list(deadlines)
+        self.prods = 0
+        self.ticks = []
+        self.clock = systemClock
+
+    def name(self):
+        return self._name
+
+    async def prod(self, limit) -> int:
+        self.prods += 1
+        now = self.clock.now()
+        if self.deadlines and self.deadlines[0] <= now:
+            self.ticks.append(now - self.deadlines.pop(0))
+            return 1
+        return 0
+
+    def nextWakeup(self):
+        return self.deadlines[0] if self.deadlines else float('inf')
+
+    def start(self, loop):
+        pass
+
+    def stop(self):
+        pass
+
+    def get_status(self) -> Status:
+        return Status.started
+
+
+def testEventDrivenLooperWakesOnDeadlines():
+    start = time.perf_counter()
+    ticker = Ticker("ticker", [start + .3, start + .6])
+    with Looper([ticker], eventDriven=True) as looper:
+        looper.maxIdleWait = 1
+        looper.runFor(.8)
+    assert len(ticker.ticks) == 2
+    # prodded only around the deadlines, not every 10 milliseconds
+    assert ticker.prods < 20
+
+
+def testPollingLooperProdsContinuously():
+    ticker = Ticker("ticker", [])
+    with Looper([ticker], eventDriven=False) as looper:
+        looper.runFor(.3)
+    assert ticker.prods > 20
+
+
+def testLooperRecordsProdTimingsAndLoopLag():
+    ticker = Ticker("ticker", [])
+    with Looper([ticker], eventDriven=False) as looper:
+        looper.runFor(.2)
+        timing = looper.prodTimings["ticker"]
+        assert looper.slowestProd[0] == "ticker"
+        assert timing.count == ticker.prods
+        assert looper.turnDurations.count > 0
+        assert looper.loopLag.count > 0
+        assert [n for n, _ in looper.metrics()][:2] == ["turn durations",
+                                                        "loop lag"]
+
+
+def testLooperAdvancesVirtualClockWhenIdle():
+    clock = VirtualClock()
+    ticker = Ticker("ticker", [100, 200])
+    ticker.clock = clock
+    with Looper([ticker], clock=clock) as looper:
+        start = time.perf_counter()
+        looper.runFor(300)
+        assert time.perf_counter() - start < 5
+        assert clock.now() >= 300
+    # prodded exactly at the deadlines
+    assert ticker.ticks == [0, 0]
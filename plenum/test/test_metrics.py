@@ -0,0 +1,26 @@
+from plenum.common.metrics import Histogram, Timings
+
+
+def testHistogramSummary():
+    h = Histogram()
+    for v in [0.0002] * 98 + [0.02, 2]:
+        h.add(v)
+    assert h.count == 100
+    assert h.max == 2
+    assert h.percentile(50) == 0.0005
+    assert h.percentile(99) == 0.05
+    assert h.percentile(100) == 5.0
+    h.reset()
+    assert h.count == 0
+    assert h.percentile(50) == 0.0
+
+
+def testTimingsLapRecordsEachPhase():
+    t = Timings()
+    s = t.lap("first", 0)
+    t.lap("second", s)
+    t.add("first", 0.001)
+    assert list(t.keys()) == ["first", "second"]
+    assert t["first"].count == 2
+    assert t["second"].count == 1
+    assert [name for name, _ in t.metrics()] == ["first", "second"]
@@ -0,0 +1,67 @@
+import copy
+import pickle
+
+from plenum.common.stacked import NodeRegistry
+from plenum.common.types import HA
+
+
+def testRegistryIndexesAddresses():
+    reg = NodeRegistry([("Alpha", HA("127.0.0.1", 9701)),
+                        ("Beta", HA("10.0.0.2", 9703))])
+    # local addresses of the same port are the same address
+    assert reg.namesAt(HA("0.0.0.0", 9701)) == ["Alpha"]
+    assert reg.namesAt(HA("10.0.0.2", 9703)) == ["Beta"]
+    assert reg.namesAt(HA("10.0.0.3", 9703)) == []
+
+    reg["Beta"] = HA("10.0.0.3", 9703)
+    assert reg.namesAt(HA("10.0.0.2", 9703)) == []
+    assert reg.namesAt(HA("10.0.0.3", 9703)) == ["Beta"]
+
+    reg.update(Gamma=HA("10.0.0.4", 9705))
+    del reg["Alpha"]
+    assert reg.pop("Gamma") == HA("10.0.0.4", 9705)
+    assert reg.pop("Gamma", None) is None
+    assert reg.namesAt(HA("127.0.0.1", 9701)) == []
+    assert set(reg.haIndex) == {("10.0.0.3", 9703)}
+    reg.clear()
+    assert not reg.haIndex
+
+
+def testRegistryCopiesHaveTheirOwnIndex():
+    reg = NodeRegistry([("Alpha", HA("127.0.0.1", 9701)),
+                        ("Beta", HA("10.0.0.2", 9703))],
+                       localips=("127.0.0.1", "10.0.0.2"))
+    for dup in (copy.copy(reg), copy.deepcopy(reg),
+                pickle.loads(pickle.dumps(reg))):
+        assert type(dup) is NodeRegistry
+        assert dup == reg
+        assert dup.localips == reg.localips
+        assert dup.haIndex == reg.haIndex
+        assert dup.haIndex is not reg.haIndex
+        assert dup.namesAt(HA("10.0.0.2", 9701)) == ["Alpha"]
+        dup["Gamma"] = HA("10.0.0.4", 9705)
+        del dup["Alpha"]
+        assert reg.namesAt(HA("127.0.0.1", 9701)) == ["Alpha"]
+        assert reg.namesAt(HA("10.0.0.4", 9705)) == []
+
+
+def testNodeFindsRemotesByIndex(simPool):
+    simPool.runUntil(simPool.isReady, timeout=120)
+    node = simPool.nodes["Node1"]
+    assert isinstance(node.nodeReg, NodeRegistry)
+    assert "Node1" not in node.nodeReg
+    for name, ha in node.nodeReg.items():
+        assert node.findInNodeRegByHA(ha) == name
+        remote = node.nodestack.getRemote(name)
+        assert node.getRemoteName(remote) == name
+    assert node.reconcileNodeReg() == set()
+
+    # the connected nodes are only gathered when a connection changed
+    calls = []
+    connecteds = node.nodestack.connecteds
+    node.nodestack.connecteds = lambda: calls.append(1) or connecteds()
+    node.checkConns()
+    assert not calls
+    node.nodestack.getRemote("Node2").connected = False
+    node.checkConns()
+    assert calls and "Node2" not in node.conns
@@ -0,0 +1,38 @@
+def testReconnectWaitsRatchetUpWithJitterToACap(simPool):
+    node = simPool.nodes["Node1"]
+    for count in range(30):
+        full = node.ratchet.get(count)
+        wait = node.reconnectWait(count)
+        assert (1 - node.reconnectJitter) * full <= wait <= full
+        assert wait <= node.config.reconnectBackoffCap
+    assert node.ratchet.get(29) == node.config.reconnectBackoffCap
+
+
+def testRetriesToADownNodeBackOff(simPool):
+    simPool.runUntil(simPool.isReady, timeout=120)
+    node = simPool.nodes["Node1"]
+    simPool.nodes["Node4"].nodestack.close()
+    simPool.runUntil(lambda: "Node4" not in node.conns)
+
+    start = simPool.clock.now()
+    duration = 600
+    simPool.runUntil(lambda: simPool.clock.now() - start > duration,
+                     timeout=duration + 10)
+    summary = node.reconnectSummary()
+
+    # most retries there can be if each waits as little as jitter allows
+    most, waited = 0, 0
+    while waited <= duration:
+        waited += (1 - node.reconnectJitter) * node.ratchet.get(most)
+        most += 1
+    assert 0 < summary["retries"] <= most
+    assert summary["deferred"] > 0
+    assert 0 < summary["backingOff"]["Node4"] <= \
+        node.config.reconnectBackoffCap
+
+    # a message from the node cuts the wait short
+    node.remoteActive("Node4")
+    assert "Node4" not in node.reconnectSummary()["backingOff"]
+    assert node.reconnectSummary()["resets"] == summary["resets"] + 1
+    assert node.nextCheck == simPool.clock.now()
+    assert ("reconnects", node.reconnectSummary()) in node.metrics()
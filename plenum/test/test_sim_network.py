@@ -0,0 +1,113 @@
+import json
+
+from plenum.common.clock import VirtualClock
+from plenum.common.sim_stack import SimNetwork
+from plenum.common.types import HA
+
+
+def newStacks(network, *names):
+    return [network.newStack(dict(name=name, ha=HA("sim", i), main=True))
+            for i, name in enumerate(names, 1)]
+
+
+def connect(network, frm, to):
+    remote = frm.newRemote(to.ha)
+    frm.addRemote(remote)
+    frm.join(remote.uid)
+    # one trip there and one back
+    for _ in range(2):
+        network.clock.advance(1)
+        network.deliverDue()
+
+
+def testSimStacksConnectAfterARoundTrip():
+    network = SimNetwork(latency=0.01)
+    alpha, beta = newStacks(network, "alpha", "beta")
+    remote = alpha.newRemote(beta.ha)
+    alpha.addRemote(remote)
+    alpha.join(remote.uid)
+    assert remote.joinInProcess()
+
+    network.clock.advance(0.01)
+    network.deliverDue()
+    assert beta.connecteds() == {"alpha"}
+    assert not alpha.connecteds()
+
+    network.clock.advance(0.01)
+    network.deliverDue()
+    assert alpha.connecteds() == {"beta"}
+    assert not remote.joinInProcess()
+
+
+def testSimStacksDeliverByLatencyAndBandwidth():
+    network = SimNetwork(latency=0.25)
+    alpha, beta, gamma = newStacks(network, "alpha", "beta", "gamma")
+    connect(network, alpha, beta)
+    connect(network, alpha, gamma)
+    start = network.clock.now()
+    # 200 bytes a second, so a message of 50 bytes takes a quarter second
+    network.setLink("alpha", "beta", bandwidth=200)
+
+    msg = {"op": "PING", "pad": "x" * 25}
+    assert len(json.dumps(msg)) == 50
+    alpha.send(msg, "beta")
+    alpha.send(msg, "beta")
+    alpha.send(msg, "gamma")
+
+    network.clock.advanceTo(start + 0.25)
+    network.deliverDue()
+    assert list(gamma.rxMsgs) == [(msg, "alpha")]
+    assert not beta.rxMsgs
+
+    network.clock.advanceTo(start + 0.5)
+    network.deliverDue()
+    assert len(beta.rxMsgs) == 1
+    # the second message queued behind the first
+    assert network.nextDelivery() == start + 0.75
+
+    network.clock.advanceTo(start + 0.75)
+    network.deliverDue()
+    assert list(beta.rxMsgs) == [(msg, "alpha"), (msg, "alpha")]
+    assert network.nextDelivery() == float('inf')
+
+
+def testSimNetworkDropsAreDeterministic():
+    def run(seed):
+        network = SimNetwork(seed=seed, drop=0.5)
+        alpha, beta = newStacks(network, "alpha", "beta")
+        network.setLink("alpha", "beta", drop=0)
+        connect(network, alpha, beta)
+        network.setLink("alpha", "beta", drop=0.5)
+        for i in range(100):
+            alpha.send({"op": "PING", "i": i}, "beta")
+        network.clock.advance(1)
+        network.deliverDue()
+        return [m["i"] for m, _ in beta.rxMsgs]
+
+    received = run(7)
+    assert 0 < len(received) < 100
+    assert received == run(7)
+    assert received != run(8)
+
+
+def testClosingASimStackDisconnectsItsRemotes():
+    network = SimNetwork()
+    alpha, beta = newStacks(network, "alpha", "beta")
+    connect(network, alpha, beta)
+    assert beta.connecteds() == {"alpha"}
+
+    alpha.close()
+    network.clock.advance(1)
+    network.deliverDue()
+    assert not beta.connecteds()
+    beta.send({"op": "PING"}, "alpha")
+    assert beta.stats['dropped'] == 1
+
+
+def testVirtualClock():
+    clock = VirtualClock(start=5)
+    assert clock.now() == 5
+    clock.advance(2.5)
+    clock.advanceTo(1)
+    assert clock.now() == 7.5
+    assert clock.time() == clock.epoch + 7.5
@@ -0,0 +1,33 @@
+import os
+import random
+
+from plenum.bench.sim import SimPool
+
+
+def runPool(basedir, seed):
+    with SimPool(4, basedir, seed=seed) as pool:
+        electionTime = pool.runUntil(pool.isReady, timeout=120)
+        client = pool.newClient()
+        pool.runUntil(lambda: len(client.conns) == len(pool.nodes))
+        reqId = client.submitTimed({"type": "buy", "amount": 1})
+        pool.runUntil(lambda: reqId in client.confirmedAt)
+        return dict(electionTime=electionTime,
+                    primaries=[r.primaryName
+                               for r in pool.nodes["Node1"].replicas],
+                    latency=client.confirmedAt[reqId] - client.sentAt[reqId],
+                    network=dict(pool.network.stats))
+
+
+def testSimPoolRunsAreRepeatable(tdir_for_func):
+    first = runPool(os.path.join(tdir_for_func, "first"), seed=1)
+    assert first["latency"] > 0
+    assert first == runPool(os.path.join(tdir_for_func, "second"), seed=1)
+
+
+def testSimPoolRunsDoNotDependOnOrChangeTheGlobalRandom(tdir_for_func):
+    random.seed(1)
+    first = runPool(os.path.join(tdir_for_func, "first"), seed=1)
+    random.seed(2)
+    state = random.getstate()
+    assert first == runPool(os.path.join(tdir_for_func, "second"), seed=1)
+    assert random.getstate() == state
@@ -0,0 +1,108 @@
+from raet.raeting import AutoMode
+
+from plenum.common.raet import initLocalKeep, initRemoteKeep
+from plenum.common.tcp_stack import TcpStack
+from plenum.test.eventually import eventually
+from plenum.test.helper import genHa
+
+
+def initKeeps(tdir, names, shareKeys=True):
+    keys = {name: initLocalKeep(name, tdir, name.ljust(32, '0'),
+                                name.ljust(32, '1'), override=True)
+            for name in names}
+    if shareKeys:
+        for name in names:
+            for other in names:
+                if other != name:
+                    initRemoteKeep(name, other, tdir, *keys[other],
+                                   override=True)
+
+
+def newStack(tdir, name, auto=AutoMode.never):
+    return TcpStack.newStack(dict(name=name, ha=genHa(), main=True,
+                                  auto=auto, basedirpath=tdir))
+
+
+def testTcpStacksExchangeMessages(tdir_for_func, looperWithoutNodeSet):
+    looper = looperWithoutNodeSet
+    initKeeps(tdir_for_func, ["alpha", "beta"])
+    alpha = newStack(tdir_for_func, "alpha")
+    beta = newStack(tdir_for_func, "beta")
+    try:
+        remote = alpha.newRemote(beta.ha)
+        alpha.addRemote(remote)
+        alpha.join(remote.uid)
+
+        def connected():
+            assert alpha.connecteds() == {"beta"}
+            assert beta.connecteds() == {"alpha"}
+
+        looper.run(eventually(connected, retryWait=.1, timeout=5))
+
+        big = {"op": "BATCH", "messages": ["x" * 1000] * 1000}
+        alpha.send({"op": "PING"}, "beta")
+        alpha.send(big, "beta")
+        beta.send({"op": "PONG"}, "alpha")
+
+        def received():
+            assert list(beta.rxMsgs) == [({"op": "PING"}, "alpha"),
+                                         (big, "alpha")]
+            assert list(alpha.rxMsgs) == [({"op": "PONG"}, "beta")]
+
+        looper.run(eventually(received, retryWait=.1, timeout=5))
+    finally:
+        alpha.close()
+        beta.close()
+
+
+def testTcpStackRejectsUnknownKeys(tdir_for_func, looperWithoutNodeSet):
+    looper = looperWithoutNodeSet
+    initKeeps(tdir_for_func, ["alpha", "beta"], shareKeys=False)
+    alpha = newStack(tdir_for_func, "alpha", auto=AutoMode.always)
+    beta = newStack(tdir_for_func, "beta")
+    try:
+        remote = alpha.newRemote(beta.ha)
+        alpha.addRemote(remote)
+        alpha.join(remote.uid)
+
+        def refused():
+            assert not remote.joinInProcess()
+
+        looper.run(eventually(refused, retryWait=.1, timeout=5))
+        assert not alpha.connecteds()
+        assert not beta.connecteds()
+    finally:
+        alpha.close()
+        beta.close()
+
+
+def testTcpStackDisconnectsRemotesThatFallBehind(tdir_for_func,
+                                                 looperWithoutNodeSet):
+    looper = looperWithoutNodeSet
+    initKeeps(tdir_for_func, ["alpha", "beta"])
+    alpha = newStack(tdir_for_func, "alpha")
+    beta = newStack(tdir_for_func, "beta")
+    try:
+        remote = alpha.newRemote(beta.ha)
+        alpha.addRemote(remote)
+        alpha.join(remote.uid)
+
+        def connected():
+            assert alpha.connecteds() == {"beta"}
+
+        looper.run(eventually(connected, retryWait=.1, timeout=5))
+
+        alpha.maxWriteBuffer = 1024 * 1024
+        big = {"op": "BATCH", "messages": ["x" * 1000] * 1000}
+        # beta reads nothing while the looper does not run, so what the
+        # socket does not take waits in alpha's buffer
+        for _ in range(100):
+            alpha.send(big, "beta")
+            if not remote.joined:
+                break
+        assert not remote.joined
+        assert alpha.stats['dropped'] == 1
+        assert alpha.stats['txFrames'] < 100
+    finally:
+        alpha.close()
+        beta.close()
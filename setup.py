@@ -64,7 +64,10 @@ setup(
     setup_requires=['pytest-runner'],
     tests_require=['pytest', 'pytest-xdist'],
     scripts=['scripts/plenum', 'scripts/init_plenum_raet_keep',
-             'scripts/start_plenum_node']
+             'scripts/start_plenum_node', 'scripts/plenum-bench',
+             'scripts/plenum-bench-pool', 'scripts/plenum-bench-micro',
+             'scripts/plenum-bench-memory', 'scripts/plenum-replay',
+             'scripts/plenum-bench-startup']
 )
 
 if not os.path.exists(CONFIG_FILE):